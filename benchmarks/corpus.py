@@ -0,0 +1,168 @@
+"""
+Fixed benchmark corpus.
+
+Writes the same PDF files on every run (byte for byte with the same zlib
+version), without any dependency, so benchmark results of different
+machines and versions can be compared. The documents cover the main kinds of pages pdf2htmlEX handles:
+
+    text.pdf      50 pages of text lines (standard Helvetica font)
+    vector.pdf    20 pages of text and charts drawn with vector paths
+    scanned.pdf   20 pages holding one 1700x2200 grayscale image each (200 DPI scans)
+
+Usage:
+    python benchmarks/corpus.py <corpus_dir>
+"""
+import random, sys, zlib
+from pathlib import Path
+
+# Letter pages, in PDF points
+PAGE_WIDTH = 612
+PAGE_HEIGHT = 792
+
+# Seed of the generated text and drawings
+SEED = 1234
+
+WORDS = (
+    "document retrieval chunk page viewer context answer model source table figure section result "
+    "value report analysis revenue quarter growth customer contract clause policy data system"
+).split()
+
+CORPUS = {
+    "text.pdf": ("text", 50),
+    "vector.pdf": ("vector", 20),
+    "scanned.pdf": ("scanned", 20),
+}
+
+
+def build_corpus(directory) -> list[Path]:
+    """
+    Write the corpus documents into a directory.
+
+    Args:
+        directory: Output directory (str or Path), created if needed
+
+    Returns:
+        list[Path]: Paths of the written documents
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for name, (kind, pages) in CORPUS.items():
+        rng = random.Random(f"{SEED}-{name}")
+        path = directory / name
+        path.write_bytes(build_pdf([build_page(kind, rng) for _ in range(pages)]))
+        paths.append(path)
+    return paths
+
+
+def build_page(kind: str, rng: random.Random) -> tuple[bytes, bytes]:
+    """
+    Build the content of one page.
+
+    Args:
+        kind (str): "text", "vector" or "scanned"
+        rng (random.Random): Generator of the page content
+
+    Returns:
+        tuple[bytes, bytes]: Content stream, and the grayscale image data (None without image)
+    """
+    if kind == "scanned":
+        return b"q 612 0 0 792 0 0 cm /Im0 Do Q", build_scan(rng)
+
+    lines = []
+    top = PAGE_HEIGHT - 72
+    count = 50 if kind == "text" else 20
+    for i in range(count):
+        words = " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 12)))
+        lines.append(f"BT /F1 11 Tf 72 {top - i * 13} Td ({words}) Tj ET")
+
+    if kind == "vector":
+        # A bar chart and a line chart under the text
+        for i in range(24):
+            height = rng.randint(20, 180)
+            lines.append(f"0.{rng.randint(2, 8)} g {72 + i * 19} 150 14 {height} re f")
+        points = " ".join(f"{72 + i * 9} {420 + rng.randint(0, 60)} {'m' if i == 0 else 'l'}" for i in range(52))
+        lines.append(f"0 G 1.5 w {points} S")
+    return "\n".join(lines).encode("latin-1"), None
+
+
+def build_scan(rng: random.Random, width: int = 1700, height: int = 2200) -> bytes:
+    """
+    Build a page scan: paper noise with dark text-like strokes.
+
+    Returns:
+        bytes: 8 bit grayscale pixels, row by row
+    """
+    # Paper noise, each row is a random window of it
+    noise = bytes(rng.randint(232, 255) for _ in range(2 * width))
+    rows = []
+    for y in range(height):
+        offset = rng.randint(0, width)
+        row = bytearray(noise[offset:offset + width])
+        if 200 <= y < height - 200 and (y // 30) % 2 == 0 and y % 30 > 8:
+            # Text line: dark runs across the line
+            x = 200
+            while x < width - 200:
+                run = min(rng.randint(8, 60), width - 200 - x)
+                row[x:x + run] = bytes(rng.randint(20, 70) for _ in range(run))
+                x += run + rng.randint(10, 30)
+        rows.append(bytes(row))
+    return b"".join(rows)
+
+
+def build_pdf(pages: list[tuple[bytes, bytes]]) -> bytes:
+    """
+    Serialize pages into a PDF file.
+
+    Args:
+        pages (list[tuple[bytes, bytes]]): Content stream and image data of each page
+
+    Returns:
+        bytes: The PDF file
+    """
+    objects = []
+
+    def add(content: bytes) -> int:
+        objects.append(content)
+        return len(objects)
+
+    def stream(dictionary: str, data: bytes) -> bytes:
+        data = zlib.compress(data, 9)
+        return f"<< {dictionary} /Filter /FlateDecode /Length {len(data)} >>\nstream\n".encode() + data + b"\nendstream"
+
+    catalog = add(b"")
+    tree = add(b"")
+    font = add(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>")
+    kids = []
+    for content, image in pages:
+        resources = f"/Font << /F1 {font} 0 R >>"
+        if image is not None:
+            image_id = add(stream("/Type /XObject /Subtype /Image /Width 1700 /Height 2200 "
+                                  "/ColorSpace /DeviceGray /BitsPerComponent 8", image))
+            resources += f" /XObject << /Im0 {image_id} 0 R >>"
+        content_id = add(stream("", content))
+        kids.append(add(
+            f"<< /Type /Page /Parent {tree} 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] "
+            f"/Resources << {resources} >> /Contents {content_id} 0 R >>".encode()
+        ))
+    objects[catalog - 1] = f"<< /Type /Catalog /Pages {tree} 0 R >>".encode()
+    objects[tree - 1] = f"<< /Type /Pages /Kids [{' '.join(f'{x} 0 R' for x in kids)}] /Count {len(kids)} >>".encode()
+
+    output = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    offsets = []
+    for i, content in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += f"{i} 0 obj\n".encode() + content + b"\nendobj\n"
+    xref = len(output)
+    output += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    output += "".join(f"{x:010d} 00000 n \n" for x in offsets).encode()
+    output += f"trailer\n<< /Size {len(objects) + 1} /Root {catalog} 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return bytes(output)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+    for path in build_corpus(sys.argv[1]):
+        print(f"  |_ {path} ({path.stat().st_size / 1024 ** 2:.1f} MiB)")
@@ -0,0 +1,117 @@
+"""
+Benchmark the post-processing of the pdf2htmlEX HTML.
+
+Compares the previous pipeline, where the document was parsed and serialized
+once per rewrite (cleanup, UI injection and asset links), with the single
+parse pipeline, for every available parser backend.
+
+Usage:
+    python benchmarks/html_postprocess.py [pages] [repeat]
+"""
+import sys, tempfile, time, tracemalloc
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from rag_document_viewer.rag_document_viewer import RAG_Document_Viewer
+
+
+def build_document(pages: int) -> str:
+    """
+    Build a synthetic document shaped like pdf2htmlEX output.
+
+    Args:
+        pages (int): Number of pages
+
+    Returns:
+        str: HTML content
+    """
+    lines = "".join(
+        f'<div class="t m0 x{i % 16:x} h{i % 8:x} y{i:x} ff{i % 4:x} fs{i % 6:x} fc0 sc0 ls0 ws0">'
+        f'Line {i} of the page with some text<span class="_ _{i % 9:x}"></span>more text</div>'
+        for i in range(60)
+    )
+    page = (
+        '<div id="pf{0:x}" class="pf w0 h0" data-page-no="{0:x}"><div class="pc pc{0:x} w0 h0">'
+        '<img class="bi x0 y0 w1 h1" alt="" src="bg{0:x}.png"/>{1}</div>'
+        '<div class="pi" data-data=\'{{"ctm":[1.0,0.0,0.0,1.0,0.0,0.0]}}\'></div></div>'
+    )
+    body = "".join(page.format(i + 1, lines) for i in range(pages))
+    return (
+        '<!DOCTYPE html><html xmlns="http://www.w3.org/1999/xhtml"><head><meta charset="utf-8"/>'
+        '<meta name="generator" content="pdf2htmlEX"/><link rel="stylesheet" href="base.min.css"/>'
+        '<link rel="stylesheet" href="document.css"/><script src="compatibility.min.js"></script>'
+        '<script src="pdf2htmlEX.min.js"></script><script>try{pdf2htmlEX.defaultViewer = new pdf2htmlEX.Viewer({});}catch(e){}</script>'
+        '<title></title></head><body><div id="sidebar"><div id="outline"></div></div>'
+        f'<div id="page-container">{body}</div><div class="loading-indicator"><img alt="" src="pdf2htmlEX-64x64.png"/></div>'
+        '<!-- generated by pdf2htmlEX --></body></html>'
+    )
+
+
+def three_passes(viewer, content: str, parser: str) -> str:
+    """
+    Previous pipeline: one parse and serialization per rewrite.
+    """
+    for rewrite in [viewer._remove_unwanted_elements, viewer._inject_ui_components, viewer._update_asset_links]:
+        bs = BeautifulSoup(content, parser)
+        rewrite(bs)
+        content = str(bs)
+    return content
+
+
+def single_pass(viewer, content: str, parser: str) -> str:
+    """
+    Current pipeline: every rewrite applied to one parsed tree.
+    """
+    viewer._configs["html_parser"] = parser
+    return viewer._postprocess_html(content)
+
+
+def measure(function, viewer, content: str, parser: str, repeat: int) -> tuple[float, float]:
+    """
+    Run a pipeline and measure it.
+
+    Returns:
+        tuple[float, float]: Best wall time in seconds and peak traced memory in MiB
+    """
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function(viewer, content, parser)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+
+    tracemalloc.start()
+    function(viewer, content, parser)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best, peak / 1024 ** 2
+
+
+def main():
+    pages = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+    parsers = ["html.parser"]
+    try:
+        import lxml
+        parsers.append("lxml")
+    except ImportError:
+        pass
+
+    content = build_document(pages)
+    with tempfile.TemporaryDirectory() as tmp:
+        file_path = Path(tmp) / "document.pdf"
+        file_path.write_bytes(b"")
+        viewer = RAG_Document_Viewer(file_path, tmp, [], {})
+
+        print(f"** {pages} pages, {len(content) / 1024 ** 2:.1f} MiB of HTML, best of {repeat}")
+        for parser in parsers:
+            for name, function in [("three passes", three_passes), ("single pass", single_pass)]:
+                elapsed, peak = measure(function, viewer, content, parser, repeat)
+                print(f"  |_ {parser:<12} {name:<13} {elapsed:8.3f} s  {peak:8.1f} MiB peak")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Benchmark the pdf2htmlEX render profiles.
+
+Converts every PDF of a corpus with each render profile (and the legacy
+options used when no profile is set), and reports the throughput in pages
+per second and the size of the generated viewers. By default the fixed
+corpus of benchmarks/corpus.py is used, so results can be compared across
+machines and versions; pass a directory to run on your own PDFs instead.
+The results are also printed as the Markdown table of the README, and
+--update-readme writes them into the README results section (only run it
+on the fixed corpus).
+
+Needs pdf2htmlEX on the PATH.
+
+Usage:
+    python benchmarks/render_profiles.py [--update-readme] [corpus_dir] [repeat]
+"""
+import contextlib, io, os, platform, re, sys, tempfile, time, warnings
+from pathlib import Path
+from subprocess import run
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from benchmarks.corpus import build_corpus
+from rag_document_viewer.pdf_sharding import get_pdf_page_count
+from rag_document_viewer.rag_document_viewer import RAG_DV, RENDER_PROFILES
+
+README_PATH = Path(__file__).resolve().parent.parent / "README.md"
+
+# Section of the README holding the published results
+RESULTS_SECTION = re.compile(r"(<!-- render-profiles-results:start -->\n).*?(<!-- render-profiles-results:end -->)", re.DOTALL)
+
+
+def get_directory_size(path: Path) -> int:
+    """
+    Get the size of every file of a directory.
+
+    Returns:
+        int: Size in bytes
+    """
+    return sum(x.stat().st_size for x in path.rglob("*") if x.is_file())
+
+
+def measure(file_path: Path, profile: str, repeat: int) -> tuple[float, int]:
+    """
+    Convert a document with a render profile and measure it.
+
+    Returns:
+        tuple[float, int]: Best wall time in seconds and size of the viewer in bytes
+    """
+    best = None
+    size = 0
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory() as tmp:
+            configs = {"render_profile": None if profile == "legacy" else profile}
+            started = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()), warnings.catch_warnings():
+                # No chunks are drawn, only the conversion is measured
+                warnings.simplefilter("ignore")
+                RAG_DV(str(file_path), str(Path(tmp) / "viewer"), [], **configs)
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+            size = get_directory_size(Path(tmp))
+    return best, size
+
+
+def get_environment() -> str:
+    """
+    Describe the machine and pdf2htmlEX version the results were measured with.
+
+    Returns:
+        str: One line description
+    """
+    result = run(["pdf2htmlEX", "--version"], capture_output=True, text=True)
+    version = next((x.strip() for x in (result.stdout + result.stderr).splitlines() if x.strip()), "pdf2htmlEX")
+    return f"{version}, Python {platform.python_version()}, {platform.system()} {platform.machine()}, {os.cpu_count()} CPUs"
+
+
+def update_readme(table: str):
+    """
+    Write the results table into the README results section.
+
+    Args:
+        table (str): Markdown results
+    """
+    content = README_PATH.read_text()
+    if not RESULTS_SECTION.search(content):
+        print("The README has no render profile results section.")
+        sys.exit(1)
+    README_PATH.write_text(RESULTS_SECTION.sub(lambda m: f"{m.group(1)}{table}\n{m.group(2)}", content))
+    print(f"  |_ Results written to {README_PATH}")
+
+
+def main():
+    arguments = [x for x in sys.argv[1:] if x != "--update-readme"]
+    write_readme = len(arguments) < len(sys.argv) - 1
+    repeat = int(arguments[1]) if len(arguments) > 1 else 1
+    if write_readme and len(arguments) > 0:
+        print("Only the results of the fixed corpus are written to the README.")
+        sys.exit(1)
+    with tempfile.TemporaryDirectory() as tmp:
+        if len(arguments) > 0:
+            corpus = sorted(Path(arguments[0]).glob("*.pdf"))
+        else:
+            corpus = build_corpus(tmp)
+        if len(corpus) == 0:
+            print(f"There is no PDF file in {arguments[0]}.")
+            sys.exit(1)
+
+        pages = {x: get_pdf_page_count(x) or 0 for x in corpus}
+        print(f"** {len(corpus)} documents, {sum(pages.values())} pages, best of {repeat}")
+        rows = []
+        for profile in RENDER_PROFILES:
+            elapsed = 0.0
+            size = 0
+            for file_path in corpus:
+                document_elapsed, document_size = measure(file_path, profile, repeat)
+                print(f"  |_ {profile:<9} {file_path.name:<16} {pages[file_path] / document_elapsed:8.2f} pages/s  "
+                      f"{document_size / 1024 ** 2:8.1f} MiB")
+                elapsed += document_elapsed
+                size += document_size
+            rows.append(f"| `{profile}` | {sum(pages.values()) / elapsed:.2f} | {size / 1024 ** 2:.1f} MiB |")
+
+    table = "\n".join([
+        f"Measured on {arguments[0] if arguments else 'the fixed corpus'} ({sum(pages.values())} pages), best of {repeat}, with {get_environment()}.",
+        "",
+        "| Profile | Pages/s | Viewer size |",
+        "|---------|---------|-------------|",
+        *rows,
+    ])
+    print()
+    print(table)
+    if write_readme:
+        update_readme(table)
+
+
+if __name__ == "__main__":
+    main()
@@ -1 +1,5 @@
-from .rag_document_viewer import RAG_DV
\ No newline at end of file
+from .rag_document_viewer import RAG_DV, RAG_DV_async, RAG_DV_rechunk
+from .batch import RAG_DV_batch
+from .libreoffice_pool import LibreOfficePool
+from .chunks import ChunkStore
+from .asset_store import AssetStore
\ No newline at end of file
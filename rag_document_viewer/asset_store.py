@@ -0,0 +1,132 @@
+import os, threading, uuid
+from pathlib import Path
+from .hashed_assets import file_digest
+
+class AssetStore:
+    """
+    Directory of assets keyed by content hash, shared by many viewers.
+
+    Documents made from the same templates embed identical fonts and
+    background images. Instead of a full copy in every viewer, each asset is
+    stored once as <store>/<hash[:2]>/<hash><ext> and the viewer files are
+    hard links to it, so the viewers keep working as plain directories.
+
+    The hard links are the reference count: an asset whose only link left is
+    the store's own is not used by any viewer anymore, and is removed by
+    `collect_garbage()`. Deleting a viewer directory is all it takes to
+    release its assets.
+
+    Pass the store (or its directory) to the viewer with the `asset_store` option:
+
+        store = AssetStore("/path/to/asset-store")
+        RAG_DV(file_path, store_path, chunks, asset_store=store)
+        store.collect_garbage()
+    """
+    def __init__(self, path):
+        """
+        Initialize the store, creating its directory if needed.
+
+        Args:
+            path: Directory of the store (str or Path), on the same filesystem as the viewers
+        """
+        self._path = Path(path)
+        self._path.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._stats = {"added": 0, "linked": 0, "unlinked": 0, "bytes_saved": 0}
+
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+
+    def add(self, file_path) -> Path:
+        """
+        Store a viewer asset and replace it with a hard link to the stored copy.
+        When the store already has the same content, the viewer file is
+        replaced and no data is written.
+
+        Args:
+            file_path: Path to the viewer asset (str or Path)
+
+        Returns:
+            Path: Path of the asset in the store, None if hard links aren't possible
+                  (the viewer then keeps its own copy)
+        """
+        file_path = Path(file_path)
+        digest = file_digest(file_path)
+        stored = self._path / digest[:2] / f"{digest}{file_path.suffix}"
+        stored.parent.mkdir(exist_ok=True)
+
+        try:
+            # The file becomes the stored copy, the link creation fails if another conversion stored it first
+            os.link(file_path, stored)
+            self._count("added")
+            return stored
+        except FileExistsError:
+            pass
+        except OSError:
+            # Different filesystems or no hard link support, the viewer keeps its own copy
+            self._count("unlinked")
+            return None
+
+        if os.path.samefile(file_path, stored):
+            return stored
+        size = file_path.stat().st_size
+        tmp_path = file_path.with_name(f".{file_path.name}.{uuid.uuid4().hex}.tmp")
+        try:
+            os.link(stored, tmp_path)
+            os.replace(tmp_path, file_path)
+        except OSError:
+            # The stored copy was collected in the meantime, the viewer keeps its own copy
+            tmp_path.unlink(missing_ok=True)
+            self._count("unlinked")
+            return None
+        self._count("linked", size)
+        return stored
+
+
+    def collect_garbage(self) -> dict:
+        """
+        Remove the assets that no viewer links to anymore.
+
+        Returns:
+            dict: Number of removed files and freed bytes
+        """
+        removed = 0
+        freed = 0
+        for directory in sorted(self._path.iterdir()):
+            if not directory.is_dir():
+                continue
+            for file_path in sorted(directory.iterdir()):
+                stat = file_path.stat()
+                if stat.st_nlink <= 1:
+                    file_path.unlink(missing_ok=True)
+                    removed += 1
+                    freed += stat.st_size
+        return {"removed": removed, "bytes_freed": freed}
+
+
+    def stats(self) -> dict:
+        """
+        Get the store counters since it was created.
+
+        Returns:
+            dict: Number of assets added to the store, replaced by a link, or
+                  left in place (no hard link possible), and bytes saved by the links
+        """
+        with self._lock:
+            return dict(self._stats)
+
+
+    def _count(self, name: str, size: int = 0):
+        """
+        Update the store counters.
+
+        Args:
+            name (str): Counter to increment
+            size (int): Bytes saved by the operation
+        """
+        with self._lock:
+            self._stats[name] += 1
+            self._stats["bytes_saved"] += size
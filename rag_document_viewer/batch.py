@@ -0,0 +1,89 @@
+import os, shutil, tempfile, time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import util
+
+from .rag_document_viewer import RAG_DV
+
+# Keys of a batch job that aren't configuration options
+JOB_KEYS = ["file_path", "store_path", "chunks"]
+
+# Private LibreOffice profile and scratch directory of the current worker process
+_worker_dirs = {}
+
+def RAG_DV_batch(jobs: list[dict], workers: int = None) -> list[dict]:
+    """
+    RAG_DV_batch function - Convert many documents in parallel.
+
+    Jobs are fanned out over a pool of processes. Each worker process gets its
+    own LibreOffice user profile and scratch directory, so concurrent
+    LibreOffice and pdf2htmlEX runs don't share state and can saturate the
+    cores of a conversion node.
+
+    Developed by the Preprocess Team (https://preprocess.co)
+
+    Args:
+        jobs (list[dict]): The documents to convert. Each job holds the RAG_DV
+                           arguments: `file_path`, `store_path`, `chunks` and any
+                           configuration option (e.g., `main_color`).
+        workers (int, optional): Number of worker processes. Defaults to the
+                                 number of CPUs.
+
+    Returns:
+        list[dict]: One result per job, in the same order, with the keys
+                    `file_path`, `store_path`, `success`, `error` (None on success)
+                    and `timings` (seconds spent in each conversion stage).
+    """
+    jobs = list(jobs)
+    if len(jobs) == 0:
+        return []
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(jobs)))
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+        return list(executor.map(_run_job, jobs))
+
+
+def _init_worker():
+    """
+    Create the private LibreOffice profile and scratch directory of a worker process.
+    Both are removed when the worker exits.
+    """
+    for name in ["libreoffice_profile", "scratch_dir"]:
+        path = tempfile.mkdtemp(prefix=f"rag-dv-{name.replace('_', '-')}-")
+        _worker_dirs[name] = path
+        util.Finalize(None, shutil.rmtree, args=(path,), kwargs={"ignore_errors": True}, exitpriority=10)
+
+
+def _run_job(job: dict) -> dict:
+    """
+    Convert one document inside a worker process.
+
+    Args:
+        job (dict): RAG_DV arguments and configuration options
+
+    Returns:
+        dict: Result of the conversion
+    """
+    configs = {key: value for key, value in job.items() if key not in JOB_KEYS}
+    for name, path in _worker_dirs.items():
+        configs.setdefault(name, path)
+
+    result = {
+        "file_path": job.get("file_path", None),
+        "store_path": job.get("store_path", None),
+        "success": False,
+        "error": None,
+        "timings": {},
+    }
+
+    started = time.perf_counter()
+    try:
+        result["timings"] = RAG_DV(job.get("file_path", None), job.get("store_path", None), job.get("chunks", []), **configs)
+        result["success"] = True
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+        result["timings"] = {"total": time.perf_counter() - started}
+
+    return result
@@ -0,0 +1,322 @@
+import json, math
+from array import array
+from pathlib import Path
+
+# numpy is optional, it's only used to validate large column sets faster
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Coordinates of a box, as fractions of the page size
+BOX_FIELDS = ["top", "left", "width", "height"]
+
+# Coordinates of a box given with only its page (like the spreadsheet chunks), it covers the whole page
+FULL_PAGE_BOX = {"top": 0.0, "left": 0.0, "width": 1.0, "height": 1.0}
+
+class ChunkStore:
+    """
+    Compact, array-backed storage for the chunk boxes.
+
+    Boxes are kept as columns (page, top, left, width, height), with the boxes
+    of chunk i stored between offsets[i] and offsets[i + 1]. This takes a few
+    bytes per box instead of a Python dict per box, and lets large chunk sets
+    be loaded from an iterator, a JSONL file or existing arrays without ever
+    building the full list of dicts.
+
+    `ChunkStore.load()` accepts every supported input:
+        - a list (or any iterable) of chunks, each chunk a list of box dicts
+          with the keys page, top, left, width and height (a box with only
+          a page covers the whole page)
+        - the path of a JSONL file with one chunk (list of box dicts) per line
+        - a dict of columns: page, top, left, width, height and offsets
+          (lists, arrays or numpy arrays)
+        - a ChunkStore
+    """
+    def __init__(self):
+        """
+        Initialize an empty chunk store.
+        """
+        self._offsets = array("q", [0])
+        self._page = array("q")
+        self._top = array("d")
+        self._left = array("d")
+        self._width = array("d")
+        self._height = array("d")
+
+
+    @classmethod
+    def load(cls, chunks) -> "ChunkStore":
+        """
+        Build a chunk store from any supported chunks input.
+
+        Args:
+            chunks: Chunks as a ChunkStore, an iterable of chunks, a JSONL file path
+                    (str or Path) or a dict of columns
+
+        Returns:
+            ChunkStore: The validated and normalized chunks
+        """
+        if isinstance(chunks, ChunkStore):
+            return chunks
+        if isinstance(chunks, (str, Path)):
+            return cls.from_jsonl(chunks)
+        if isinstance(chunks, dict):
+            return cls.from_columns(**chunks)
+        return cls.from_boxes(chunks)
+
+
+    @classmethod
+    def from_boxes(cls, chunks) -> "ChunkStore":
+        """
+        Build a chunk store from an iterable of chunks, consumed one chunk at a time.
+
+        Args:
+            chunks: Iterable of chunks, each chunk a list of box dicts
+
+        Returns:
+            ChunkStore: The validated and normalized chunks
+        """
+        store = cls()
+        for boxes in chunks:
+            store._append(boxes)
+        store._normalize()
+        return store
+
+
+    @classmethod
+    def from_jsonl(cls, path) -> "ChunkStore":
+        """
+        Build a chunk store from a JSONL file, read line by line.
+
+        Args:
+            path: Path to a file with one chunk (JSON list of box dicts) per line (str or Path)
+
+        Returns:
+            ChunkStore: The validated and normalized chunks
+        """
+        path = Path(path)
+        if not path.exists():
+            raise FileNotFoundError(f"[{path}] not exist, please check.")
+
+        store = cls()
+        with path.open("r") as f:
+            for line in f:
+                if line.strip():
+                    store._append(json.loads(line))
+        store._normalize()
+        return store
+
+
+    @classmethod
+    def from_columns(cls, page, top, left, width, height, offsets) -> "ChunkStore":
+        """
+        Build a chunk store from box columns.
+
+        Args:
+            page: Page number (1 based) of each box
+            top: Top of each box, as a fraction of the page height
+            left: Left of each box, as a fraction of the page width
+            width: Width of each box, as a fraction of the page width
+            height: Height of each box, as a fraction of the page height
+            offsets: Index of the first box of each chunk, followed by the number of boxes
+
+        Returns:
+            ChunkStore: The validated and normalized chunks
+        """
+        store = cls()
+        store._offsets = _to_array("q", offsets)
+        store._page = _to_array("q", page)
+        store._top = _to_array("d", top)
+        store._left = _to_array("d", left)
+        store._width = _to_array("d", width)
+        store._height = _to_array("d", height)
+
+        count = len(store._page)
+        if any(len(x) != count for x in [store._top, store._left, store._width, store._height]):
+            raise ValueError("The chunk box columns must have the same length.")
+        offsets = store._offsets
+        if len(offsets) == 0 or offsets[0] != 0 or offsets[-1] != count:
+            raise ValueError("The chunk offsets must start at 0 and end with the number of boxes.")
+        if any(offsets[i] > offsets[i + 1] for i in range(len(offsets) - 1)):
+            raise ValueError("The chunk offsets must be sorted.")
+
+        store._normalize()
+        return store
+
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+
+    def __getitem__(self, index: int) -> list[dict]:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("chunk index out of range")
+        return [self._box(i) for i in range(self._offsets[index], self._offsets[index + 1])]
+
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+
+    def box_count(self) -> int:
+        """
+        Get the total number of boxes.
+
+        Returns:
+            int: Number of boxes of all chunks
+        """
+        return len(self._page)
+
+
+    def pages(self) -> set[int]:
+        """
+        Get the pages referenced by the boxes.
+
+        Returns:
+            set[int]: Page numbers (1 based)
+        """
+        return set(self._page)
+
+
+    def rows(self):
+        """
+        Iterate over the boxes without building dicts.
+
+        Yields:
+            tuple: (chunk index, page, top, left, width, height) of each box, in chunk order
+        """
+        offsets = self._offsets
+        for chunk in range(len(self)):
+            for i in range(offsets[chunk], offsets[chunk + 1]):
+                yield chunk, self._page[i], self._top[i], self._left[i], self._width[i], self._height[i]
+
+
+    def to_columns(self) -> dict:
+        """
+        Get the boxes as JSON serializable columns, the format accepted by load().
+
+        Returns:
+            dict: page, top, left, width, height and offsets lists
+        """
+        return {
+            "page": self._page.tolist(),
+            "top": self._top.tolist(),
+            "left": self._left.tolist(),
+            "width": self._width.tolist(),
+            "height": self._height.tolist(),
+            "offsets": self._offsets.tolist(),
+        }
+
+
+    def to_json(self) -> str:
+        """
+        Serialize the chunks as a JSON list of lists of box dicts, the format
+        used by the viewer scripts, without building the Python dicts.
+
+        Returns:
+            str: JSON text
+        """
+        offsets = self._offsets
+        parts = []
+        for chunk in range(len(self)):
+            boxes = ", ".join(
+                f'{{"page": {self._page[i]}, "top": {self._top[i]!r}, "left": {self._left[i]!r}, '
+                f'"width": {self._width[i]!r}, "height": {self._height[i]!r}}}'
+                for i in range(offsets[chunk], offsets[chunk + 1])
+            )
+            parts.append(f"[{boxes}]")
+        return f"[{', '.join(parts)}]"
+
+
+    def _append(self, boxes: list):
+        """
+        Append one chunk given as a list of box dicts.
+        Missing coordinates default to the whole page.
+
+        Args:
+            boxes (list): Box dicts of the chunk
+        """
+        chunk = len(self)
+        try:
+            for box in boxes:
+                self._page.append(int(box["page"]))
+                self._top.append(float(box.get("top", FULL_PAGE_BOX["top"])))
+                self._left.append(float(box.get("left", FULL_PAGE_BOX["left"])))
+                self._width.append(float(box.get("width", FULL_PAGE_BOX["width"])))
+                self._height.append(float(box.get("height", FULL_PAGE_BOX["height"])))
+        except (AttributeError, KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"Invalid box in chunk {chunk}, boxes need a numeric page and numeric top, left, width and height values ({e}).")
+        self._offsets.append(len(self._page))
+
+
+    def _normalize(self):
+        """
+        Validate the boxes, which are kept as they are given.
+        Pages and sizes can't be negative, and coordinates must be finite.
+        """
+        if len(self._page) == 0:
+            return
+
+        if numpy is not None:
+            page = numpy.frombuffer(self._page, dtype=numpy.int64)
+            columns = [numpy.frombuffer(getattr(self, f"_{x}"), dtype=numpy.float64) for x in BOX_FIELDS]
+            if page.min() < 0:
+                raise ValueError("Chunk box pages can't be negative.")
+            if not all(numpy.isfinite(x).all() for x in columns):
+                raise ValueError("Chunk box coordinates must be finite numbers.")
+            top, left, width, height = columns
+            if width.min() < 0 or height.min() < 0:
+                raise ValueError("Chunk box sizes can't be negative.")
+            return
+
+        if min(self._page) < 0:
+            raise ValueError("Chunk box pages can't be negative.")
+        if not all(math.isfinite(v) for name in BOX_FIELDS for v in getattr(self, f"_{name}")):
+            raise ValueError("Chunk box coordinates must be finite numbers.")
+        if min(self._width) < 0 or min(self._height) < 0:
+            raise ValueError("Chunk box sizes can't be negative.")
+
+
+    def _box(self, i: int) -> dict:
+        """
+        Build the dict of one box.
+
+        Args:
+            i (int): Box index
+
+        Returns:
+            dict: The box page and coordinates
+        """
+        return {
+            "page": self._page[i],
+            "top": self._top[i],
+            "left": self._left[i],
+            "width": self._width[i],
+            "height": self._height[i],
+        }
+
+
+def _to_array(typecode: str, values) -> array:
+    """
+    Convert a column to an array, without copying element by element when it's
+    already a buffer of the right type.
+
+    Args:
+        typecode (str): array typecode, "q" for pages and offsets or "d" for coordinates
+        values: List, array or numpy array
+
+    Returns:
+        array: The column
+    """
+    if numpy is not None and isinstance(values, numpy.ndarray):
+        dtype = numpy.int64 if typecode == "q" else numpy.float64
+        return array(typecode, numpy.ascontiguousarray(values, dtype=dtype).tobytes())
+    if isinstance(values, array) and values.typecode == typecode:
+        return array(typecode, values)
+    if typecode == "q":
+        return array(typecode, (int(x) for x in values))
+    return array(typecode, (float(x) for x in values))
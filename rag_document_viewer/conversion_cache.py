@@ -0,0 +1,218 @@
+import hashlib, json, os, shutil, time, uuid
+from functools import lru_cache
+from pathlib import Path
+from subprocess import run, SubprocessError
+
+# Default disk budget for the cache (5 GiB)
+DEFAULT_CACHE_MAX_SIZE = 5 * 1024 ** 3
+
+class ConversionCache:
+    """
+    Content-addressed cache for the expensive conversion stages.
+
+    Each entry holds the files produced by LibreOffice and pdf2htmlEX for one
+    input document (the intermediate PDF and the HTML/CSS/font/image output),
+    keyed on the input file hash, the converter versions and the render options.
+    Entries are evicted least-recently-used first once the cache grows past
+    its disk budget.
+
+    Layout on disk:
+        <cache_dir>/<key>/meta.json   - entry metadata (size, stored state)
+        <cache_dir>/<key>/files/...   - the cached conversion output
+    The modification time of meta.json is used as the last access time.
+    """
+    def __init__(self, cache_dir, max_size: int = DEFAULT_CACHE_MAX_SIZE):
+        """
+        Initialize the conversion cache.
+
+        Args:
+            cache_dir (str): Directory where cache entries are stored
+            max_size (int): Disk budget in bytes, older entries are evicted above it
+        """
+        self._dir = Path(cache_dir)
+        self._max_size = int(max_size)
+        self._dir.mkdir(parents=True, exist_ok=True)
+
+
+    def make_key(self, file_path, options: dict) -> str:
+        """
+        Build the cache key for a document.
+
+        Args:
+            file_path: Path to the input document (str or Path)
+            options (dict): Render options that affect the conversion output
+
+        Returns:
+            str: Hex digest identifying the conversion result
+        """
+        digest = hashlib.sha256()
+        digest.update(self._hash_file(file_path).encode())
+        digest.update(json.dumps(get_converter_versions(), sort_keys=True).encode())
+        digest.update(json.dumps(options, sort_keys=True, default=str).encode())
+        return digest.hexdigest()
+
+
+    def get(self, key: str, destination) -> dict:
+        """
+        Copy a cached entry into the destination directory.
+
+        Args:
+            key (str): Cache key from make_key()
+            destination: Directory to restore the files into (str or Path)
+
+        Returns:
+            dict: Metadata stored with the entry, or None on a cache miss
+        """
+        entry = self._dir / key
+        meta_path = entry / "meta.json"
+        if not meta_path.exists():
+            return None
+
+        destination = Path(destination)
+        restored = []
+        try:
+            meta = json.loads(meta_path.read_text())
+            for file_path in sorted((entry / "files").iterdir()):
+                target = destination / file_path.name
+                if file_path.is_dir():
+                    shutil.copytree(file_path, target)
+                else:
+                    # Files are copied, not linked, because later stages rewrite them in place
+                    shutil.copy2(file_path, target)
+                restored.append(target)
+            # Mark the entry as recently used
+            os.utime(meta_path)
+        except (FileNotFoundError, json.JSONDecodeError):
+            # The entry was evicted or is incomplete, undo the partial restore
+            for target in restored:
+                if target.is_dir():
+                    shutil.rmtree(target, ignore_errors=True)
+                else:
+                    target.unlink(missing_ok=True)
+            return None
+
+        return meta
+
+
+    def put(self, key: str, paths: list, meta: dict = None):
+        """
+        Store conversion output in the cache and evict old entries if needed.
+
+        Args:
+            key (str): Cache key from make_key()
+            paths (list): Files and directories produced by the conversion
+            meta (dict, optional): Extra state needed to resume from the entry
+        """
+        entry = self._dir / key
+        if entry.exists():
+            return
+
+        # Build the entry in a private directory and rename it into place, so
+        # concurrent readers never see a half written entry
+        tmp_entry = self._dir / f".tmp-{key}-{uuid.uuid4().hex}"
+        files_dir = tmp_entry / "files"
+        files_dir.mkdir(parents=True)
+
+        size = 0
+        for path in paths:
+            path = Path(path)
+            target = files_dir / path.name
+            if path.is_dir():
+                shutil.copytree(path, target)
+            else:
+                shutil.copy2(path, target)
+        for file_path in files_dir.rglob("*"):
+            if file_path.is_file():
+                size += file_path.stat().st_size
+
+        meta = dict(meta or {})
+        meta["size"] = size
+        meta["created"] = time.time()
+        (tmp_entry / "meta.json").write_text(json.dumps(meta))
+
+        try:
+            tmp_entry.rename(entry)
+        except OSError:
+            # Another process stored the same entry first
+            shutil.rmtree(tmp_entry, ignore_errors=True)
+
+        self.evict()
+
+
+    def evict(self):
+        """
+        Remove least recently used entries until the cache fits its disk budget.
+        """
+        entries = []
+        total = 0
+        for entry in self._dir.iterdir():
+            meta_path = entry / "meta.json"
+            if entry.name.startswith(".") or not meta_path.exists():
+                continue
+            try:
+                size = json.loads(meta_path.read_text()).get("size", 0)
+                last_access = meta_path.stat().st_mtime
+            except (FileNotFoundError, json.JSONDecodeError):
+                continue
+            entries.append((last_access, size, entry))
+            total += size
+
+        for last_access, size, entry in sorted(entries):
+            if total <= self._max_size:
+                break
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+
+
+    def size(self) -> int:
+        """
+        Get the total size of the cached entries.
+
+        Returns:
+            int: Size of all entries in bytes
+        """
+        total = 0
+        for meta_path in self._dir.glob("*/meta.json"):
+            try:
+                total += json.loads(meta_path.read_text()).get("size", 0)
+            except (FileNotFoundError, json.JSONDecodeError):
+                continue
+        return total
+
+
+    def _hash_file(self, file_path) -> str:
+        """
+        Hash a file's contents without loading it fully into memory.
+
+        Args:
+            file_path: Path to the file (str or Path)
+
+        Returns:
+            str: SHA-256 hex digest of the file contents
+        """
+        digest = hashlib.sha256()
+        with Path(file_path).open("rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+
+@lru_cache(maxsize=None)
+def get_converter_versions() -> dict:
+    """
+    Get the installed LibreOffice and pdf2htmlEX versions.
+    The result is computed once per process.
+
+    Returns:
+        dict: Version string for each converter, "unavailable" if it's not installed
+    """
+    versions = {}
+    for tool in ["libreoffice", "pdf2htmlEX"]:
+        try:
+            result = run([tool, "--version"], capture_output=True, timeout=60)
+            # pdf2htmlEX prints its version on stderr
+            output = (result.stdout or result.stderr).decode(errors="ignore").strip()
+            versions[tool] = output.splitlines()[0] if output else "unknown"
+        except (OSError, SubprocessError):
+            versions[tool] = "unavailable"
+    return versions
@@ -0,0 +1,60 @@
+import re
+from pathlib import Path
+from .pdf_sharding import GENERATED_CLASS
+from .streaming import DEFAULT_BLOCK_SIZE
+
+# class attributes of the HTML tags
+CLASS_ATTRIBUTE = re.compile(r"""\bclass=(["'])(.*?)\1""", re.DOTALL)
+
+# Rules of a single generated class (or one scoped to a page range, like ".fc1_s2"),
+# starting a rule so no selector list or combinator is cut
+GENERATED_RULE = re.compile(rf"(?:\A|(?<=[{{}}])|(?<=\*/))\s*\.({GENERATED_CLASS}(?:_s\d+)?)\{{[^{{}}]*\}}")
+
+def collect_classes(paths: list, block_size: int = DEFAULT_BLOCK_SIZE) -> set[str]:
+    """
+    Get the class names used by HTML files, reading them block by block.
+
+    Args:
+        paths (list): HTML files (str or Path)
+        block_size (int): Number of characters read at once
+
+    Returns:
+        set[str]: Class names found in the class attributes
+    """
+    classes = set()
+    for path in paths:
+        with Path(path).open("r") as f:
+            carry = ""
+            for block in iter(lambda: f.read(block_size), ""):
+                # Blocks are cut after a tag, so no attribute is split
+                text = carry + block
+                cut = text.rfind(">") + 1
+                for match in CLASS_ATTRIBUTE.finditer(text, 0, cut):
+                    classes.update(match.group(2).split())
+                carry = text[cut:]
+            for match in CLASS_ATTRIBUTE.finditer(carry):
+                classes.update(match.group(2).split())
+    return classes
+
+
+def get_pruning_substitution(used_classes: set[str], report: dict = None):
+    """
+    Build the stylesheet substitution removing the rules of the generated
+    classes no HTML element uses. Other rules are kept as they are.
+
+    Args:
+        used_classes (set[str]): Class names used by the document
+        report (dict, optional): Counters updated while rewriting, "rules" and "bytes" removed
+
+    Returns:
+        tuple: Regex pattern and replacement function, for rewrite_css_file()
+    """
+    def replace(match):
+        if match.group(1) in used_classes:
+            return match.group(0)
+        if report is not None:
+            report["rules"] = report.get("rules", 0) + 1
+            report["bytes"] = report.get("bytes", 0) + len(match.group(0))
+        return ""
+
+    return GENERATED_RULE.pattern, replace
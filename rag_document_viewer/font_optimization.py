@@ -0,0 +1,118 @@
+import os, re
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+# fontTools is optional, it's only needed by the font optimization stage
+# (WOFF2 compression also needs the brotli package)
+try:
+    from fontTools.ttLib import TTFont
+except ImportError:
+    TTFont = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Tables browsers never read: signatures, editor timestamps and device specific hinting metrics
+DROPPED_TABLES = ["DSIG", "FFTM", "LTSH", "PCLT", "VDMX", "hdmx"]
+
+# Font faces of a stylesheet, like 'url(../fonts/f1.woff)format("woff")'
+FONT_URL = re.compile(r"""url\((["']?)([^)"']*?)([^/)"']+)\.woff\1\)(\s*format\((["']?)woff\5\))?""")
+
+def check_font_optimization():
+    """
+    Make sure the packages needed to write WOFF2 fonts are installed.
+    """
+    if TTFont is None or brotli is None:
+        raise ImportError("The font optimization needs the fonttools and brotli packages (pip install fonttools brotli).")
+
+
+def optimize_font(path) -> tuple[str, int, int]:
+    """
+    Recompress a WOFF font to WOFF2 without the tables browsers don't use.
+    The original file is replaced by a .woff2 file with the same stem.
+
+    Args:
+        path: Path to the .woff font (str or Path)
+
+    Returns:
+        tuple[str, int, int]: Path of the font (the original one if it couldn't be
+                              converted), and its size before and after
+    """
+    path = Path(path)
+    size = path.stat().st_size
+    target = path.with_suffix(".woff2")
+    tmp_path = target.with_name(f".{target.name}.tmp")
+    try:
+        # Keep head.modified, so the same font always gives the same bytes (and the same content hash)
+        font = TTFont(str(path), recalcTimestamp=False)
+        for tag in DROPPED_TABLES:
+            if tag in font:
+                del font[tag]
+        font.flavor = "woff2"
+        font.save(str(tmp_path))
+        font.close()
+    except Exception:
+        # Fonts fontTools can't read are kept as they are
+        tmp_path.unlink(missing_ok=True)
+        return str(path), size, size
+
+    os.replace(tmp_path, target)
+    path.unlink()
+    return str(target), size, target.stat().st_size
+
+
+def optimize_fonts(paths: list, workers: int = None) -> dict:
+    """
+    Recompress fonts to WOFF2 on a process pool, fontTools being pure Python.
+
+    Args:
+        paths (list): .woff fonts (str or Path)
+        workers (int, optional): Number of processes, defaults to the number of CPUs
+
+    Returns:
+        dict: "fonts" (converted .woff names), "converted" and "failed" counts,
+              "bytes_before" and "bytes_after"
+    """
+    check_font_optimization()
+    report = {"fonts": set(), "converted": 0, "failed": 0, "bytes_before": 0, "bytes_after": 0}
+    if len(paths) == 0:
+        return report
+
+    workers = min(workers or os.cpu_count() or 1, len(paths))
+    if workers == 1:
+        results = [optimize_font(x) for x in paths]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(optimize_font, paths, chunksize=max(1, len(paths) // (workers * 4))))
+
+    for original, (path, before, after) in zip(paths, results):
+        report["bytes_before"] += before
+        report["bytes_after"] += after
+        if path.endswith(".woff2"):
+            report["converted"] += 1
+            report["fonts"].add(Path(original).name)
+        else:
+            report["failed"] += 1
+    return report
+
+
+def get_font_substitution(fonts: set):
+    """
+    Build the stylesheet substitution pointing the font faces to the WOFF2 fonts.
+
+    Args:
+        fonts (set): Names of the .woff fonts converted to WOFF2
+
+    Returns:
+        tuple: Regex pattern and replacement function, for rewrite_css_file()
+    """
+    def replace(match):
+        quote, directory, stem = match.group(1), match.group(2), match.group(3)
+        if f"{stem}.woff" not in fonts:
+            return match.group(0)
+        font_format = f'format({match.group(5)}woff2{match.group(5)})' if match.group(4) else ""
+        return f"url({quote}{directory}{stem}.woff2{quote}){font_format}"
+
+    return FONT_URL.pattern, replace
@@ -0,0 +1,241 @@
+import re
+from pathlib import Path
+
+# Size classes of the pdf2htmlEX stylesheet, like ".w0{width:612.000000px;}" (or ".w0_s1" for a page range)
+SIZE_RULE = re.compile(r"\.([wh][0-9a-f]+(?:_s\d+)?)\{(width|height):(-?[0-9.]+)px;\}")
+PAGE_TAG = re.compile(r"<div\b[^>]*>")
+CLASS_ATTRIBUTE = re.compile(r"""\bclass=["']([^"']*)["']""")
+
+# Gap, in page pixels, under which two aligned boxes of a chunk are merged
+MERGE_TOLERANCE = 2.0
+
+# Boxes of a chunk page above which they are kept as they are, merging them
+# costs more than drawing them
+MERGE_LIMIT = 1000
+
+# Page size used for the merge tolerance when the page sizes are unknown
+DEFAULT_PAGE_SIZE = (612.0, 792.0)
+
+# Decimals kept for the precomputed percentages and bookmark positions
+PRECISION = 4
+
+def read_page_sizes(css_path, html_path, block_size: int = 1024 ** 2) -> list[tuple[float, float]]:
+    """
+    Get the size of each page of a pdf2htmlEX output.
+    The page frames reference width and height classes defined in the
+    stylesheet. Both files are read block by block.
+
+    Args:
+        css_path: Path to the pdf2htmlEX stylesheet (str or Path)
+        html_path: Path to the HTML holding the page frames (str or Path)
+        block_size (int): Number of characters read at once
+
+    Returns:
+        list[tuple[float, float]]: Width and height in pixels of each page frame, in
+                                   document order (None for a page with an unknown size)
+    """
+    # Screen rules come before the "@media print" ones, so the first definition is kept
+    sizes = {}
+    for text in _read_blocks(css_path, "}", block_size):
+        for name, _, value in SIZE_RULE.findall(text):
+            sizes.setdefault(name, float(value))
+
+    pages = []
+    for text in _read_blocks(html_path, ">", block_size):
+        for tag in PAGE_TAG.findall(text):
+            match = CLASS_ATTRIBUTE.search(tag)
+            classes = match.group(1).split() if match else []
+            if "pf" not in classes:
+                continue
+            width = next((sizes[x] for x in classes if x[0] == "w" and x in sizes), None)
+            height = next((sizes[x] for x in classes if x[0] == "h" and x in sizes), None)
+            pages.append((width, height) if width and height else None)
+    return pages
+
+
+def iter_chunk_geometry(chunks, page_sizes: list = None, rendered_pages: list = None):
+    """
+    Precompute the geometry drawn by the viewer, one chunk at a time.
+
+    Boxes of a chunk on the same page that overlap or touch along an aligned
+    edge are merged, coordinates are turned into percentages of the page, and
+    the scrollbar bookmark of the chunk is placed as a fraction of the
+    document height. Only the boxes of the current chunk are held in memory.
+
+    Args:
+        chunks (ChunkStore): The chunks to draw
+        page_sizes (list, optional): Width and height of each rendered page, from read_page_sizes()
+        rendered_pages (list, optional): Document page of each rendered page, None if all pages are rendered
+
+    Yields:
+        list: [slide, bookmark, boxes] for each chunk, where slide is 1 if a box covers
+              a full page, bookmark is the position of its first box as a fraction of the
+              document height (None if unknown), and boxes are [page, left, top, width, height]
+              lists with percentages of the page size, on rendered pages only
+    """
+    page_sizes = page_sizes or []
+    if rendered_pages is None:
+        page_index = {x + 1: x for x in range(len(page_sizes))} if page_sizes else None
+    else:
+        page_index = {page: i for i, page in enumerate(rendered_pages)}
+
+    # Top of each rendered page, as a fraction of the document height
+    page_tops = None
+    if page_sizes and all(x is not None for x in page_sizes):
+        total = sum(x[1] for x in page_sizes)
+        page_tops = []
+        position = 0.0
+        for width, height in page_sizes:
+            page_tops.append((position / total, height / total))
+            position += height
+
+    current = 0
+    slide = 0
+    boxes = []
+    for chunk, page, top, left, width, height in chunks.rows():
+        while chunk != current:
+            # Chunks without boxes don't appear in the rows
+            yield _finish_chunk(slide, boxes, page_sizes, page_index, page_tops)
+            current += 1
+            slide = 0
+            boxes = []
+        if left == 0 and top == 0 and width == 1 and height == 1:
+            slide = 1
+        if page_index is not None and page not in page_index:
+            # The page of this box was not rendered
+            continue
+        boxes.append([page, left, top, width, height])
+    while current < len(chunks):
+        yield _finish_chunk(slide, boxes, page_sizes, page_index, page_tops)
+        current += 1
+        slide = 0
+        boxes = []
+
+
+def merge_boxes(boxes: list, tolerance: tuple[float, float] = (0.0, 0.0)) -> list:
+    """
+    Merge the boxes of a chunk page when their union is still a rectangle:
+    boxes contained in another one, boxes of the same column that overlap
+    or touch vertically, and boxes of the same row that overlap or touch
+    horizontally.
+
+    Merged boxes always overlap or touch horizontally, so the boxes are
+    sorted by left edge and each one is only compared with the following
+    boxes starting before its right edge. A box keeps absorbing the boxes
+    it merges with, and the sweep is repeated until nothing merges. Pages
+    with more than MERGE_LIMIT boxes are kept as they are.
+
+    Args:
+        boxes (list): [left, top, width, height] boxes of one page, as page fractions
+        tolerance (tuple[float, float]): Horizontal and vertical gap, as page fractions,
+                                         under which edges are considered aligned or touching
+
+    Returns:
+        list: The merged boxes, in the order of their first box
+    """
+    if len(boxes) > MERGE_LIMIT:
+        return [list(x) for x in boxes]
+
+    tx, ty = tolerance
+    # [left, top, right, bottom, index of the first box, box if nothing was merged into it], by left edge
+    items = sorted(([x[0], x[1], x[0] + x[2], x[1] + x[3], i, x] for i, x in enumerate(boxes)), key=lambda x: x[0])
+    changed = True
+    while changed:
+        changed = False
+        for i, a in enumerate(items):
+            if a is None:
+                continue
+            j = i + 1
+            while j < len(items) and (items[j] is None or items[j][0] <= a[2] + tx):
+                b = items[j]
+                j += 1
+                if b is None:
+                    continue
+                same_column = abs(a[0] - b[0]) <= tx and abs(a[2] - b[2]) <= tx
+                same_row = abs(a[1] - b[1]) <= ty and abs(a[3] - b[3]) <= ty
+                touch_y = b[1] <= a[3] + ty and a[1] <= b[3] + ty
+                contains = (
+                    (a[0] <= b[0] and a[1] <= b[1] and a[2] >= b[2] and a[3] >= b[3])
+                    or (b[0] <= a[0] and b[1] <= a[1] and b[2] >= a[2] and b[3] >= a[3])
+                )
+                # b starts before the right edge of a, so they touch horizontally
+                if contains or (same_column and touch_y) or same_row:
+                    # b never starts left of a, the order by left edge is kept
+                    a[1:] = [min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3]), min(a[4], b[4]), None]
+                    items[j - 1] = None
+                    changed = True
+        items = [x for x in items if x is not None]
+
+    items.sort(key=lambda x: x[4])
+    return [list(box) if box is not None else [left, top, right - left, bottom - top] for left, top, right, bottom, _, box in items]
+
+
+def _finish_chunk(slide: int, boxes: list, page_sizes: list, page_index: dict, page_tops: list) -> list:
+    """
+    Merge the boxes of a chunk page by page, convert them to percentages and place its bookmark.
+
+    Args:
+        slide (int): 1 if a box of the chunk covers a full page
+        boxes (list): [page, left, top, width, height] boxes of the chunk, as page fractions
+        page_sizes (list): Width and height of each rendered page
+        page_index (dict): Rendered page index of each document page, None if unknown
+        page_tops (list): Top and height of each rendered page as document fractions, None if unknown
+
+    Returns:
+        list: [slide, bookmark, boxes] geometry of the chunk
+    """
+    entry = [slide, None, []]
+    if len(boxes) == 0:
+        return entry
+
+    # Group the boxes by page, keeping the order of their first box
+    pages = {}
+    for page, left, top, width, height in boxes:
+        pages.setdefault(page, []).append([left, top, width, height])
+
+    for page, page_boxes in pages.items():
+        index = page_index.get(page) if page_index is not None else None
+        size = page_sizes[index] if index is not None and index < len(page_sizes) else None
+        width, height = size if size is not None else DEFAULT_PAGE_SIZE
+        for left, top, box_width, box_height in merge_boxes(page_boxes, (MERGE_TOLERANCE / width, MERGE_TOLERANCE / height)):
+            entry[2].append([
+                page,
+                round(left * 100, PRECISION),
+                round(top * 100, PRECISION),
+                round(box_width * 100, PRECISION),
+                round(box_height * 100, PRECISION),
+            ])
+
+    # The bookmark points to the first box of the chunk
+    page, top = boxes[0][0], boxes[0][2]
+    if page_tops is not None and page_index is not None and page_index.get(page, len(page_tops)) < len(page_tops):
+        page_top, page_height = page_tops[page_index[page]]
+        entry[1] = round(page_top + top * page_height, PRECISION + 2)
+    return entry
+
+
+def _read_blocks(path, separator: str, block_size: int):
+    """
+    Read a text file block by block, each block cut after its last separator.
+
+    Args:
+        path: Path to the file (str or Path)
+        separator (str): Character after which blocks are cut
+        block_size (int): Number of characters read at once
+
+    Yields:
+        str: Blocks of the file
+    """
+    path = Path(path)
+    if not path.exists():
+        return
+    with path.open("r") as f:
+        carry = ""
+        for block in iter(lambda: f.read(block_size), ""):
+            text = carry + block
+            cut = text.rfind(separator) + 1
+            if cut > 0:
+                yield text[:cut]
+            carry = text[cut:]
+        if carry:
+            yield carry
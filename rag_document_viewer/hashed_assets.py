@@ -0,0 +1,111 @@
+import hashlib, os, re
+from pathlib import Path
+from .streaming import DEFAULT_BLOCK_SIZE, rewrite_css_file, rewrite_html_file
+
+# Number of hex digits of the SHA-256 digest kept in the file names
+HASH_LENGTH = 20
+
+# url() references of a stylesheet, like "src:url(../fonts/f1.woff)"
+CSS_URL = re.compile(r"""url\((["']?)([^)"']+)\1\)""")
+
+# Attributes of the HTML tags referencing an asset
+URL_ATTRIBUTES = ["src", "href", "data-page-url"]
+
+def file_digest(path, block_size: int = DEFAULT_BLOCK_SIZE) -> str:
+    """
+    Hash the content of a file, block by block.
+
+    Args:
+        path: Path to the file (str or Path)
+        block_size (int): Number of bytes read at once
+
+    Returns:
+        str: Hex SHA-256 digest of the file
+    """
+    digest = hashlib.sha256()
+    with Path(path).open("rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def hash_file_name(path, block_size: int = DEFAULT_BLOCK_SIZE) -> Path:
+    """
+    Rename a file after the hash of its content, keeping its directory and extension.
+    Files with the same content get the same name, so they are stored once.
+
+    Args:
+        path: Path to the file (str or Path)
+        block_size (int): Number of bytes read at once
+
+    Returns:
+        Path: New path of the file
+    """
+    path = Path(path)
+    new_path = path.with_name(f"{file_digest(path, block_size)[:HASH_LENGTH]}{path.suffix}")
+    os.replace(path, new_path)
+    return new_path
+
+
+def rewrite_url(url: str, base_dir: Path, renamed: dict) -> str:
+    """
+    Get the new URL of a renamed file.
+
+    Args:
+        url (str): Relative URL of the file
+        base_dir (Path): Directory the URL is relative to
+        renamed (dict): New path of each renamed file, keyed by its resolved original path
+
+    Returns:
+        str: The URL pointing to the new name, or None if the file wasn't renamed
+    """
+    if not url or url.startswith(("#", "/", "data:")) or "://" in url:
+        return None
+
+    # Keep the query string and fragment, like the "#iefix" of font URLs
+    cut = min([x for x in [url.find("?"), url.find("#")] if x >= 0], default=len(url))
+    target = renamed.get((base_dir / url[:cut]).resolve())
+    if target is None:
+        return None
+    directory, separator, _ = url[:cut].rpartition("/")
+    return f"{directory}{separator}{target.name}{url[cut:]}"
+
+
+def rewrite_css_urls(path, renamed: dict, block_size: int = DEFAULT_BLOCK_SIZE):
+    """
+    Point the url() references of a stylesheet to the renamed files, block by block.
+
+    Args:
+        path: Path to the stylesheet, rewritten in place (str or Path)
+        renamed (dict): New path of each renamed file, keyed by its resolved original path
+        block_size (int): Number of characters read at once
+    """
+    path = Path(path)
+
+    def replace(match):
+        url = rewrite_url(match.group(2), path.parent, renamed)
+        return match.group(0) if url is None else f"url({match.group(1)}{url}{match.group(1)})"
+
+    rewrite_css_file(path, [(CSS_URL.pattern, replace)], block_size)
+
+
+def rewrite_html_urls(path, base_dir: Path, renamed: dict, block_size: int = DEFAULT_BLOCK_SIZE):
+    """
+    Point the asset attributes of an HTML file to the renamed files, token by token.
+
+    Args:
+        path: Path to the HTML file, rewritten in place (str or Path)
+        base_dir (Path): Directory the URLs of the file are relative to
+        renamed (dict): New path of each renamed file, keyed by its resolved original path
+        block_size (int): Number of characters read at once
+    """
+    def rewrite_attributes(tag, attrs):
+        changed = False
+        for name in URL_ATTRIBUTES:
+            url = rewrite_url(attrs.get(name), base_dir, renamed)
+            if url is not None:
+                attrs[name] = url
+                changed = True
+        return attrs if changed else None
+
+    rewrite_html_file(path, block_size, rewrite_attributes=rewrite_attributes)
@@ -0,0 +1,150 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+# Pillow is optional, it's only needed by the image optimization stage
+try:
+    from PIL import Image, features
+except ImportError:
+    Image = None
+
+# Images handled by the optimization stage
+IMAGE_SUFFIXES = [".png", ".jpg", ".jpeg"]
+
+# Output formats: "png" keeps the original format and only recompresses losslessly
+IMAGE_FORMATS = {"png": None, "webp": ".webp", "avif": ".avif"}
+
+# pdf2htmlEX page sizes are in CSS pixels of 1/72 inch
+PIXELS_PER_INCH = 72
+
+def check_image_optimization(image_format: str = "png"):
+    """
+    Make sure Pillow is installed and can write the requested format.
+
+    Args:
+        image_format (str): "png", "webp" or "avif"
+    """
+    if image_format not in IMAGE_FORMATS:
+        raise ValueError(f"Unknown image format [{image_format}], use {list(IMAGE_FORMATS)}.")
+    if Image is None:
+        raise ImportError("The image optimization needs the Pillow package (pip install pillow).")
+    if image_format != "png" and not features.check(image_format):
+        raise ImportError(f"This Pillow build can't write {image_format.upper()} images.")
+
+
+def get_max_image_size(max_dpi: int, page_sizes: list) -> tuple[int, int]:
+    """
+    Get the pixel size above which images are downscaled.
+
+    The size is computed for an image covering the largest page, like a page
+    background. Smaller images are displayed in less space, so their actual
+    resolution stays above max_dpi after downscaling.
+
+    Args:
+        max_dpi (int): Resolution to keep, None to never downscale
+        page_sizes (list): Width and height of each page, in CSS pixels
+
+    Returns:
+        tuple[int, int]: Maximum width and height, None if images are never downscaled
+    """
+    if not max_dpi:
+        return None
+    widths = [x[0] for x in page_sizes if x is not None]
+    heights = [x[1] for x in page_sizes if x is not None]
+    width = max(widths) if widths else 612
+    height = max(heights) if heights else 792
+    return round(max_dpi * width / PIXELS_PER_INCH), round(max_dpi * height / PIXELS_PER_INCH)
+
+
+def optimize_image(path, image_format: str = "png", quality: int = 80, max_size: tuple[int, int] = None) -> tuple[str, int, int]:
+    """
+    Downscale an image above the maximum size, then recompress it losslessly or
+    transcode it. The result is only kept when it's smaller than the original.
+
+    Args:
+        path: Path to the PNG or JPEG image (str or Path)
+        image_format (str): "png" to keep the format, "webp" or "avif" to transcode
+        quality (int): Quality of the transcoded images, from 0 to 100
+        max_size (tuple[int, int], optional): Size above which the image is downscaled
+
+    Returns:
+        tuple[str, int, int]: Path of the image (with the new extension if transcoded),
+                              and its size before and after
+    """
+    path = Path(path)
+    size = path.stat().st_size
+    suffix = IMAGE_FORMATS[image_format] or path.suffix
+    target = path.with_suffix(suffix)
+    tmp_path = target.with_name(f".{target.name}.tmp")
+    try:
+        with Image.open(path) as image:
+            image.load()
+            resized = image
+            if max_size is not None:
+                # Keep the resolution on both axes, so the largest ratio is used
+                scale = max(max_size[0] / image.width, max_size[1] / image.height)
+                if scale < 1:
+                    resized = image.resize((max(1, round(image.width * scale)), max(1, round(image.height * scale))), Image.LANCZOS)
+
+            if suffix == ".png":
+                resized.save(tmp_path, format="PNG", optimize=True)
+            elif suffix in [".jpg", ".jpeg"]:
+                options = {"quality": "keep"} if resized is image and image.format == "JPEG" else {"quality": 90}
+                resized.convert("RGB").save(tmp_path, format="JPEG", optimize=True, progressive=True, **options)
+            else:
+                if resized.mode not in ["RGB", "RGBA"]:
+                    resized = resized.convert("RGBA" if "transparency" in resized.info or "A" in resized.mode else "RGB")
+                resized.save(tmp_path, format=image_format.upper(), quality=quality)
+    except Exception:
+        # Images Pillow can't read are kept as they are
+        tmp_path.unlink(missing_ok=True)
+        return str(path), size, size
+
+    new_size = tmp_path.stat().st_size
+    if new_size >= size:
+        tmp_path.unlink()
+        return str(path), size, size
+    os.replace(tmp_path, target)
+    if target != path:
+        path.unlink()
+    return str(target), size, new_size
+
+
+def optimize_images(paths: list, image_format: str = "png", quality: int = 80, max_size: tuple[int, int] = None,
+                    workers: int = None) -> dict:
+    """
+    Optimize images on a process pool.
+
+    Args:
+        paths (list): PNG and JPEG images (str or Path)
+        image_format (str): "png" to keep the format, "webp" or "avif" to transcode
+        quality (int): Quality of the transcoded images, from 0 to 100
+        max_size (tuple[int, int], optional): Size above which images are downscaled
+        workers (int, optional): Number of processes, defaults to the number of CPUs
+
+    Returns:
+        dict: "renamed" (new path of each transcoded image, keyed by its resolved
+              original path), "optimized" count, "bytes_before" and "bytes_after"
+    """
+    check_image_optimization(image_format)
+    report = {"renamed": {}, "optimized": 0, "bytes_before": 0, "bytes_after": 0}
+    if len(paths) == 0:
+        return report
+
+    paths = [Path(x) for x in paths]
+    arguments = [(x, image_format, quality, max_size) for x in paths]
+    workers = min(workers or os.cpu_count() or 1, len(paths))
+    if workers == 1:
+        results = [optimize_image(*x) for x in arguments]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(optimize_image, *zip(*arguments), chunksize=max(1, len(paths) // (workers * 4))))
+
+    for original, (path, before, after) in zip(paths, results):
+        report["bytes_before"] += before
+        report["bytes_after"] += after
+        if after < before:
+            report["optimized"] += 1
+        if Path(path) != original:
+            report["renamed"][original.resolve()] = Path(path)
+    return report
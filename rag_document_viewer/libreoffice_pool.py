@@ -0,0 +1,439 @@
+import os, queue, shutil, tempfile, threading, time, uuid
+from pathlib import Path
+from subprocess import Popen, DEVNULL, TimeoutExpired
+
+# The UNO bridge ships with LibreOffice (python3-uno on Debian/Ubuntu), it's only
+# needed when a worker pool is used
+try:
+    import uno
+    from com.sun.star.beans import PropertyValue
+except ImportError:
+    uno = None
+
+# Export filters used by each LibreOffice document type
+PDF_FILTERS = {
+    "com.sun.star.sheet.SpreadsheetDocument": "calc_pdf_Export",
+    "com.sun.star.presentation.PresentationDocument": "impress_pdf_Export",
+    "com.sun.star.drawing.DrawingDocument": "draw_pdf_Export",
+    "com.sun.star.text.TextDocument": "writer_pdf_Export",
+}
+HTML_FILTERS = {
+    "com.sun.star.sheet.SpreadsheetDocument": "HTML (StarCalc)",
+    "com.sun.star.text.TextDocument": "HTML (StarWriter)",
+}
+
+class LibreOfficePool:
+    """
+    Pool of long-lived LibreOffice processes used for document conversion.
+
+    Starting soffice costs seconds per document, so instead of spawning a cold
+    `libreoffice --headless` for every file, conversions are sent to warm
+    workers over a local UNO pipe. Each worker has its own user profile, dead
+    or hung workers are restarted, and queue wait and conversion times are
+    collected for monitoring.
+
+    Pass the pool to the viewer with the `libreoffice_pool` option:
+
+        pool = LibreOfficePool(size=4)
+        RAG_DV(file_path, store_path, chunks, libreoffice_pool=pool)
+        pool.close()
+    """
+    def __init__(self, size: int = 2, binary: str = "soffice", startup_timeout: int = 60,
+                 conversion_timeout: int = 600, health_check_interval: int = 30):
+        """
+        Initialize the pool. Workers are started on the first conversion.
+
+        Args:
+            size (int): Number of LibreOffice workers
+            binary (str): LibreOffice executable
+            startup_timeout (int): Seconds to wait for a worker to accept connections
+            conversion_timeout (int): Seconds before a conversion is killed
+            health_check_interval (int): Seconds between background health checks, 0 disables them
+        """
+        if uno is None:
+            raise ImportError("The LibreOffice worker pool needs the LibreOffice python bridge (python3-uno).")
+        if size < 1:
+            raise ValueError("The LibreOffice worker pool needs at least one worker.")
+
+        self._size = size
+        self._binary = binary
+        self._startup_timeout = startup_timeout
+        self._conversion_timeout = conversion_timeout
+        self._health_check_interval = health_check_interval
+
+        self._workers = []
+        self._idle = queue.Queue()
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+        self._health_thread = None
+        self._stats = {
+            "conversions": 0,
+            "failures": 0,
+            "restarts": 0,
+            "queue_wait_total": 0.0,
+            "queue_wait_max": 0.0,
+            "conversion_time_total": 0.0,
+            "conversion_time_max": 0.0,
+        }
+
+
+    def __enter__(self):
+        self.start()
+        return self
+
+
+    def __exit__(self, *args):
+        self.close()
+
+
+    def start(self):
+        """
+        Start the LibreOffice workers and the background health checks.
+        """
+        with self._lock:
+            # Checked under the lock, so no worker is started once close() began
+            if self._closed.is_set():
+                raise Exception("The LibreOffice worker pool is closed.")
+            if self._workers:
+                return
+            for index in range(self._size):
+                worker = _LibreOfficeWorker(index, self._binary, self._startup_timeout)
+                worker.start()
+                self._workers.append(worker)
+                self._idle.put(worker)
+
+        if self._health_check_interval > 0:
+            self._health_thread = threading.Thread(target=self._health_loop, daemon=True)
+            self._health_thread.start()
+
+
+    def close(self):
+        """
+        Stop every LibreOffice worker and remove their profiles.
+        Conversions waiting for a worker fail, the running ones keep their
+        worker until they end and it's stopped.
+        """
+        idle = []
+        with self._lock:
+            self._closed.set()
+            self._workers = []
+
+            # Take the idle workers, and wake the conversions waiting for one
+            while True:
+                try:
+                    worker = self._idle.get_nowait()
+                except queue.Empty:
+                    break
+                if worker is not None:
+                    idle.append(worker)
+            self._idle.put(None)
+
+        for worker in idle:
+            worker.stop()
+
+
+    def convert(self, input_path, output_path, target: str = "pdf") -> Path:
+        """
+        Convert a document on the next available worker.
+        A worker that crashed is restarted and the conversion is retried once.
+        A conversion that times out isn't retried, so a document hanging
+        LibreOffice holds a worker for conversion_timeout at most.
+
+        Args:
+            input_path: Path to the input document (str or Path)
+            output_path: Path of the converted file (str or Path)
+            target (str): Output format, "pdf" or "html"
+
+        Returns:
+            Path: Path of the converted file
+        """
+        self.start()
+
+        queued_at = time.monotonic()
+        worker = self._idle.get()
+        waited = time.monotonic() - queued_at
+        if worker is None:
+            # The pool was closed, pass the wake-up on to the next waiting conversion
+            self._idle.put(None)
+            raise Exception("The LibreOffice worker pool is closed.")
+
+        try:
+            started_at = time.monotonic()
+            try:
+                if not worker.is_alive():
+                    self._restart(worker)
+                worker.convert(input_path, output_path, target, self._conversion_timeout)
+            except TimeoutError:
+                # The document hangs LibreOffice, a retry would hold the worker for another timeout
+                self._restart(worker)
+                raise
+            except Exception:
+                # The document itself failed, the worker is fine and a retry would fail the same way
+                if worker.is_alive():
+                    raise
+                # The worker crashed, retry once on a fresh process
+                self._restart(worker)
+                worker.convert(input_path, output_path, target, self._conversion_timeout)
+            elapsed = time.monotonic() - started_at
+        except Exception:
+            self._record(waited, None)
+            raise
+        finally:
+            self._release(worker)
+
+        self._record(waited, elapsed)
+        return Path(output_path)
+
+
+    def health_check(self) -> int:
+        """
+        Check the idle workers and restart the ones that stopped responding.
+
+        Returns:
+            int: Number of restarted workers
+        """
+        restarted = 0
+        checked = []
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            if worker is None:
+                # The pool is closed, keep the wake-up for the waiting conversions
+                self._idle.put(None)
+                return restarted
+            if not worker.is_alive():
+                self._restart(worker)
+                restarted += 1
+            checked.append(worker)
+
+        for worker in checked:
+            self._release(worker)
+        return restarted
+
+
+    def stats(self) -> dict:
+        """
+        Get the pool statistics.
+
+        Returns:
+            dict: Worker counts, conversion counts, and queue wait / conversion times in seconds
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["workers"] = len(self._workers)
+        stats["idle_workers"] = self._idle.qsize() if not self._closed.is_set() else 0
+
+        total = stats["conversions"] + stats["failures"]
+        stats["queue_wait_avg"] = stats["queue_wait_total"] / total if total else 0.0
+        stats["conversion_time_avg"] = stats["conversion_time_total"] / stats["conversions"] if stats["conversions"] else 0.0
+        return stats
+
+
+    def _record(self, waited: float, elapsed: float):
+        """
+        Add one conversion to the pool statistics.
+
+        Args:
+            waited (float): Seconds spent waiting for a worker
+            elapsed (float): Seconds spent converting, None if the conversion failed
+        """
+        with self._lock:
+            self._stats["queue_wait_total"] += waited
+            self._stats["queue_wait_max"] = max(self._stats["queue_wait_max"], waited)
+            if elapsed is None:
+                self._stats["failures"] += 1
+                return
+            self._stats["conversions"] += 1
+            self._stats["conversion_time_total"] += elapsed
+            self._stats["conversion_time_max"] = max(self._stats["conversion_time_max"], elapsed)
+
+
+    def _release(self, worker):
+        """
+        Put a worker back in the idle queue, or stop it if the pool was closed meanwhile.
+
+        Args:
+            worker (_LibreOfficeWorker): The worker to release
+        """
+        with self._lock:
+            if not self._closed.is_set():
+                self._idle.put(worker)
+                return
+        worker.stop()
+
+
+    def _restart(self, worker):
+        """
+        Restart a worker process.
+
+        Args:
+            worker (_LibreOfficeWorker): The worker to restart
+        """
+        worker.stop()
+        worker.start()
+        with self._lock:
+            self._stats["restarts"] += 1
+
+
+    def _health_loop(self):
+        """
+        Run the health checks periodically until the pool is closed.
+        """
+        while not self._closed.wait(self._health_check_interval):
+            self.health_check()
+
+
+class _LibreOfficeWorker:
+    """
+    A single headless LibreOffice process listening on a local UNO pipe.
+    """
+    def __init__(self, index: int, binary: str, startup_timeout: int):
+        self._index = index
+        self._binary = binary
+        self._startup_timeout = startup_timeout
+        self._process = None
+        self._profile = None
+        self._desktop = None
+        self._timed_out = False
+
+
+    def start(self):
+        """
+        Launch LibreOffice with a private profile and connect to it.
+        """
+        self._profile = tempfile.mkdtemp(prefix="rag-dv-libreoffice-")
+        pipe_name = f"rag_dv_{os.getpid()}_{self._index}_{uuid.uuid4().hex[:8]}"
+        command_tool = [
+            self._binary,
+            "--headless",           # Run without GUI
+            "--invisible",
+            "--nologo",
+            "--norestore",          # Don't try to recover documents after a crash
+            "--nodefault",
+            "--nolockcheck",
+            f"-env:UserInstallation={Path(self._profile).as_uri()}",  # Private profile per worker
+            f"--accept=pipe,name={pipe_name};urp;StarOffice.ComponentContext",
+        ]
+        self._process = Popen(command_tool, stdout=DEVNULL, stderr=DEVNULL)
+
+        # Wait until LibreOffice accepts connections
+        local_context = uno.getComponentContext()
+        resolver = local_context.ServiceManager.createInstanceWithContext("com.sun.star.bridge.UnoUrlResolver", local_context)
+        deadline = time.monotonic() + self._startup_timeout
+        while True:
+            try:
+                context = resolver.resolve(f"uno:pipe,name={pipe_name};urp;StarOffice.ComponentContext")
+                break
+            except Exception:
+                if self._process.poll() is not None or time.monotonic() > deadline:
+                    self.stop()
+                    raise Exception("Failed to start a LibreOffice worker.")
+                time.sleep(0.2)
+        self._desktop = context.ServiceManager.createInstanceWithContext("com.sun.star.frame.Desktop", context)
+
+
+    def stop(self):
+        """
+        Stop the LibreOffice process and remove its profile.
+        """
+        if self._desktop is not None:
+            try:
+                self._desktop.terminate()
+            except Exception:
+                pass
+            self._desktop = None
+
+        if self._process is not None:
+            try:
+                self._process.wait(timeout=10)
+            except TimeoutExpired:
+                self._process.kill()
+                self._process.wait()
+            self._process = None
+
+        if self._profile is not None:
+            shutil.rmtree(self._profile, ignore_errors=True)
+            self._profile = None
+
+
+    def is_alive(self) -> bool:
+        """
+        Check that the process is running and answers over the pipe.
+
+        Returns:
+            bool: True if the worker is healthy
+        """
+        if self._process is None or self._process.poll() is not None or self._desktop is None:
+            return False
+        try:
+            self._desktop.getFrames()
+        except Exception:
+            return False
+        return True
+
+
+    def convert(self, input_path, output_path, target: str, timeout: int):
+        """
+        Convert a document, killing the process if it takes longer than the timeout.
+        Raises TimeoutError when the process was killed by the timeout.
+
+        Args:
+            input_path: Path to the input document (str or Path)
+            output_path: Path of the converted file (str or Path)
+            target (str): Output format, "pdf" or "html"
+            timeout (int): Seconds before the conversion is killed
+        """
+        filters = PDF_FILTERS if target == "pdf" else HTML_FILTERS
+        self._timed_out = False
+        watchdog = threading.Timer(timeout, self._kill_on_timeout)
+        watchdog.start()
+        try:
+            document = self._desktop.loadComponentFromURL(
+                uno.systemPathToFileUrl(str(Path(input_path).resolve())), "_blank", 0, (_property("Hidden", True),)
+            )
+            if document is None:
+                raise Exception(f"LibreOffice failed to load {Path(input_path).name}.")
+            try:
+                filter_name = next((f for service, f in filters.items() if document.supportsService(service)), None)
+                if filter_name is None:
+                    raise Exception(f"LibreOffice can't convert {Path(input_path).name} to {target}.")
+                document.storeToURL(
+                    uno.systemPathToFileUrl(str(Path(output_path).resolve())), (_property("FilterName", filter_name),)
+                )
+            finally:
+                document.close(True)
+        except Exception:
+            if self._timed_out:
+                raise TimeoutError(f"LibreOffice took longer than {timeout} seconds to convert {Path(input_path).name}.")
+            raise
+        finally:
+            watchdog.cancel()
+
+
+    def _kill_on_timeout(self):
+        """
+        Kill the process of a conversion that took longer than the timeout.
+        """
+        self._timed_out = True
+        process = self._process
+        if process is not None:
+            process.kill()
+
+
+def _property(name: str, value):
+    """
+    Build a UNO PropertyValue.
+
+    Args:
+        name (str): Property name
+        value: Property value
+
+    Returns:
+        PropertyValue: The UNO property
+    """
+    prop = PropertyValue()
+    prop.Name = name
+    prop.Value = value
+    return prop
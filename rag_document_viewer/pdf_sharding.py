@@ -0,0 +1,214 @@
+import re, shutil
+from pathlib import Path
+from subprocess import run, SubprocessError
+from .streaming import DEFAULT_BLOCK_SIZE, rewrite_css_file, rewrite_html_file
+
+# Class names generated per pdf2htmlEX run (fonts, colors, sizes, positions, ...),
+# their numbering restarts in every run so they collide between shards
+GENERATED_CLASS = r"(?:ff|fc|fs|ls|ws|sc|m|v|x|y|h|w|_)[0-9a-f]+"
+GENERATED_CLASS_TOKEN = re.compile(rf"^{GENERATED_CLASS}$")
+GENERATED_CLASS_SELECTOR = re.compile(rf"(?<![\w.-])\.({GENERATED_CLASS})(?![\w-])")
+FONT_FAMILY = re.compile(r"(font-family:\s*)(ff[0-9a-f]+)(?![\w-])")
+CSS_URL = re.compile(r"url\(([^)]+)\)")
+
+# Files written identically by every pdf2htmlEX run, only the first shard's copy is kept
+SHARED_FILES = ["base.min.css", "fancy.min.css", "compatibility.min.js", "pdf2htmlEX.min.js", "pdf2htmlEX-64x64.png"]
+
+def get_pdf_page_count(pdf_path) -> int:
+    """
+    Get the number of pages of a PDF file.
+    Uses pdfinfo when it's installed, and falls back to reading the page tree
+    count from the PDF itself.
+
+    Args:
+        pdf_path: Path to the PDF file (str or Path)
+
+    Returns:
+        int: Number of pages, or None if it couldn't be determined
+    """
+    try:
+        result = run(["pdfinfo", str(pdf_path)], capture_output=True, timeout=60)
+        match = re.search(rb"^Pages:\s+(\d+)", result.stdout, re.MULTILINE)
+        if match:
+            return int(match.group(1))
+    except (OSError, SubprocessError):
+        pass
+
+    # The root page tree holds the total count, so it's the largest /Count value
+    with Path(pdf_path).open("rb") as f:
+        content = f.read()
+    counts = [int(x) for x in re.findall(rb"/Type\s*/Pages\b[^>]*?/Count\s+(\d+)", content)]
+    counts += [int(x) for x in re.findall(rb"/Count\s+(\d+)[^>]*?/Type\s*/Pages\b", content)]
+    return max(counts) if counts else None
+
+
+def split_page_ranges(page_count: int, shards: int) -> list[tuple[int, int]]:
+    """
+    Split the pages of a document into contiguous ranges of similar size.
+
+    Args:
+        page_count (int): Number of pages of the document
+        shards (int): Number of ranges wanted
+
+    Returns:
+        list[tuple[int, int]]: First and last page (1 based, inclusive) of each range
+    """
+    shards = max(1, min(shards, page_count))
+    size, extra = divmod(page_count, shards)
+    ranges = []
+    first = 1
+    for i in range(shards):
+        last = first + size - 1 + (1 if i < extra else 0)
+        ranges.append((first, last))
+        first = last + 1
+    return ranges
+
+
+def merge_page_ranges(page_ranges: list[tuple[int, int]], max_ranges: int, gap: int = 0) -> list[tuple[int, int]]:
+    """
+    Merge sorted page ranges, so the pages between them are rendered too.
+    Ranges separated by less than `gap` pages are merged, then the ranges
+    separated by the smallest gaps until at most `max_ranges` are left.
+
+    Args:
+        page_ranges (list[tuple[int, int]]): First and last page of each range, sorted and not overlapping
+        max_ranges (int): Maximum number of ranges kept
+        gap (int): Number of pages under which two ranges are always merged
+
+    Returns:
+        list[tuple[int, int]]: The merged ranges
+    """
+    if len(page_ranges) == 0:
+        return []
+    gaps = sorted((page_ranges[i + 1][0] - page_ranges[i][1] - 1, i) for i in range(len(page_ranges) - 1))
+    excess = len(page_ranges) - max(1, max_ranges)
+    closed = {i for n, (size, i) in enumerate(gaps) if n < excess or size < gap}
+
+    merged = [page_ranges[0]]
+    for i, page_range in enumerate(page_ranges[1:]):
+        if i in closed:
+            merged[-1] = (merged[-1][0], page_range[1])
+        else:
+            merged.append(page_range)
+    return merged
+
+
+def merge_html_shards(path, stem: str, shard_dirs: list, block_size: int = DEFAULT_BLOCK_SIZE):
+    """
+    Merge the output of several pdf2htmlEX runs over page ranges into one document.
+
+    The first shard is used as the base document. The pages of the following
+    shards are appended to its page container, and their generated class names,
+    font families and colliding file names get a shard suffix so they don't
+    clash with the ones of other shards. Every file is rewritten block by block
+    from disk to disk, so no document is ever held in memory.
+
+    Args:
+        path: Directory where the merged document is written (str or Path)
+        stem (str): File name stem of the pdf2htmlEX output (<stem>.html, <stem>.css)
+        shard_dirs (list): Output directory of each shard, in page order
+        block_size (int): Number of characters read at once
+    """
+    path = Path(path)
+    shard_dirs = [Path(x) for x in shard_dirs]
+
+    # The first shard becomes the base document
+    for file_path in sorted(shard_dirs[0].iterdir()):
+        shutil.move(str(file_path), str(path / file_path.name))
+
+    html_path = path / f"{stem}.html"
+    css_path = path / f"{stem}.css"
+    shard_pages = []
+
+    for index, shard_dir in enumerate(shard_dirs[1:], start=1):
+        suffix = f"_s{index}"
+        shard_html = shard_dir / f"{stem}.html"
+        shard_css = shard_dir / f"{stem}.css"
+        if not shard_html.exists():
+            raise Exception(f"faild to convert pages of shard {index} to html previewer.")
+
+        # Move the shard files, renaming fonts and any colliding file
+        renamed = {}
+        page_files = []
+        for file_path in sorted(shard_dir.iterdir()):
+            if file_path in [shard_html, shard_css] or file_path.name in SHARED_FILES or file_path.suffix == ".outline":
+                continue
+            name = file_path.name
+            if file_path.suffix in [".woff", ".woff2", ".ttf", ".otf"] or (path / name).exists():
+                name = f"{file_path.stem}{suffix}{file_path.suffix}"
+                renamed[file_path.name] = name
+            shutil.move(str(file_path), str(path / name))
+            if file_path.suffix == ".page":
+                page_files.append(path / name)
+
+        # Scope the class names of the split page files (--split-pages)
+        scope = _get_scoping(suffix, renamed)
+        for file_path in page_files:
+            rewrite_html_file(file_path, block_size, rewrite_attributes=scope)
+
+        # Scope the generated classes and fonts of the shard stylesheet, and append it to the base one
+        if shard_css.exists():
+            rewrite_css_file(shard_css, [
+                (GENERATED_CLASS_SELECTOR.pattern, lambda m: f".{m.group(1)}{suffix}"),
+                (FONT_FAMILY.pattern, lambda m: f"{m.group(1)}{m.group(2)}{suffix}"),
+                (CSS_URL.pattern, lambda m: f"url({renamed.get(m.group(1), m.group(1))})"),
+            ], block_size)
+            with css_path.open("a") as dst, shard_css.open("r") as src:
+                dst.write("\n")
+                shutil.copyfileobj(src, dst, block_size)
+
+        # Keep only the shard pages, with the scoped class names
+        rewrite_html_file(shard_html, block_size, rewrite_attributes=scope, container=_is_page_container, container_only=True)
+        shard_pages.append(shard_html)
+
+    def append_pages(output):
+        for pages_path in shard_pages:
+            with pages_path.open("r") as src:
+                shutil.copyfileobj(src, output, block_size)
+
+    # Append the shard pages to the page container of the base document
+    rewrite_html_file(html_path, block_size, container=_is_page_container, container_end=append_pages)
+    for shard_dir in shard_dirs:
+        shutil.rmtree(shard_dir, ignore_errors=True)
+
+
+def _is_page_container(tag: str, attrs: dict) -> bool:
+    """
+    Check if an element is the pdf2htmlEX page container.
+
+    Args:
+        tag (str): Tag name
+        attrs (dict): Attribute values of the tag
+
+    Returns:
+        bool: True for the page container
+    """
+    return tag == "div" and attrs.get("id") == "page-container"
+
+
+def _get_scoping(suffix: str, renamed: dict):
+    """
+    Build the attribute rewrite adding the shard suffix to the generated class
+    names, and pointing file references to the renamed files.
+
+    Args:
+        suffix (str): Shard suffix, like "_s1"
+        renamed (dict): Original and new names of the renamed shard files
+
+    Returns:
+        callable: Attribute rewrite, for the rewrite_attributes option of StreamingHTMLRewriter
+    """
+    def scope(tag, attrs):
+        changed = False
+        classes = attrs.get("class")
+        if classes:
+            scoped = " ".join(x + suffix if GENERATED_CLASS_TOKEN.match(x) else x for x in classes.split())
+            changed = scoped != classes
+            attrs["class"] = scoped
+        for attribute in ["src", "data-page-url"]:
+            if attrs.get(attribute) in renamed:
+                attrs[attribute] = renamed[attrs[attribute]]
+                changed = True
+        return attrs if changed else None
+
+    return scope
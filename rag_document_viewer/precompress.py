@@ -0,0 +1,102 @@
+import gzip, os, shutil
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from .hashed_assets import file_digest
+from .streaming import DEFAULT_BLOCK_SIZE
+
+# brotli is optional, without it only gzip variants are written
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Suffix of the file written for each encoding, next to the original file
+ENCODING_SUFFIXES = {"gzip": ".gz", "br": ".br"}
+
+def get_available_encodings() -> list[str]:
+    """
+    Get the encodings that can be written with the installed packages.
+
+    Returns:
+        list[str]: "gzip", and "br" when brotli is installed
+    """
+    return ["gzip", "br"] if brotli is not None else ["gzip"]
+
+
+def compress_file(path, encodings: list[str], block_size: int = DEFAULT_BLOCK_SIZE, previous: dict = None) -> dict:
+    """
+    Write a compressed sibling of a file for each encoding, at the highest level.
+    Siblings are kept when the file has the same size and hash as when they
+    were written, so only changed files are compressed again. Timestamps
+    aren't used, a file rewritten in the same clock tick as its siblings
+    would look unchanged.
+
+    Args:
+        path: Path to the file (str or Path)
+        encodings (list[str]): "gzip" and/or "br"
+        block_size (int): Number of bytes read at once
+        previous (dict, optional): Entry returned for the file by the previous run
+
+    Returns:
+        dict: Size in bytes of the file ("raw") and of each compressed sibling,
+              and the hash of the file ("sha256")
+    """
+    path = Path(path)
+    sizes = {"raw": path.stat().st_size, "sha256": file_digest(path, block_size)}
+    unchanged = previous is not None and previous.get("raw") == sizes["raw"] and previous.get("sha256") == sizes["sha256"]
+    for encoding in encodings:
+        target = path.with_name(path.name + ENCODING_SUFFIXES[encoding])
+        if not unchanged or not target.exists():
+            tmp_path = target.with_name(f".{target.name}.tmp")
+            with path.open("rb") as src, tmp_path.open("wb") as dst:
+                if encoding == "gzip":
+                    # No file name or time in the header, so identical files give identical archives
+                    with gzip.GzipFile(filename="", mode="wb", fileobj=dst, compresslevel=9, mtime=0) as f:
+                        shutil.copyfileobj(src, f, block_size)
+                else:
+                    compressor = brotli.Compressor(quality=11)
+                    for block in iter(lambda: src.read(block_size), b""):
+                        dst.write(compressor.process(block))
+                    dst.write(compressor.finish())
+            os.replace(tmp_path, target)
+        sizes[encoding] = target.stat().st_size
+    return sizes
+
+
+def compress_files(paths: list, encodings: list[str], workers: int = None, block_size: int = DEFAULT_BLOCK_SIZE,
+                   previous: dict = None) -> dict:
+    """
+    Compress files in parallel. zlib and brotli release the GIL, so threads
+    compress on several cores.
+
+    Args:
+        paths (list): Files to compress (str or Path)
+        encodings (list[str]): "gzip" and/or "br"
+        workers (int, optional): Number of threads, defaults to the number of CPUs
+        block_size (int): Number of bytes read at once
+        previous (dict, optional): Entries returned by the previous run, keyed by path
+
+    Returns:
+        dict: Sizes returned by compress_file(), keyed by path
+    """
+    if "br" in encodings and brotli is None:
+        raise ImportError("Brotli compression needs the brotli package (pip install brotli).")
+
+    paths = [Path(x) for x in paths]
+    previous = previous or {}
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1) as executor:
+        sizes = executor.map(lambda x: compress_file(x, encodings, block_size, previous.get(x)), paths)
+        return dict(zip(paths, sizes))
+
+
+def remove_orphan_variants(root):
+    """
+    Remove the compressed siblings whose original file doesn't exist anymore.
+
+    Args:
+        root: Directory searched recursively (str or Path)
+    """
+    for suffix in ENCODING_SUFFIXES.values():
+        for path in Path(root).rglob(f"*{suffix}"):
+            if not path.with_suffix("").exists():
+                path.unlink()
@@ -1,33 +1,80 @@
-let pf = $("div.pf");
+let pf = Array.from(document.querySelectorAll("div.pf"));
+// Index of each page, read by the observer callbacks without searching the pages
+for (let i = 0; i < pf.length; i++) {
+    pf[i].dataset.pageIndex = i;
+}
+let page_container = document.getElementById("page-container");
 
-var generalWidth = $(".pf").width() + 150;
-var windowWidth = $(window).width();
+var generalWidth = (pf.length > 0 ? pf[0].offsetWidth : 0) + 150;
+var windowWidth = window.innerWidth;
 
 var documentHeight = 0;
 var generalHeight = 0;
-var windowHeight = $("#scrollbar").height();
+var windowHeight = document.getElementById("scrollbar").clientHeight;
 var show_single_chunk = {#_show_single_chunk_#};
 var chunks_navigator = {#_chunks_navigator_#};
 var scrollbar_bookmarks = {#_scrollbar_bookmarks_#};
 var show_page_number = {#_show_page_number_#};
+var rendered_pages = {#_rendered_pages_#};
+var page_count = {#_page_count_#};
+var lazy_pages = {#_lazy_pages_#};
 var pages = [];
 
-var theMainPf = $(".pf");
+// Scroll driven updates, applied once per animation frame
+var scroll_frame = null;
+var scrollHeight = 3;
+var current_page_label = null;
+
+// Boxes waiting for their page to be loaded, and the page of each chunk (when pages are lazy loaded)
+var page_boxes = {};
+var chunk_pages = {};
+var page_observer = null;
+var pending_bookmarks = document.createDocumentFragment();
+
+// Per page chunk data files (when the boxes are not embedded in this script)
+var chunk_data_url = {#_chunk_data_url_#};
+var chunk_index = null;
+var chunk_rows = {};
+var drawn_pages = {};
+var chunk_observer = null;
+
+// Boxes of each page, only turned into elements while the page is near the viewport (viewport box rendering)
+var viewport_boxes = {#_viewport_boxes_#};
+var box_data = {};
+var visible_pages = {};
+var dirty_pages = {};
+var render_frame = null;
+var box_observer = null;
+
+// Position of each document page among the rendered pages (when only part of the document is rendered)
+var page_map = {};
+if (rendered_pages !== null) {
+    for (let i = 0; i < rendered_pages.length; i++) {
+        page_map[rendered_pages[i]] = i;
+    }
+}
+
+var theMainPf = pf[0];
 var scroll_to = "";
 
-$("#page-container").html("");
+// Keep only the pages in the container, moved in a single DOM write
+let page_fragment = document.createDocumentFragment();
+for (let i = 0; i < pf.length; i++) {
+    page_fragment.appendChild(pf[i]);
+}
+page_container.textContent = "";
+page_container.appendChild(page_fragment);
 
 for (let i = 0; i < pf.length; i++) {
-    $("#page-container").append(pf[i]);
-    generalHeight += $(pf[i]).outerHeight();
-    if ($(pf[i]).width() >= generalWidth) {
-        generalWidth = $(pf[i]).width() + 150;
-        theMainPf = $(pf[i]);
+    generalHeight += pf[i].offsetHeight;
+    if (pf[i].offsetWidth >= generalWidth) {
+        generalWidth = pf[i].offsetWidth + 150;
+        theMainPf = pf[i];
     }
 
 }
 
-zoom_ratio = Math.round(($('#page-container').width() / generalWidth) * 10) / 12;
+zoom_ratio = Math.round((page_container.clientWidth / generalWidth) * 10) / 12;
 if (zoom_ratio < 1 && zoom_ratio == 0.9) {
     zoom_ratio = 0.8;
 }
@@ -36,94 +83,125 @@ max_zoom = zoom_ratio + 0.5;
 min_zoom = zoom_ratio - 0.5;
 window.zoom = zoom_ratio;
 handle_zooming();
+observe_pages();
+
+set_external_links(document);
 
-$("a:not([href^='#'])").attr('target', '_blank');
+page_container.addEventListener("scroll", function () {
+    // Scroll events can fire many times per frame, the updates are coalesced
+    if (scroll_frame === null) {
+        scroll_frame = requestAnimationFrame(update_scroll_state);
+    }
+}, { passive: true });
 
-$("#page-container").off('scroll').on('scroll', function () {
-    let scrollLocation = $("#page-container").scrollTop() / generalHeight;
+function update_scroll_state() {
+    // Move the scroller and update the page number from the current scroll position
+    scroll_frame = null;
+    let scrollTop = page_container.scrollTop;
+    let scrollLocation = scrollTop / generalHeight;
 
-    let availableScrolling = $("#scrollbar").height() - $('#scroller').height();
+    // windowHeight and scrollHeight are cached on zoom and resize, so this only reads scrollTop
+    let availableScrolling = windowHeight - scrollHeight;
+    let scroller = document.getElementById("scroller");
     if (scrollLocation <= 0.01) {
-        $('#scroller').css("top", "5px");
+        scroller.style.top = "5px";
     }
     else if (scrollLocation <= 1) {
         let location = availableScrolling * scrollLocation;
-        $('#scroller').css("top", location + "px");
+        scroller.style.top = location + "px";
     }
 
     if (show_page_number) {
-        pageNumber = getCurrentPage();
-        $("#page-number").html(pageNumber);
+        update_page_number(getCurrentPage(scrollTop));
     }
-});
+}
 
-$("#scrollbar").click(function (event) {
+function update_page_number(label) {
+    // Only touch the DOM when the page changes
+    if (label !== current_page_label) {
+        current_page_label = label;
+        document.getElementById("page-number").textContent = label;
+    }
+}
+
+document.getElementById("scrollbar").addEventListener("click", function (event) {
+    // The box of the chunk may not be drawn yet, scroll to it through its page
+    let bookmark = event.target.closest(".scroll-bookmark");
+    if (bookmark !== null) {
+        let chunk_id = bookmark.getAttribute("href").substring(1);
+        if (!document.getElementById(chunk_id)) {
+            event.preventDefault();
+            scroll_to_chunk(chunk_id);
+            return;
+        }
+    }
 
-    let relY = event.pageY - ($('#scroller').height() / 2);
-    let availableScrolling = $("#scrollbar").height();
+    let relY = event.pageY - (document.getElementById("scroller").offsetHeight / 2);
+    let availableScrolling = this.clientHeight;
 
     let scrollLocation = (relY / availableScrolling);
     if (scrollLocation <= 0.01) {
-        $("#page-container").animate({
-            scrollTop: 0
-        }, 250);
+        page_container.scrollTo({
+            top: 0,
+            behavior: 'smooth'
+        });
     }
     else if (scrollLocation <= 1) {
         let locationDocument = parseFloat(generalHeight) * parseFloat(scrollLocation);
 
-        $("#page-container").animate({
-            scrollTop: locationDocument
-        }, 250);
+        page_container.scrollTo({
+            top: locationDocument,
+            behavior: 'smooth'
+        });
     }
 });
 
-$("#zoom-in").click(function (event) {
+document.getElementById("zoom-in").addEventListener("click", function (event) {
     if (window.zoom <= max_zoom) {
         window.zoom += 0.1;
     }
     handle_zooming();
 });
 
-$("#zoom-out").click(function (event) {
+document.getElementById("zoom-out").addEventListener("click", function (event) {
     if (window.zoom > min_zoom) {
         window.zoom -= 0.1;
     }
     handle_zooming();
 });
 
-$(window).resize(() => {
-    handle_right();
+window.addEventListener("resize", () => {
+    // Boxes are positioned in percentages of their page, only the scrollbar needs updating
+    windowHeight = document.getElementById("scrollbar").clientHeight;
     handle_zooming();
 });
 
-$(window).on("load", (e) => {
-    $(".pf").each((index, item) => {
-        pages[index] = $(item).offset().top;
-    });
+window.addEventListener("load", (e) => {
+    build_page_offsets();
 
     if (show_page_number) {
-        pageNumber = getCurrentPage();
-        $("#page-number").html(pageNumber);
-        $('#page-number').fadeIn();
+        update_page_number(getCurrentPage());
+        fade_in(document.getElementById("page-number"));
     }
     // if (navigator.userAgent.match(/Edge/i) || navigator.userAgent.match(/Chrome/i)) {
-        $('.zoom').fadeIn();
+        document.querySelectorAll(".zoom").forEach(fade_in);
     // }
     handle_right();
 });
 
 function handle_zooming() {
-    $("#page-container").css("zoom", window.zoom);
+    page_container.style.zoom = window.zoom;
     documentHeight = window.zoom * generalHeight;
+    build_page_offsets();
     if (show_page_number) {
-        pageNumber = getCurrentPage();
-        $("#page-number").html(pageNumber);
+        update_page_number(getCurrentPage());
     }
     scrollHeight = windowHeight * (windowHeight / documentHeight);
 
     if (scrollHeight < 3) scrollHeight = 3;
 
-    $('#scroller').css('height', scrollHeight + "px");
+    document.getElementById("scroller").style.height = scrollHeight + "px";
+    update_bookmarks();
 }
 
 function get_param_value(key) {
@@ -156,63 +234,65 @@ function handle_right() {
         }
     }
 
-    $("#page-container").scrollTop(0, 0);
-    $(".draw-box, .scroll-bookmark").remove();
+    page_container.scrollTop = 0;
+    document.querySelectorAll(".draw-box, .scroll-bookmark").forEach((element) => element.remove());
+    page_boxes = {};
+    chunk_pages = {};
+    box_data = {};
+    observe_boxes();
+
+    if (chunk_data_url !== null) {
+        // Chunk boxes are stored per page, draw the bookmarks from the index and load the pages' boxes on demand
+        load_chunk_index().then((index) => {
+            draw_chunk_index(index);
+            flush_bookmarks();
+            observe_chunk_data();
+            scroll_to_start();
+        });
+        return;
+    }
 
-    let boxes = {#_boxes_data_#};
+    // Geometry precomputed at conversion time: [slide, bookmark, boxes] for each chunk,
+    // boxes are [page, left, top, width, height] with percentages of the page size
+    let geometry = {#_chunk_geometry_#};
 
-    for (let i = 0; i < boxes.length; i++) {
+    for (let i = 0; i < geometry.length; i++) {
         let addedId = false;
-        let drawBoxes = boxes[i];
-        let addedClass = "text";
+        let drawBoxes = geometry[i][2];
+        let addedClass = geometry[i][0] ? "slide" : "text";
         const display_highlight = (allowed_i.indexOf(i) != -1);
         for (let j = 0; j < drawBoxes.length; j++) {
-            let currentBox = drawBoxes[j];
-
-            if (currentBox['left'] === 0 && currentBox['top'] === 0 && currentBox['width'] === 1 && currentBox['height'] === 1) {
-                addedClass = "slide";
-            }
-            
-            let pageBoxWidth = $(pf[currentBox['page'] - 1]).width();
-            let pageBoxHeight = $(pf[currentBox['page'] - 1]).height();
-
-            let drawBox = $("<div />");
-            currentBox['left'] = (currentBox['left'] * pageBoxWidth);
-            currentBox['top'] = (currentBox['top'] * pageBoxHeight);
-            currentBox['height'] = (currentBox['height'] * pageBoxHeight);
-            currentBox['width'] = (currentBox['width'] * pageBoxWidth);
-
-            drawBox.addClass("draw-box");
-            if (display_highlight) {
-                drawBox.addClass("highlight").addClass(addedClass);
+            let pageIndex = get_page_index(drawBoxes[j][0]);
+            if (pageIndex < 0) {
+                // The page of this box was not rendered
+                continue;
             }
 
-            drawBox.css("left", currentBox['left']);
-            drawBox.css("top", currentBox['top']);
-            drawBox.css("height", currentBox['height']);
-            drawBox.css("width", currentBox['width']);
             if (!addedId) {
                 addedId = true;
-                drawBox.attr("id", "chunk-" + i);
+                chunk_pages[i] = pageIndex;
                 if (display_highlight && scrollbar_bookmarks) {
-                    let div = $('<a class="scroll-bookmark" id="b-' + i + '" href="#chunk-' + i + '"></a>');
-                    let percentage = ($(pf[currentBox['page'] - 1]).offset().top + currentBox['top']) / documentHeight;
-                    let available_height = $('#scrollbar').height() - $('#scroller').height();
-                    let location = (parseFloat(available_height) * parseFloat(percentage)) + ($('#scroller').height() / 2) - 5;
-                    div.css("top", location + "px");
-                    $('#scrollbar').append(div);
+                    add_bookmark(pageIndex, i, geometry[i][1], drawBoxes[j][2]);
                 }
+                add_box(pageIndex, i, drawBoxes[j], display_highlight, addedClass, true);
+            }
+            else {
+                add_box(pageIndex, i, drawBoxes[j], display_highlight, addedClass, false);
             }
-            $(pf[currentBox['page'] - 1]).append(drawBox);
         }
     }
 
+    flush_bookmarks();
+    scroll_to_start();
+}
+
+function scroll_to_start() {
+    // Scroll to the page or chunk requested in the URL
+    let scroll_number = get_param_value("goto_chunk");
     let scroll_page = get_param_value("goto_page");
     if (scroll_page.length < 1) {
-        if (scroll_to.length > 0 && $(`#${scroll_to}`).length) {
-            document.getElementById(scroll_to).scrollIntoView({
-                behavior: 'smooth'
-            });
+        if (scroll_to.length > 0) {
+            scroll_to_chunk(scroll_to);
         }
 
         if (allowed_i.length > 0) {
@@ -224,50 +304,169 @@ function handle_right() {
         }
     }
     else {
-        if (pf.eq(scroll_page[0]).length) {
-            pf.eq(scroll_page[0])[0].scrollIntoView({
+        let pageIndex = get_page_index(scroll_page[0] + 1);
+        if (pageIndex >= 0 && pageIndex < pf.length) {
+            pf[pageIndex].scrollIntoView({
                 behavior: 'smooth'
             });
         }
     }
-    // }
-    // else {
-    //     window.currentS = 0;
-    //     window.custom_text = "";
-    //     handle_suggestions(0);
-    // }
+}
+
+function add_box(pageIndex, chunk, box, highlight, addedClass, first) {
+    // Draw a chunk box, box is [page, left, top, width, height] with percentages of the page size
+    if (viewport_boxes) {
+        // Only kept as data, the element is created when the page gets close to the viewport
+        (box_data[pageIndex] = box_data[pageIndex] || []).push([chunk, box, highlight, addedClass, first]);
+        if (visible_pages[pageIndex]) {
+            schedule_page_boxes(pageIndex);
+        }
+        return;
+    }
+
+    let drawBox = build_box(chunk, box, highlight, addedClass, first);
+    if (is_page_loaded(pageIndex)) {
+        pf[pageIndex].appendChild(drawBox);
+    }
+    else {
+        // Drawn when the page is loaded
+        (page_boxes[pageIndex] = page_boxes[pageIndex] || []).push(drawBox);
+    }
+}
+
+function build_box(chunk, box, highlight, addedClass, first) {
+    // Create the element of a chunk box
+    let drawBox = document.createElement("div");
+    drawBox.className = highlight ? "draw-box highlight " + addedClass : "draw-box";
+    drawBox.style.left = box[1] + "%";
+    drawBox.style.top = box[2] + "%";
+    drawBox.style.width = box[3] + "%";
+    drawBox.style.height = box[4] + "%";
+    if (first) {
+        drawBox.id = "chunk-" + chunk;
+    }
+    return drawBox;
+}
+
+function schedule_page_boxes(pageIndex) {
+    // Render the boxes of the changed pages together in the next animation frame
+    dirty_pages[pageIndex] = true;
+    if (render_frame === null) {
+        render_frame = requestAnimationFrame(() => {
+            render_frame = null;
+            let changed = dirty_pages;
+            dirty_pages = {};
+            for (const pageIndex in changed) {
+                if (visible_pages[pageIndex]) {
+                    render_page_boxes(pageIndex);
+                }
+            }
+        });
+    }
+}
+
+function render_page_boxes(pageIndex) {
+    // Replace the box elements of a page with a single fragment built from its box data
+    if (!is_page_loaded(pageIndex)) {
+        // Rendered once the page is loaded
+        return;
+    }
+    clear_page_boxes(pageIndex);
+    let fragment = document.createDocumentFragment();
+    for (const data of (box_data[pageIndex] || [])) {
+        fragment.appendChild(build_box(...data));
+    }
+    pf[pageIndex].appendChild(fragment);
+}
+
+function clear_page_boxes(pageIndex) {
+    // Remove the box elements of a page, its box data is kept
+    for (const box of pf[pageIndex].querySelectorAll(":scope > .draw-box")) {
+        box.remove();
+    }
+}
+
+function observe_boxes() {
+    // Create the box elements of the pages near the viewport, and remove them when the pages get far away
+    if (!viewport_boxes || box_observer !== null) {
+        return;
+    }
+    if (!("IntersectionObserver" in window)) {
+        viewport_boxes = false;
+        return;
+    }
+    box_observer = new IntersectionObserver((entries) => {
+        for (const entry of entries) {
+            let pageIndex = Number(entry.target.dataset.pageIndex);
+            if (entry.isIntersecting) {
+                visible_pages[pageIndex] = true;
+                schedule_page_boxes(pageIndex);
+            }
+            else if (visible_pages[pageIndex]) {
+                delete visible_pages[pageIndex];
+                clear_page_boxes(pageIndex);
+            }
+        }
+    }, {
+        root: page_container,
+        rootMargin: "100% 0px"
+    });
+    for (let i = 0; i < pf.length; i++) {
+        box_observer.observe(pf[i]);
+    }
+}
+
+function add_bookmark(pageIndex, chunk, position, top) {
+    // Mark the position of a chunk on the scrollbar, position is a fraction of the document height
+    // precomputed at conversion time (null when the page sizes were unknown, then top is the box top
+    // as a percentage of the page height)
+    // The bookmark is placed by CSS from its position and the scrollbar variables set in update_bookmarks(),
+    // so zooming and resizing don't touch the bookmarks one by one
+    let div = document.createElement("a");
+    div.className = "scroll-bookmark";
+    div.id = "b-" + chunk;
+    div.href = "#chunk-" + chunk;
+    let percentage = position;
+    if (percentage === null) {
+        percentage = (get_offset_top(pf[pageIndex]) + top / 100 * pf[pageIndex].clientHeight) / documentHeight;
+    }
+    div.style.setProperty("--position", percentage);
+    pending_bookmarks.appendChild(div);
+}
+
+function flush_bookmarks() {
+    // Add the pending bookmarks to the scrollbar in a single DOM write
+    document.getElementById("scrollbar").appendChild(pending_bookmarks);
+    pending_bookmarks = document.createDocumentFragment();
+}
+
+function update_bookmarks() {
+    // Range and offset used by every bookmark position, updated in one batched write
+    let scrollbar = document.getElementById("scrollbar");
+    let scroller_height = document.getElementById("scroller").offsetHeight;
+    scrollbar.style.setProperty("--bookmark-range", (windowHeight - scroller_height) + "px");
+    scrollbar.style.setProperty("--bookmark-offset", (scroller_height / 2 - 5) + "px");
 }
 
 function handle_suggestions(total) {
     window.totalS = total;
 
+    let navigator_element = document.getElementById("navigator");
     if (!chunks_navigator) {
-        $("#navigator").fadeOut();
+        fade_out(navigator_element);
     }
     else if (window.totalS == 1 && !show_single_chunk) {
-        $("#navigator").fadeOut();
+        fade_out(navigator_element);
     }
 
     else if (window.totalS == 0) {
-        $("#navigator").fadeOut();
+        fade_out(navigator_element);
     }
 
     else {
-        $("#navigator").fadeIn();
-        if (currentS < total && currentS > 1) {
-            $("#nextS").removeClass("disabled");
-            $("#prevS").removeClass("disabled");
-        }
-        else if (currentS == total) {
-            $("#prevS").removeClass("disabled");
-            $("#nextS").addClass("disabled");
-        }
-        else if (currentS == 1) {
-            $("#prevS").addClass("disabled");
-            $("#nextS").removeClass("disabled");
-        }
-        $("#currentS").text(currentS);
-        $("#totalS").text(totalS);
+        fade_in(navigator_element);
+        update_navigator();
+        document.getElementById("totalS").textContent = totalS;
     }
 }
 
@@ -277,24 +476,10 @@ function next_chunk() {
     }
     if (currentS < totalS) {
         currentS++;
-        if (currentS < totalS) {
-            $("#nextS").removeClass("disabled");
-            $("#prevS").removeClass("disabled");
-        }
-        else if (currentS == totalS) {
-            $("#prevS").removeClass("disabled");
-            $("#nextS").addClass("disabled");
-        }
-    }
-    else if (currentS == totalS) {
-        $("#prevS").removeClass("disabled");
-        $("#nextS").addClass("disabled");
     }
-    $("#currentS").text(currentS);
+    update_navigator();
     scroll_to = "chunk-" + allowed_i[currentS - 1];
-    document.getElementById(scroll_to).scrollIntoView({
-        behavior: 'smooth'
-    });
+    scroll_to_chunk(scroll_to);
 }
 
 function prev_chunk() {
@@ -303,42 +488,295 @@ function prev_chunk() {
     }
     if (currentS > 1) {
         currentS--;
-        if (currentS > 1) {
-            $("#nextS").removeClass("disabled");
-            $("#prevS").removeClass("disabled");
+    }
+    update_navigator();
+    scroll_to = "chunk-" + allowed_i[currentS - 1];
+    scroll_to_chunk(scroll_to);
+}
+
+function update_navigator() {
+    // Enable the previous and next buttons depending on the current chunk
+    let prev = document.getElementById("prevS");
+    let next = document.getElementById("nextS");
+    if (currentS < totalS && currentS > 1) {
+        next.classList.remove("disabled");
+        prev.classList.remove("disabled");
+    }
+    else if (currentS == totalS) {
+        prev.classList.remove("disabled");
+        next.classList.add("disabled");
+    }
+    else if (currentS == 1) {
+        prev.classList.add("disabled");
+        next.classList.remove("disabled");
+    }
+    document.getElementById("currentS").textContent = currentS;
+}
+
+function get_offset_top(element) {
+    // Top of an element relative to the document
+    return element.getBoundingClientRect().top + window.pageYOffset;
+}
+
+function set_external_links(root) {
+    // Open the links leaving the document in a new tab
+    for (const link of root.querySelectorAll("a:not([href^='#'])")) {
+        link.setAttribute("target", "_blank");
+    }
+}
+
+function fade_in(element) {
+    // Show a hidden element with a short fade
+    if (element === null || getComputedStyle(element).display !== "none") {
+        return;
+    }
+    element.style.display = "";
+    if (getComputedStyle(element).display === "none") {
+        element.style.display = "block";
+    }
+    if (element.animate) {
+        element.animate([{ opacity: 0 }, { opacity: 1 }], 400);
+    }
+}
+
+function fade_out(element) {
+    // Hide an element with a short fade
+    if (element === null || getComputedStyle(element).display === "none") {
+        return;
+    }
+    if (!element.animate) {
+        element.style.display = "none";
+        return;
+    }
+    element.animate([{ opacity: 1 }, { opacity: 0 }], 400).onfinish = () => {
+        element.style.display = "none";
+    };
+}
+
+function build_page_offsets() {
+    // Sorted top offset of each page from the start of the document, rebuilt on zoom and resize only
+    let scrollTop = page_container.scrollTop * window.zoom;
+    pages = new Array(pf.length);
+    for (let i = 0; i < pf.length; i++) {
+        pages[i] = get_offset_top(pf[i]) + scrollTop;
+    }
+}
+
+function getCurrentPage(scrollTop) {
+    // Binary search of the last page starting before the reading position
+    if (scrollTop === undefined) {
+        scrollTop = page_container.scrollTop;
+    }
+    if (pages.length == 0) {
+        return "";
+    }
+    let pos = (scrollTop + 250) * window.zoom;
+    let low = 0;
+    let high = pages.length;
+    while (low < high) {
+        let middle = (low + high) >> 1;
+        if (pages[middle] <= pos) {
+            low = middle + 1;
         }
-        else if (currentS == 1) {
-            $("#prevS").addClass("disabled");
-            $("#nextS").removeClass("disabled");
+        else {
+            high = middle;
         }
     }
-    else if (currentS == 1) {
-        $("#prevS").addClass("disabled");
-        $("#nextS").removeClass("disabled");
+    return get_page_label(Math.max(low, 1));
+}
+
+function get_page_index(page) {
+    // Index in the rendered pages of a 1 based document page, -1 if it was not rendered
+    if (rendered_pages === null) {
+        return page - 1;
     }
-    $("#currentS").text(currentS);
-    scroll_to = "chunk-" + allowed_i[currentS - 1];
-    document.getElementById(scroll_to).scrollIntoView({
-        behavior: 'smooth'
+    return (page in page_map) ? page_map[page] : -1;
+}
+
+function get_page_label(number) {
+    // Label of the 1 based rendered page, showing the document page number
+    if (rendered_pages === null) {
+        return number + " / " + pages.length;
+    }
+    return rendered_pages[number - 1] + " / " + page_count;
+}
+
+function scroll_to_chunk(chunk_id) {
+    // Scroll to a chunk box, loading its page first if needed
+    let index = parseInt(chunk_id.replace("chunk-", ""), 10);
+    let scroll = () => {
+        let element = document.getElementById(chunk_id);
+        if (element) {
+            element.scrollIntoView({
+                behavior: 'smooth'
+            });
+        }
+    };
+    if (document.getElementById(chunk_id) || !(index in chunk_pages)) {
+        scroll();
+        return;
+    }
+    Promise.all([load_page(chunk_pages[index]), draw_page_chunks(chunk_pages[index])]).then(() => {
+        if (viewport_boxes) {
+            render_page_boxes(chunk_pages[index]);
+        }
+        scroll();
     });
 }
 
-function getCurrentPage() {
-    pos = ($("#page-container").scrollTop() + 250) * window.zoom;
-    page = "";
-    for (i in pages) {
-        if (pos < pages[i]) {
-            if (i == 0) {
-                page = "1 / " + pages.length;
+function load_chunk_index() {
+    // Fetch the index of the chunks: the page, bookmark position and top of each chunk, and the pages having boxes
+    if (chunk_index === null) {
+        chunk_index = fetch(chunk_data_url + "index.json").then((response) => response.json());
+    }
+    return chunk_index;
+}
+
+function draw_chunk_index(index) {
+    // Map each chunk to its first page and draw the scrollbar bookmarks
+    drawn_pages = {};
+    for (let i = 0; i < index.chunks.length; i++) {
+        let chunk = index.chunks[i];
+        if (chunk === null) {
+            continue;
+        }
+        let pageIndex = get_page_index(chunk[0]);
+        if (pageIndex < 0) {
+            // The page of this chunk was not rendered
+            continue;
+        }
+        chunk_pages[i] = pageIndex;
+        if (allowed_i.indexOf(i) != -1 && scrollbar_bookmarks) {
+            add_bookmark(pageIndex, i, chunk[1], chunk[3]);
+        }
+    }
+}
+
+function draw_page_chunks(pageIndex) {
+    // Fetch the boxes of a page and draw them, once per handle_right() run
+    if (chunk_data_url === null) {
+        return Promise.resolve();
+    }
+    if (!(pageIndex in drawn_pages)) {
+        let page = (rendered_pages === null) ? pageIndex + 1 : rendered_pages[pageIndex];
+        drawn_pages[pageIndex] = load_chunk_index().then((index) => {
+            if (index.pages.indexOf(page) == -1) {
+                return;
             }
-            else {
-                page = (i) + " / " + pages.length;
+            if (!(page in chunk_rows)) {
+                chunk_rows[page] = fetch(chunk_data_url + "page-" + page + ".json").then((response) => response.json());
             }
-            break;
+            return chunk_rows[page].then((rows) => {
+                // Rows are [chunk, left, top, width, height] with percentages of the page size,
+                // the first box of a chunk on its first page gets the chunk id
+                let added = {};
+                for (const row of rows) {
+                    let chunk = row[0];
+                    let first = !(chunk in added) && chunk_pages[chunk] === pageIndex;
+                    added[chunk] = true;
+                    let addedClass = index.chunks[chunk][2] ? "slide" : "text";
+                    let box = [page, row[1], row[2], row[3], row[4]];
+                    add_box(pageIndex, chunk, box, allowed_i.indexOf(chunk) != -1, addedClass, first);
+                }
+            });
+        }).catch(() => {
+            delete drawn_pages[pageIndex];
+        });
+    }
+    return drawn_pages[pageIndex];
+}
+
+function observe_chunk_data() {
+    // Draw the boxes of the pages that get close to the viewport
+    if (chunk_observer !== null) {
+        chunk_observer.disconnect();
+    }
+    if (!("IntersectionObserver" in window)) {
+        for (let i = 0; i < pf.length; i++) {
+            draw_page_chunks(i);
         }
-        if (i == pages.length - 1) {
-            page = pages.length + " / " + pages.length;
+        return;
+    }
+    chunk_observer = new IntersectionObserver((entries) => {
+        for (const entry of entries) {
+            if (entry.isIntersecting) {
+                draw_page_chunks(Number(entry.target.dataset.pageIndex));
+            }
         }
+    }, {
+        root: page_container,
+        rootMargin: "100% 0px"
+    });
+    for (let i = 0; i < pf.length; i++) {
+        chunk_observer.observe(pf[i]);
     }
-    return page;
-}
\ No newline at end of file
+}
+
+function is_page_loaded(index) {
+    // Pages are placeholders until loaded when they're split into separate files
+    return !lazy_pages || !pf[index].hasAttribute("data-page-url");
+}
+
+function load_page(index) {
+    // Fetch the content of a lazy loaded page, and draw its boxes once mounted
+    let page = pf[index];
+    if (is_page_loaded(index)) {
+        return Promise.resolve();
+    }
+    if (!page._loading) {
+        page._loading = fetch(page.getAttribute("data-page-url"))
+            .then((response) => response.text())
+            .then((text) => {
+                let template = document.createElement("template");
+                template.innerHTML = text;
+                let loaded = template.content.querySelector(".pf") || template.content;
+
+                // Keep the placeholder element, so page offsets and drawn boxes stay valid
+                page.prepend(...loaded.childNodes);
+                page.removeAttribute("data-page-url");
+                if (page_observer !== null) {
+                    page_observer.unobserve(page);
+                }
+                set_external_links(page);
+                for (const box of (page_boxes[index] || [])) {
+                    page.appendChild(box);
+                }
+                delete page_boxes[index];
+                if (viewport_boxes && visible_pages[index]) {
+                    schedule_page_boxes(index);
+                }
+            })
+            .catch(() => {
+                page._loading = null;
+            });
+    }
+    return page._loading;
+}
+
+function observe_pages() {
+    // Load the pages that get close to the viewport
+    if (!lazy_pages) {
+        return;
+    }
+    if (!("IntersectionObserver" in window)) {
+        for (let i = 0; i < pf.length; i++) {
+            load_page(i);
+        }
+        return;
+    }
+    page_observer = new IntersectionObserver((entries) => {
+        for (const entry of entries) {
+            if (entry.isIntersecting) {
+                load_page(Number(entry.target.dataset.pageIndex));
+            }
+        }
+    }, {
+        root: page_container,
+        rootMargin: "100% 0px"
+    });
+    for (let i = 0; i < pf.length; i++) {
+        if (!is_page_loaded(i)) {
+            page_observer.observe(pf[i]);
+        }
+    }
+}
@@ -10,16 +10,16 @@ window.show_single_chunk = {#_show_single_chunk_#};
 window.chunks_navigator = {#_chunks_navigator_#};
 window.chunks = {#_boxes_data_#};
 
-$(window).on("load", (e) => {
-    $('.zoom').fadeIn();
-    $("#sheet_preview").css('zoom', window.zoom);
-    window.all_links = $("a", $("#tabs").contents());
-    window.all_links.click(
+window.addEventListener("load", (e) => {
+    document.querySelectorAll(".zoom").forEach(fade_in);
+    document.getElementById("sheet_preview").style.zoom = window.zoom;
+    window.all_links = Array.from(document.getElementById("tabs").contentDocument.querySelectorAll("a"));
+    window.all_links.forEach((link) => link.addEventListener("click",
         (e) => {
-            window.all_links.removeClass('bold');
-            $(e.currentTarget).addClass("bold");
+            window.all_links.forEach((x) => x.classList.remove('bold'));
+            e.currentTarget.classList.add("bold");
         }
-    );
+    ));
     const chunks_i = get_param_value("chunks");
     for (let i = 0; i < chunks_i.length; i++) {
         if (chunks_i[i] < chunks.length) {
@@ -46,9 +46,9 @@ $(window).on("load", (e) => {
 
     totalS = sheets.length;
 
-    window.all_links.each(function (index, element) {
-        if (sheets.indexOf(index) != -1) {
-            $(element).parents("td").addClass("highlight");
+    window.all_links.forEach(function (element, index) {
+        if (sheets.indexOf(index) != -1 && element.closest("td") !== null) {
+            element.closest("td").classList.add("highlight");
         }
     });
 
@@ -91,20 +91,8 @@ function next_chunk() {
     }
     if (currentS < totalS) {
         currentS++;
-        if (currentS < totalS) {
-            $("#nextS").removeClass("disabled");
-            $("#prevS").removeClass("disabled");
-        }
-        else if (currentS == totalS) {
-            $("#prevS").removeClass("disabled");
-            $("#nextS").addClass("disabled");
-        }
     }
-    else if (currentS == totalS) {
-        $("#prevS").removeClass("disabled");
-        $("#nextS").addClass("disabled");
-    }
-    $("#currentS").text(currentS);
+    update_navigator();
     window.all_links[sheets[window.currentS - 1]].click();
 }
 
@@ -114,21 +102,28 @@ function prev_chunk() {
     }
     if (currentS > 1) {
         currentS--;
-        if (currentS > 1) {
-            $("#nextS").removeClass("disabled");
-            $("#prevS").removeClass("disabled");
-        }
-        else if (currentS == 1) {
-            $("#prevS").addClass("disabled");
-            $("#nextS").removeClass("disabled");
-        }
+    }
+    update_navigator();
+    window.all_links[sheets[window.currentS - 1]].click();
+}
+
+function update_navigator() {
+    // Enable the previous and next buttons depending on the current chunk
+    let prev = document.getElementById("prevS");
+    let next = document.getElementById("nextS");
+    if (currentS < window.totalS && currentS > 1) {
+        next.classList.remove("disabled");
+        prev.classList.remove("disabled");
+    }
+    else if (currentS == window.totalS) {
+        prev.classList.remove("disabled");
+        next.classList.add("disabled");
     }
     else if (currentS == 1) {
-        $("#prevS").addClass("disabled");
-        $("#nextS").removeClass("disabled");
+        prev.classList.add("disabled");
+        next.classList.remove("disabled");
     }
-    $("#currentS").text(currentS);
-    window.all_links[sheets[window.currentS - 1]].click();
+    document.getElementById("currentS").textContent = currentS;
 }
 
 function get_param_value(key) {
@@ -148,44 +143,61 @@ function zoom_in() {
     if (window.zoom <= max_zoom) {
         window.zoom += 0.1;
     }
-    $("#sheet_preview").css('zoom', window.zoom);
+    document.getElementById("sheet_preview").style.zoom = window.zoom;
 };
 
 function zoom_out() {
     if (window.zoom > min_zoom) {
         window.zoom -= 0.1;
     }
-    $("#sheet_preview").css('zoom', window.zoom);
+    document.getElementById("sheet_preview").style.zoom = window.zoom;
 };
 
 function handle_suggestions() {
+    let navigator_element = document.getElementById("navigator");
     if (!chunks_navigator) {
-        $("#navigator").fadeOut();
+        fade_out(navigator_element);
     }
     else if (window.totalS == 1 && !show_single_chunk) {
-        $("#navigator").fadeOut();
+        fade_out(navigator_element);
     }
 
     else if (window.totalS == 0) {
-        $("#navigator").fadeOut();
+        fade_out(navigator_element);
     }
 
     else {
-        $("#navigator").fadeIn();
-        if (currentS < window.totalS && currentS > 1) {
-            $("#nextS").removeClass("disabled");
-            $("#prevS").removeClass("disabled");
-        }
-        else if (currentS == window.totalS) {
-            $("#prevS").removeClass("disabled");
-            $("#nextS").addClass("disabled");
-        }
-        else if (currentS == 1) {
-            $("#prevS").addClass("disabled");
-            $("#nextS").removeClass("disabled");
-        }
-        $("#currentS").text(currentS);
-        $("#totalS").text(window.totalS);
+        fade_in(navigator_element);
+        update_navigator();
+        document.getElementById("totalS").textContent = window.totalS;
     }
     return;
 }
+
+function fade_in(element) {
+    // Show a hidden element with a short fade
+    if (element === null || getComputedStyle(element).display !== "none") {
+        return;
+    }
+    element.style.display = "";
+    if (getComputedStyle(element).display === "none") {
+        element.style.display = "block";
+    }
+    if (element.animate) {
+        element.animate([{ opacity: 0 }, { opacity: 1 }], 400);
+    }
+}
+
+function fade_out(element) {
+    // Hide an element with a short fade
+    if (element === null || getComputedStyle(element).display === "none") {
+        return;
+    }
+    if (!element.animate) {
+        element.style.display = "none";
+        return;
+    }
+    element.animate([{ opacity: 1 }, { opacity: 0 }], 400).onfinish = () => {
+        element.style.display = "none";
+    };
+}
\ No newline at end of file
@@ -1,11 +1,92 @@
-import json, re, shutil, warnings
-from subprocess import run
+import asyncio, json, os, re, shutil, signal, time, warnings
+from subprocess import run, DEVNULL, TimeoutExpired
 from bs4 import BeautifulSoup, Comment
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from .asset_store import AssetStore
+from .chunks import ChunkStore
+from .conversion_cache import ConversionCache, DEFAULT_CACHE_MAX_SIZE
+from .css_pruning import collect_classes, get_pruning_substitution
+from .font_optimization import check_font_optimization, get_font_substitution, optimize_fonts
+from .geometry import iter_chunk_geometry, read_page_sizes
+from .hashed_assets import hash_file_name, rewrite_css_urls, rewrite_html_urls
+from .image_optimization import IMAGE_SUFFIXES, check_image_optimization, get_max_image_size, optimize_images
+from .precompress import compress_files, get_available_encodings, remove_orphan_variants, ENCODING_SUFFIXES
+from .pdf_sharding import get_pdf_page_count, merge_html_shards, merge_page_ranges, split_page_ranges
+from .runtime import (CONFIG_SCRIPT, THEME_STYLES, build_config_script, build_shared_script,
+                      build_shared_styles, build_theme_styles, fill_template, write_runtime_file)
+from .streaming import DEFAULT_BLOCK_SIZE, rewrite_css_file, rewrite_html_file
 
 # Define supported sheet formats for special handling
 SHEET_FORMATS = [".xlsx", ".xls", ".ods"]
 
+# Name of the file describing a generated viewer, stored inside its assets directory
+VIEWER_MANIFEST = "preprocess-viewer.json"
+
+# Options that only apply to the conversion run (temporary directories, caches, worker
+# counts), they're not stored in the viewer manifest nor reused when the viewer is updated
+RUN_CONFIGS = [
+    "libreoffice_profile", "libreoffice_pool", "scratch_dir", "cache_dir", "cache_max_size",
+    "font_workers", "image_workers", "precompress_workers",
+]
+
+# Name of the file mapping the original asset paths to their content-hashed names
+ASSET_MANIFEST = "asset-manifest.json"
+
+# Name of the file listing the raw and compressed sizes of the precompressed files
+COMPRESSION_MANIFEST = "compression-manifest.json"
+
+# Text files of a viewer that get precompressed variants
+TEXT_SUFFIXES = [".html", ".css", ".js", ".page"]
+
+# Names of the viewer styles and scripts when they are generated for each document
+CUSTOM_STYLES = "preprocess-custom-styles.css"
+CUSTOM_SCRIPTS = "preprocess-custom-scripts.js"
+
+# Base name of the shared runtime files
+RUNTIME_STEM = "viewer-runtime"
+
+# Options shared by every render profile: assets written to separate files
+# (lowercase letters of --embed), text kept extractable for the chunks
+BASE_PDF2HTMLEX_OPTIONS = [
+    "--embed", "cfijo",             # Don't embed CSS, fonts, images, JavaScript, outline
+    "--decompose-ligature", "1",    # Decompose ligatures for better text extraction
+    "--tounicode", "1",             # Generate ToUnicode mapping
+]
+
+# pdf2htmlEX options of each render profile, "legacy" is used when no profile is configured.
+# The outline isn't processed by the profiles, the viewer removes it.
+RENDER_PROFILES = {
+    "legacy": BASE_PDF2HTMLEX_OPTIONS + [
+        "--debug", "1",                 # Enable debug output
+    ],
+    "fast": BASE_PDF2HTMLEX_OPTIONS + [
+        "--bg-format", "jpg",           # Smaller and faster to encode backgrounds
+        "--dpi", "96",                  # Background resolution
+        "--optimize-text", "1",         # Merge text runs, fewer elements and classes
+        "--process-outline", "0",
+        "--embed-external-font", "0",   # Don't look up local fonts for non-embedded ones
+        "--fallback", "0",
+        "--debug", "0",
+    ],
+    "balanced": BASE_PDF2HTMLEX_OPTIONS + [
+        "--bg-format", "png",
+        "--dpi", "144",
+        "--optimize-text", "1",
+        "--process-outline", "0",
+        "--fallback", "0",
+        "--debug", "0",
+    ],
+    "quality": BASE_PDF2HTMLEX_OPTIONS + [
+        "--bg-format", "png",
+        "--dpi", "300",
+        "--optimize-text", "0",         # Keep every text run where the PDF puts it
+        "--process-outline", "0",
+        "--fallback", "0",
+        "--debug", "0",
+    ],
+}
+
 class RAG_Document_Viewer:
     """
     RAG Document Viewer - Document Processing and Preview Generation Tool
@@ -38,7 +119,8 @@ class RAG_Document_Viewer:
         Args:
             filepath (str): Path to the input document file
             distpath (str, optional): Output directory path. Defaults to input file directory
-            chunks (list[list[dict]]): List of bounding box information for chunk highlighting
+            chunks: Bounding box information for chunk highlighting, a list of chunks (lists of box dicts),
+                    an iterator of chunks, a JSONL file path, a dict of columns or a ChunkStore
             configs (dict): Configuration options for styling and features
         """
         # Convert string paths to Path objects
@@ -51,9 +133,24 @@ class RAG_Document_Viewer:
         # Chunks are required for RAG functionality - they define chunk boundaries
         if chunks is None:
             raise Exception("Please pass a chunks' boxes info to build the previewer.")
-        self._chunks = chunks
+        self._chunks = ChunkStore.load(chunks)
         
         self._ext = self._path_in.suffix
+
+        # Pages kept when only part of the document is rendered (None means all pages)
+        self._rendered_pages = None
+        self._page_count = None
+
+        # Size of each rendered page, read from the pdf2htmlEX output
+        self._page_sizes = None
+
+        # Fail before converting when an option is invalid, or an optional package needed by the output stages is missing
+        self._get_render_profile()
+        if self._use_font_optimization():
+            check_font_optimization()
+        if self._use_image_optimization():
+            check_image_optimization(self._configs.get("image_format", "png"))
+        self._get_precompress_encodings()
         
         # Validate input file exists
         if not self._path_in.exists():
@@ -68,13 +165,407 @@ class RAG_Document_Viewer:
         """
         Main method to orchestrate the conversion process.
         Handles preparation, generation, and cleanup in sequence.
+        When a conversion cache is configured, the preparation and generation
+        steps are skipped if the same document was already converted.
+
+        Returns:
+            dict: Seconds spent in each stage of the conversion
         """
-        print("** Preparing the input file")
-        self._setup_input_file()
-        print("** Generating the main previewer")
-        self._create_html_preview()
+        timings = {}
+        started = time.perf_counter()
+
+        cache = self._get_conversion_cache()
+        restored = False
+        if cache is not None:
+            print("** Looking up the conversion cache")
+            cache_key = cache.make_key(self._path_in, self._get_conversion_options())
+            restored = self._restore_from_cache(cache, cache_key)
+            timings["cache_lookup"] = time.perf_counter() - started
+
+        if not restored:
+            # Remember what was in the output directory so only new files get cached
+            existing = set(self._path.iterdir()) if self._path.exists() else set()
+
+            stage_started = time.perf_counter()
+            print("** Preparing the input file")
+            self._setup_input_file()
+            timings["prepare"] = time.perf_counter() - stage_started
+
+            stage_started = time.perf_counter()
+            print("** Generating the main previewer")
+            self._create_html_preview()
+            timings["generate"] = time.perf_counter() - stage_started
+
+            if cache is not None:
+                stage_started = time.perf_counter()
+                print("  |_ Storing the conversion output in the cache.")
+                produced = [x for x in self._path.iterdir() if x not in existing]
+                cache.put(cache_key, produced, self._get_conversion_state())
+                timings["cache_store"] = time.perf_counter() - stage_started
+
+        stage_started = time.perf_counter()
         print("** Cleaning the files")
         self._organize_output_files()
+        timings["cleanup"] = time.perf_counter() - stage_started
+
+        timings["total"] = time.perf_counter() - started
+        return timings
+
+
+    async def convert_document_async(self):
+        """
+        Asyncio variant of convert_document().
+        LibreOffice and pdf2htmlEX run as asyncio subprocesses, and the file
+        copies and HTML post-processing run in the default executor, so the
+        event loop is never blocked. Cancelling the task kills the converter
+        process tree.
+
+        Returns:
+            dict: Seconds spent in each stage of the conversion
+        """
+        loop = asyncio.get_running_loop()
+        timings = {}
+        started = time.perf_counter()
+
+        cache = self._get_conversion_cache()
+        restored = False
+        if cache is not None:
+            print("** Looking up the conversion cache")
+            cache_key = await loop.run_in_executor(None, cache.make_key, self._path_in, self._get_conversion_options())
+            restored = await loop.run_in_executor(None, self._restore_from_cache, cache, cache_key)
+            timings["cache_lookup"] = time.perf_counter() - started
+
+        if not restored:
+            # Remember what was in the output directory so only new files get cached
+            existing = set(self._path.iterdir()) if self._path.exists() else set()
+
+            stage_started = time.perf_counter()
+            print("** Preparing the input file")
+            if await loop.run_in_executor(None, self._prepare_input_file):
+                print("  |_ Converting the file to pdf.")
+                await self._execute_pdf_conversion_async()
+                self._use_converted_pdf()
+            timings["prepare"] = time.perf_counter() - stage_started
+
+            stage_started = time.perf_counter()
+            print("** Generating the main previewer")
+            await self._execute_html_conversion_async()
+            self._verify_html_preview()
+            timings["generate"] = time.perf_counter() - stage_started
+
+            if cache is not None:
+                stage_started = time.perf_counter()
+                print("  |_ Storing the conversion output in the cache.")
+                produced = [x for x in self._path.iterdir() if x not in existing]
+                await loop.run_in_executor(None, cache.put, cache_key, produced, self._get_conversion_state())
+                timings["cache_store"] = time.perf_counter() - stage_started
+
+        stage_started = time.perf_counter()
+        print("** Cleaning the files")
+        await loop.run_in_executor(None, self._organize_output_files)
+        timings["cleanup"] = time.perf_counter() - stage_started
+
+        timings["total"] = time.perf_counter() - started
+        return timings
+
+
+    async def _execute_html_conversion_async(self):
+        """
+        Asyncio variant of _execute_html_conversion().
+        """
+        loop = asyncio.get_running_loop()
+        if self._ext not in SHEET_FORMATS:
+            commands = self._build_html_conversion_commands()
+            semaphore = asyncio.Semaphore(self._get_render_workers(len(commands)))
+
+            async def render(command):
+                async with semaphore:
+                    await _run_command_async(command, timeout=600)
+
+            tasks = [asyncio.ensure_future(render(x)) for x in commands]
+            try:
+                await asyncio.gather(*tasks)
+            except BaseException:
+                # Stop the other page ranges when one of them fails
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                raise
+            if len(commands) > 1:
+                await loop.run_in_executor(None, self._merge_html_shards, len(commands))
+            return
+
+        pool = self._configs.get("libreoffice_pool", None)
+        if pool is not None:
+            await loop.run_in_executor(None, pool.convert, self._path_in, self._path / f"{self._path_in.stem}.html", "html")
+            return
+
+        await _run_command_async(self._build_libreoffice_command("html"), timeout=600)
+
+
+    async def _execute_pdf_conversion_async(self):
+        """
+        Asyncio variant of _execute_pdf_conversion().
+        """
+        pool = self._configs.get("libreoffice_pool", None)
+        if pool is not None:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, pool.convert, self._path_in, self._path / f"{self._path_in.stem}.pdf", "pdf")
+            return
+
+        await _run_command_async(self._build_libreoffice_command("pdf"), timeout=600)
+
+
+    def _get_conversion_cache(self) -> ConversionCache:
+        """
+        Build the conversion cache from the configuration.
+
+        Returns:
+            ConversionCache: The configured cache, or None if caching is disabled
+        """
+        cache_dir = self._configs.get("cache_dir", None)
+        if cache_dir is None:
+            return None
+        return ConversionCache(cache_dir, self._configs.get("cache_max_size", DEFAULT_CACHE_MAX_SIZE))
+
+
+    def _get_conversion_options(self) -> dict:
+        """
+        Collect every option that changes the conversion output.
+        Used as part of the conversion cache key.
+
+        Returns:
+            dict: Options affecting LibreOffice and pdf2htmlEX output
+        """
+        return {
+            "file_name": self._file_name_in,
+            "format": self._ext,
+            "pdf2htmlEX": self._get_pdf2htmlex_options(),
+            "html_shards": int(self._configs.get("html_shards", 1)),
+            "render_pages": self._configs.get("render_pages", "all"),
+            "context_pages": int(self._configs.get("context_pages", 0)),
+            "render_gap": int(self._configs.get("render_gap", 5)),
+            "chunk_pages": sorted(self._get_chunk_pages()) if self._configs.get("render_pages", "all") == "chunks" else [],
+        }
+
+
+    def _get_conversion_state(self) -> dict:
+        """
+        Get the state produced by the conversion that later stages depend on.
+        Stored with the cached conversion output.
+
+        Returns:
+            dict: Converted file name and rendered pages
+        """
+        return {
+            "file_name_in": self._file_name_in,
+            "rendered_pages": self._rendered_pages,
+            "page_count": self._page_count,
+        }
+
+
+    def _restore_from_cache(self, cache: ConversionCache, cache_key: str) -> bool:
+        """
+        Restore the converted files from the cache into the output directory.
+
+        Args:
+            cache (ConversionCache): The conversion cache
+            cache_key (str): Key of the current document
+
+        Returns:
+            bool: True on a cache hit, False otherwise
+        """
+        self._path.mkdir(parents=True, exist_ok=True)
+        meta = cache.get(cache_key, self._path)
+        if meta is None:
+            print("  |_ Cache miss, converting the document.")
+            return False
+
+        print("  |_ Cache hit, reusing the converted document.")
+        self._file_name_in = meta["file_name_in"]
+        self._rendered_pages = meta.get("rendered_pages", None)
+        self._page_count = meta.get("page_count", None)
+        return True
+
+
+    @classmethod
+    def from_output(cls, distpath, chunks: list[list[dict]] = None, configs={}):
+        """
+        Load an already generated viewer to update its chunks or configuration.
+        
+        Args:
+            distpath (str): Path of the generated viewer directory
+            chunks (optional): New chunks in any format accepted by ChunkStore.load(), the stored ones are kept if not set
+            configs (dict): Configuration options overriding the stored ones
+            
+        Returns:
+            RAG_Document_Viewer: Viewer bound to the existing output directory
+        """
+        path = Path(distpath)
+        manifest_path = path / "assets" / VIEWER_MANIFEST
+        if not manifest_path.exists():
+            raise FileNotFoundError(f"There is no generated viewer inside {path}, please generate it first.")
+        manifest = json.loads(manifest_path.read_text())
+
+        viewer = cls.__new__(cls)
+        viewer._path = path
+        viewer._file_name_in = manifest["file_name"]
+        viewer._path_in = path / viewer._file_name_in
+        viewer._ext = manifest["ext"]
+        # Manifests of older versions may hold the options of their conversion run
+        stored = {key: value for key, value in manifest["configs"].items() if key not in RUN_CONFIGS}
+        viewer._configs = {**stored, **configs}
+        viewer._chunks = ChunkStore.load(manifest["chunks"] if chunks is None else chunks)
+        viewer._rendered_pages = manifest.get("rendered_pages", None)
+        viewer._page_count = manifest.get("page_count", None)
+        viewer._page_sizes = manifest.get("page_sizes", None)
+        return viewer
+
+
+    def update_overlay(self):
+        """
+        Regenerate only the chunk overlay of an already generated viewer.
+        Rewrites the custom scripts, the custom styles and the viewer controls,
+        without converting the document again.
+        """
+        assets_dir = self._path / "assets"
+        index_path = self._path / "index.html"
+        control_ids = ["scrollbar", "navigator", "page-number", "zoom-out", "zoom-in"]
+        head_tags, body_tags = self._build_viewer_asset_tags()
+
+        if self._ext in SHEET_FORMATS:
+            bs = BeautifulSoup(self._read_file_content(index_path), self._get_html_parser())
+
+            # Replace the chunk navigator
+            for x in bs.find_all("div", {"id": "navigator"}):
+                x.decompose()
+            bs.find("body").insert(0, BeautifulSoup(self._build_sheet_navigator(), "html.parser"))
+            self._replace_viewer_asset_tags(bs, head_tags, body_tags)
+            self._write_file_content(index_path, str(bs))
+
+            # Replace the tabstrip colors
+            tabstrip_path = assets_dir / "sheets" / "tabstrip.html"
+            tabstrip = BeautifulSoup(self._read_file_content(tabstrip_path), "html.parser")
+            tabstrip.find("style").replace_with(BeautifulSoup(self._generate_tabstrip_styles(), "html.parser"))
+            self._write_file_content(tabstrip_path, str(tabstrip))
+        elif self._use_streaming():
+            # Replace the viewer controls without loading the document in memory
+            rewrite_html_file(
+                index_path,
+                self._get_stream_block_size(),
+                remove_element=lambda tag, attrs: (
+                    (tag == "div" and attrs.get("id") in control_ids) or self._is_viewer_asset(tag, attrs)
+                ),
+                head_end=head_tags,
+                body_start=self._build_ui_components(),
+                body_end=body_tags,
+            )
+        else:
+            bs = BeautifulSoup(self._read_file_content(index_path), self._get_html_parser())
+
+            # Replace the viewer controls
+            for element_id in control_ids:
+                for x in bs.find_all("div", {"id": element_id}):
+                    x.decompose()
+            bs.find("body").insert(0, BeautifulSoup(self._build_ui_components(), "html.parser"))
+            self._replace_viewer_asset_tags(bs, head_tags, body_tags)
+            self._write_file_content(index_path, str(bs))
+
+        self._write_viewer_files()
+        self._write_chunk_data()
+        self._write_viewer_manifest()
+        self._precompress_output()
+
+
+    def _write_viewer_manifest(self):
+        """
+        Save the state needed to update the viewer later without converting the document again.
+        Only JSON serializable configuration values are stored, without the options of the
+        conversion run (RUN_CONFIGS).
+        """
+        configs = {}
+        for key, value in self._configs.items():
+            if key in RUN_CONFIGS:
+                continue
+            try:
+                json.dumps(value)
+            except (TypeError, ValueError):
+                continue
+            configs[key] = value
+
+        manifest = {
+            "file_name": self._file_name_in,
+            "ext": self._ext,
+            "configs": configs,
+            "chunks": self._chunks.to_columns(),
+            "page_count": self._page_count,
+            "rendered_pages": self._rendered_pages,
+            "omitted_pages": self._get_omitted_pages(),
+            "page_sizes": self._page_sizes,
+        }
+        self._write_file_content(self._path / "assets" / VIEWER_MANIFEST, json.dumps(manifest))
+
+
+    def _use_chunk_data_files(self) -> bool:
+        """
+        Check if the chunk boxes are written to per page data files instead of
+        being embedded in the custom script.
+
+        Returns:
+            bool: True if the chunk data is split per page
+        """
+        return self._configs.get("chunk_data", "inline") == "pages" and self._ext not in SHEET_FORMATS
+
+
+    def _write_chunk_data(self):
+        """
+        Write the chunk boxes as one compact data file per page, and a small index.
+
+        assets/chunks/index.json holds the pages having boxes and, for each chunk,
+        its first page, its bookmark position, whether it covers a full page
+        and the top of its first box (null for chunks without boxes).
+        assets/chunks/page-<n>.json holds the boxes of page n as
+        [chunk, left, top, width, height] rows, in percentages of the page size.
+        """
+        chunks_dir = self._path / "assets" / "chunks"
+        if chunks_dir.exists():
+            shutil.rmtree(chunks_dir)
+        if not self._use_chunk_data_files():
+            return
+        chunks_dir.mkdir(parents=True)
+
+        # Each chunk adds one serialized fragment of rows per page it has boxes on
+        index = []
+        pages = {}
+        for i, (slide, bookmark, boxes) in enumerate(self._get_chunk_geometry()):
+            if len(boxes) == 0:
+                index.append(None)
+                continue
+            index.append([boxes[0][0], bookmark, slide, boxes[0][2]])
+            rows = {}
+            for page, left, top, width, height in boxes:
+                rows.setdefault(page, []).append([i, left, top, width, height])
+            for page, page_rows in rows.items():
+                pages.setdefault(page, []).append(json.dumps(page_rows, separators=(",", ":"))[1:-1])
+
+        for page, fragments in pages.items():
+            self._write_file_content(chunks_dir / f"page-{page}.json", f"[{','.join(fragments)}]")
+        self._write_file_content(
+            chunks_dir / "index.json",
+            json.dumps({"pages": sorted(pages), "chunks": index}, separators=(",", ":"))
+        )
+
+
+    def _get_chunk_geometry(self):
+        """
+        Precompute what the viewer draws for each chunk: merged boxes in
+        percentages of their page, and scrollbar bookmark positions.
+        The geometry is generated one chunk at a time.
+
+        Returns:
+            iterator: [slide, bookmark, boxes] for each chunk, see iter_chunk_geometry()
+        """
+        return iter_chunk_geometry(self._chunks, self._page_sizes, self._rendered_pages)
 
 
     def _create_html_preview(self):
@@ -83,8 +574,13 @@ class RAG_Document_Viewer:
         Validates that the conversion was successful.
         """
         self._execute_html_conversion()
-        
-        # Verify HTML conversion was successful
+        self._verify_html_preview()
+
+
+    def _verify_html_preview(self):
+        """
+        Verify the HTML conversion was successful.
+        """
         path_out = self._path / self._file_name_in
         html_path = path_out.with_suffix('.html')
         if not html_path.exists():
@@ -96,6 +592,20 @@ class RAG_Document_Viewer:
         Prepare the input file for conversion.
         Creates output directory and converts non-PDF files to PDF if needed.
         """
+        if self._prepare_input_file():
+            # Convert other formats to PDF first using LibreOffice
+            print("  |_ Converting the file to pdf.")
+            self._execute_pdf_conversion()
+            self._use_converted_pdf()
+
+
+    def _prepare_input_file(self) -> bool:
+        """
+        Create the output directory and copy the input file inside it.
+        
+        Returns:
+            bool: True if the input file still has to be converted to PDF
+        """
         print("  |_ Making a main dir to put all files inside it.")
         # Create output directory if it doesn't exist
         if not self._path.exists():
@@ -107,31 +617,33 @@ class RAG_Document_Viewer:
             if pdf_path.exists():
                 print("  |_ There is pdf version exist inside the path, will be used.")
                 self._file_name_in = pdf_name
-                return
+                return False
 
         # Handle different file types
         if self._ext in SHEET_FORMATS:
             # Spreadsheet files get special handling - copy directly
             print("  |_ It's a sheet, loading sheet previewer generator.")
             shutil.copy2(self._path_in, self._path)
-            return
+            return False
             
         elif self._ext == ".pdf":
             # PDF files are copied as-is
             print("  |_ It's already pdf, copy it inside and load previewer generator.")
             shutil.copy2(self._path_in, self._path)
-            return
-            
-        elif self._ext != ".pdf":
-            # Convert other formats to PDF first using LibreOffice
-            print("  |_ Converting the file to pdf.")
-            self._execute_pdf_conversion()
-            # Verify PDF conversion was successful
-            pdf_name = self._path_in.stem + ".pdf"
-            pdf_path = self._path / pdf_name
-            if not pdf_path.exists():
-                raise Exception(f"The converted pdf version from {self._file_name_in} not exist.")
-            self._file_name_in = pdf_name
+            return False
+
+        return True
+
+
+    def _use_converted_pdf(self):
+        """
+        Verify the PDF conversion was successful and use the PDF as input.
+        """
+        pdf_name = self._path_in.stem + ".pdf"
+        pdf_path = self._path / pdf_name
+        if not pdf_path.exists():
+            raise Exception(f"The converted pdf version from {self._file_name_in} not exist.")
+        self._file_name_in = pdf_name
 
 
     def _execute_html_conversion(self):
@@ -141,46 +653,282 @@ class RAG_Document_Viewer:
         """
         if self._ext not in SHEET_FORMATS:
             # Use pdf2htmlEX for PDF to HTML conversion with specific options
-            command_tool = [
-                "pdf2htmlEX",
-                "--embed",           # Embed all resources
-                "cfijo",            # Embed CSS, fonts, images, JavaScript, outline
-                "--decompose-ligature", "1",  # Decompose ligatures for better text extraction
-                "--tounicode", "1",  # Generate ToUnicode mapping
-                "--debug", "1",      # Enable debug output
-                "--tmp-dir", str(self._path),     # Temporary directory
-                "--dest-dir", str(self._path),    # Output directory
-                str(self._path / self._file_name_in)
-            ]
+            commands = self._build_html_conversion_commands()
+            if len(commands) > 1:
+                # Render the page ranges concurrently, every pdf2htmlEX process runs on its own core
+                with ThreadPoolExecutor(max_workers=self._get_render_workers(len(commands))) as executor:
+                    list(executor.map(lambda x: run(x, capture_output=True, timeout=600), commands))
+                self._merge_html_shards(len(commands))
+                return
+            command_tool = commands[0]
         else:
+            # Send the conversion to the LibreOffice worker pool if one is configured
+            pool = self._configs.get("libreoffice_pool", None)
+            if pool is not None:
+                pool.convert(self._path_in, self._path / f"{self._path_in.stem}.html", "html")
+                return
+
             # Use LibreOffice for spreadsheet to HTML conversion
-            command_tool = [
-                "libreoffice",
-                "--headless",        # Run without GUI
-                "--convert-to", "html",  # Convert to HTML format
-                "--outdir", str(self._path),  # Output directory
-                str(self._path_in)
-            ]
+            command_tool = self._build_libreoffice_command("html")
 
         # Execute the conversion command with timeout
         run(command_tool, capture_output=True, timeout=600)
 
 
+    def _build_html_conversion_commands(self) -> list[list[str]]:
+        """
+        Build the pdf2htmlEX commands converting the prepared PDF to HTML.
+        When `html_shards` is set, the document is split into page ranges
+        rendered by separate pdf2htmlEX processes.
+        
+        Returns:
+            list[list[str]]: One command per page range
+        """
+        page_ranges = self._get_page_ranges()
+        if page_ranges is None:
+            return [self._build_pdf2htmlex_command()]
+        if len(page_ranges) == 1:
+            return [self._build_pdf2htmlex_command(page_ranges[0])]
+
+        print(f"  |_ Rendering the document in {len(page_ranges)} page ranges.")
+        commands = []
+        for index, page_range in enumerate(page_ranges):
+            shard_dir = self._get_shard_dir(index)
+            shard_dir.mkdir(exist_ok=True)
+            commands.append(self._build_pdf2htmlex_command(page_range, shard_dir))
+        return commands
+
+
+    def _get_page_ranges(self) -> list[tuple[int, int]]:
+        """
+        Get the page ranges to render separately.
+        When `render_pages` is "chunks", only the pages referenced by the chunks
+        (plus `context_pages` around them) are rendered.
+        
+        Returns:
+            list[tuple[int, int]]: First and last page of each range, or None to render the whole document at once
+        """
+        shards = int(self._configs.get("html_shards", 1))
+        render_chunk_pages = self._configs.get("render_pages", "all") == "chunks"
+        if shards <= 1 and not render_chunk_pages:
+            return None
+
+        page_count = get_pdf_page_count(self._path / self._file_name_in)
+        if page_count is None:
+            print("  |_ Couldn't read the number of pages, rendering the document at once.")
+            return None
+
+        if not render_chunk_pages:
+            return split_page_ranges(page_count, shards)
+
+        context_pages = int(self._configs.get("context_pages", 0))
+        pages = set()
+        for page in self._get_chunk_pages():
+            pages.update(range(page - context_pages, page + context_pages + 1))
+        pages = sorted(x for x in pages if 1 <= x <= page_count)
+        if len(pages) == 0:
+            print("  |_ The chunks don't reference any page, rendering the whole document.")
+            return split_page_ranges(page_count, shards) if shards > 1 else None
+
+        # Group the pages into contiguous ranges
+        page_ranges = []
+        for page in pages:
+            if page_ranges and page_ranges[-1][1] == page - 1:
+                page_ranges[-1] = (page_ranges[-1][0], page)
+            else:
+                page_ranges.append((page, page))
+        page_ranges = merge_page_ranges(page_ranges, max(1, shards), int(self._configs.get("render_gap", 5)))
+
+        # The pages between merged ranges are rendered too
+        self._rendered_pages = [x for first, last in page_ranges for x in range(first, last + 1)]
+        self._page_count = page_count
+        print(f"  |_ Rendering {len(self._rendered_pages)} of {page_count} pages for the {len(pages)} pages referenced by the chunks.")
+        return page_ranges
+
+
+    def _get_render_workers(self, count: int) -> int:
+        """
+        Get the number of pdf2htmlEX processes running at once.
+        
+        Args:
+            count (int): Number of page ranges to render
+            
+        Returns:
+            int: Number of concurrent processes, at most `html_shards` (or the number of CPUs)
+        """
+        shards = int(self._configs.get("html_shards", 1))
+        return max(1, min(count, shards if shards > 1 else os.cpu_count() or 1))
+
+
+    def _get_chunk_pages(self) -> set[int]:
+        """
+        Get the pages referenced by the chunks.
+        
+        Returns:
+            set[int]: Page numbers (1 based)
+        """
+        return self._chunks.pages()
+
+
+    def _get_omitted_pages(self) -> list[int]:
+        """
+        Get the pages that were not rendered.
+        
+        Returns:
+            list[int]: Page numbers (1 based) left out of the viewer
+        """
+        if self._rendered_pages is None:
+            return []
+        rendered = set(self._rendered_pages)
+        return [x for x in range(1, self._page_count + 1) if x not in rendered]
+
+
+    def _get_shard_dir(self, index: int) -> Path:
+        """
+        Get the directory where the pdf2htmlEX output of a page range is written.
+        
+        Args:
+            index (int): Index of the page range
+            
+        Returns:
+            Path: The shard output directory
+        """
+        return self._path / f".shard-{index}"
+
+
+    def _merge_html_shards(self, count: int):
+        """
+        Stitch the pdf2htmlEX output of the page ranges into one document.
+        
+        Args:
+            count (int): Number of page ranges
+        """
+        print("  |_ Merging the rendered page ranges.")
+        shard_dirs = [self._get_shard_dir(i) for i in range(count)]
+        merge_html_shards(self._path, Path(self._file_name_in).stem, shard_dirs, self._get_stream_block_size())
+
+        # Remove the temporary directories of the page ranges
+        scratch_dir = self._configs.get("scratch_dir", None)
+        if scratch_dir is not None:
+            for shard_dir in shard_dirs:
+                shutil.rmtree(Path(scratch_dir) / shard_dir.name, ignore_errors=True)
+
+
+    def _build_pdf2htmlex_command(self, page_range: tuple[int, int] = None, dest_dir: Path = None) -> list[str]:
+        """
+        Build the pdf2htmlEX command converting the prepared PDF to HTML.
+        
+        Args:
+            page_range (tuple[int, int], optional): First and last page to render, all pages if not set
+            dest_dir (Path, optional): Output directory, defaults to the main output directory
+            
+        Returns:
+            list[str]: The command line to execute
+        """
+        dest_dir = self._path if dest_dir is None else dest_dir
+        tmp_dir = self._configs.get("scratch_dir", None)
+        if tmp_dir is None:
+            tmp_dir = dest_dir
+        elif dest_dir != self._path:
+            # Concurrent pdf2htmlEX runs need separate temporary directories
+            tmp_dir = Path(tmp_dir) / dest_dir.name
+            tmp_dir.mkdir(parents=True, exist_ok=True)
+
+        command_tool = [
+            "pdf2htmlEX",
+            *self._get_pdf2htmlex_options(),
+        ]
+        if page_range is not None:
+            command_tool += [
+                "--first-page", str(page_range[0]),   # First page to render
+                "--last-page", str(page_range[1]),    # Last page to render
+            ]
+        command_tool += [
+            "--tmp-dir", str(tmp_dir),     # Temporary directory
+            "--dest-dir", str(dest_dir),    # Output directory
+            str(self._path / self._file_name_in)
+        ]
+        return command_tool
+
+
+    def _get_pdf2htmlex_options(self) -> list[str]:
+        """
+        Get the pdf2htmlEX rendering options.
+
+        Returns:
+            list[str]: Command line options passed to pdf2htmlEX
+        """
+        options = list(RENDER_PROFILES[self._get_render_profile()])
+        if self._use_lazy_pages():
+            options += ["--split-pages", "1"]  # One file per page, loaded by the viewer on demand
+        return options
+
+
+    def _get_render_profile(self) -> str:
+        """
+        Get the render profile selecting the pdf2htmlEX options.
+
+        Returns:
+            str: "fast", "balanced", "quality", or "legacy" when no profile is configured
+        """
+        profile = self._configs.get("render_profile", None) or "legacy"
+        if profile not in RENDER_PROFILES:
+            raise ValueError(f"Unknown render profile [{profile}], use {[x for x in RENDER_PROFILES if x != 'legacy']}.")
+        return profile
+
+
+    def _use_lazy_pages(self) -> bool:
+        """
+        Check if pages are written to separate files and loaded on demand by the viewer.
+
+        Returns:
+            bool: True if lazy page loading is enabled
+        """
+        return self._configs.get("lazy_pages", False) and self._ext not in SHEET_FORMATS
+
+
     def _execute_pdf_conversion(self):
         """
         Convert document to PDF format using LibreOffice.
         Used as an intermediate step for non-PDF documents.
         """
-        command_tool = [
-                "libreoffice",
-                "--headless",            # Run without GUI
-                "--convert-to", "pdf",   # Convert to PDF format
-                "--outdir", str(self._path),  # Output directory
-                str(self._path_in)
-            ]
+        # Send the conversion to the LibreOffice worker pool if one is configured
+        pool = self._configs.get("libreoffice_pool", None)
+        if pool is not None:
+            pool.convert(self._path_in, self._path / f"{self._path_in.stem}.pdf", "pdf")
+            return
+
+        command_tool = self._build_libreoffice_command("pdf")
         run(command_tool, capture_output=True, timeout=600)
 
 
+    def _build_libreoffice_command(self, target: str) -> list[str]:
+        """
+        Build the LibreOffice command converting the input file.
+        A dedicated user profile is used when `libreoffice_profile` is configured,
+        so concurrent conversions don't share (and lock) the default profile.
+        
+        Args:
+            target (str): Output format passed to --convert-to ("pdf" or "html")
+            
+        Returns:
+            list[str]: The command line to execute
+        """
+        command_tool = [
+            "libreoffice",
+            "--headless",            # Run without GUI
+        ]
+        profile = self._configs.get("libreoffice_profile", None)
+        if profile is not None:
+            command_tool.append(f"-env:UserInstallation={Path(profile).resolve().as_uri()}")
+        command_tool += [
+            "--convert-to", target,  # Convert to the target format
+            "--outdir", str(self._path),  # Output directory
+            str(self._path_in)
+        ]
+        return command_tool
+
+
     def _organize_output_files(self):
         """
         Clean up and organize the generated files.
@@ -189,41 +937,42 @@ class RAG_Document_Viewer:
         if self._ext in SHEET_FORMATS:
             # Special cleanup for spreadsheet files
             self._process_spreadsheet_layout()
+            if self._use_image_optimization():
+                self._optimize_image_files()
+            self._link_shared_assets()
             
             # Add custom styles and scripts for spreadsheet viewer
-            styles_path = self._path / "assets" / "styles" / "preprocess-custom-styles.css"
-            scripts_path = self._path / "assets" / "scripts" / "preprocess-custom-scripts.js"
-            self._write_file_content(styles_path, self._generate_css_styles())
-            self._write_file_content(scripts_path, self._generate_javascript_code())
+            self._write_viewer_files()
+            self._write_viewer_manifest()
+            self._precompress_output()
         else:
             # Regular document cleanup
             css, html = self._get_output_file_paths()
-            css_content = self._read_file_content(css)
-            html_content = self._read_file_content(html)
             
             # Skip if files couldn't be read
-            if css_content == "" or html_content == "":
+            if self._is_empty_file(css) or self._is_empty_file(html):
                 return
             
+            # Clean and enhance HTML content in a single pass
+            self._postprocess_html_file(html)
+
             # Replace transparent color values with unset in CSS class selectors
             # Targets patterns like ".fc123{color:transparent;}" and changes them to ".fc123{color:unset;}"
-            regex = r"(\.fc[0-9]+{color:)(transparent)(;})"
+            # (including the classes scoped to a page range, like ".fc1_s2")
+            regex = r"(\.fc[0-9a-z_]+{color:)(transparent)(;})"
             subst = r"\1unset\3"
-            css_content = re.sub(regex, subst, css_content, 0, re.MULTILINE)
-            self._write_file_content(css, css_content)
+            substitutions = [(regex, subst)]
 
+            # Remove the rules of the generated classes the pages don't use, in the same pass
+            pruned = {}
+            if self._use_css_pruning():
+                substitutions.append(get_pruning_substitution(self._get_used_classes(html), pruned))
+            self._rewrite_css_file(css, substitutions)
+            if self._use_css_pruning():
+                print(f"  |_ Unused CSS rules removed: {pruned.get('rules', 0)}, {pruned.get('bytes', 0)} bytes saved.")
 
-            # Clean and enhance HTML content
-            html_content = self._remove_unwanted_elements(html_content)
-            html_content = self._inject_ui_components(html_content)
-            
-            self._write_file_content(html, html_content)
-            
-            # Add custom styles and scripts
-            custom_styles_path = self._path / "preprocess-custom-styles.css"
-            custom_scripts_path = self._path / "preprocess-custom-scripts.js"
-            self._write_file_content(custom_styles_path, self._generate_css_styles())
-            self._write_file_content(custom_scripts_path, self._generate_javascript_code())
+            # Read the page sizes, used to precompute the chunk geometry
+            self._page_sizes = read_page_sizes(css, html, self._get_stream_block_size())
 
             # Remove pdf2htmlEX generated files that aren't needed
             (self._path / "pdf2htmlEX-64x64.png").unlink(missing_ok=True)
@@ -231,6 +980,44 @@ class RAG_Document_Viewer:
             
             # Reorganize file structure
             self._organize_assets_structure()
+            if self._use_font_optimization():
+                self._optimize_font_files()
+            if self._use_image_optimization():
+                self._optimize_image_files()
+            if self._use_hashed_assets():
+                self._hash_asset_files()
+            self._link_shared_assets()
+
+            # Add custom styles and scripts
+            self._write_viewer_files()
+            self._write_chunk_data()
+            self._write_viewer_manifest()
+            self._precompress_output()
+
+
+    def _use_css_pruning(self) -> bool:
+        """
+        Check if the rules of the unused generated classes (.fc, .fs, .x, .y, .ls, .ws, ...)
+        are removed from the pdf2htmlEX stylesheet.
+
+        Returns:
+            bool: True if the stylesheet is pruned
+        """
+        return self._configs.get("prune_css", False)
+
+
+    def _get_used_classes(self, html_path) -> set[str]:
+        """
+        Get the class names used by the processed HTML file and the lazy page files.
+
+        Args:
+            html_path: Path to the processed pdf2htmlEX HTML file (str or Path)
+
+        Returns:
+            set[str]: Class names used by the document
+        """
+        paths = [html_path] + sorted(self._path.glob("*.page"))
+        return collect_classes(paths, self._get_stream_block_size())
 
 
     def _read_file_content(self, file_path) -> str:
@@ -266,21 +1053,165 @@ class RAG_Document_Viewer:
         with path.open("w") as file:
             file.write(contents)
         return
-    
 
-    def _remove_unwanted_elements(self,  content: str) -> str:
+
+    def _is_empty_file(self, file_path) -> bool:
         """
-        Remove unwanted elements from HTML content.
-        Removes sidebar, loading indicators, and scripts while adding compatibility script.
+        Check if a file is missing or empty, without reading it.
+
+        Args:
+            file_path: Path to the file (str or Path)
+
+        Returns:
+            bool: True if there is nothing to read
+        """
+        path = Path(file_path)
+        return not path.exists() or path.stat().st_size == 0
+
+
+    def _use_streaming(self) -> bool:
+        """
+        Check if the output files are processed in streaming mode.
+        In streaming mode, files are rewritten block by block from disk to disk
+        instead of being loaded in memory, so peak memory is bounded by the
+        block size whatever the document size.
+
+        Returns:
+            bool: True if streaming mode is enabled
+        """
+        return self._configs.get("streaming", False)
+
+
+    def _get_stream_block_size(self) -> int:
+        """
+        Get the number of characters read at once in streaming mode.
+
+        Returns:
+            int: Block size
+        """
+        return int(self._configs.get("streaming_block_size", DEFAULT_BLOCK_SIZE))
+
+
+    def _rewrite_css_file(self, file_path, substitutions: list[tuple[str, str]]):
+        """
+        Apply regex substitutions to a CSS file.
+
+        Args:
+            file_path: Path to the CSS file, rewritten in place (str or Path)
+            substitutions (list[tuple[str, str]]): Regex patterns and their replacements
+        """
+        if self._use_streaming():
+            rewrite_css_file(file_path, substitutions, self._get_stream_block_size())
+            return
+
+        content = self._read_file_content(file_path)
+        for regex, subst in substitutions:
+            content = re.sub(regex, subst, content, 0, re.MULTILINE)
+        self._write_file_content(file_path, content)
+
+
+    def _postprocess_html_file(self, file_path):
+        """
+        Clean and enhance the pdf2htmlEX HTML file.
+        In streaming mode the file is rewritten token by token, otherwise it's
+        parsed once with BeautifulSoup.
+
+        Args:
+            file_path: Path to the HTML file, rewritten in place (str or Path)
+        """
+        if not self._use_streaming():
+            content = self._postprocess_html(self._read_file_content(file_path))
+            self._write_file_content(file_path, content)
+            return
+
+        head_tags, body_tags = self._build_viewer_asset_tags()
+
+        def remove_element(tag, attrs):
+            return (
+                tag == "script"
+                or (tag == "div" and attrs.get("id") == "sidebar")
+                or (tag == "div" and "loading-indicator" in (attrs.get("class") or "").split())
+                or (tag == "meta" and attrs.get("name") == "generator")
+            )
+
+        rewrite_html_file(
+            file_path,
+            self._get_stream_block_size(),
+            remove_element=remove_element,
+            remove_comments=True,
+            rewrite_attributes=self._rewrite_asset_attributes,
+            title=Path(self._file_name_in).stem,
+            head_end=(
+                '<script src="./assets/scripts/compatibility.min.js"></script>'
+                + head_tags
+            ),
+            body_start=self._build_ui_components(),
+            body_end=body_tags,
+        )
+
+
+    def _postprocess_html(self, content: str) -> str:
+        """
+        Clean and enhance the pdf2htmlEX HTML content.
+        The document is parsed once, and every rewrite (cleanup, UI injection
+        and asset links) is applied to the same tree before serializing it.
         
         Args:
             content (str): Original HTML content
             
         Returns:
-            str: Cleaned HTML content
+            str: Processed HTML content
         """
-        bs = BeautifulSoup(content, "html.parser")
+        bs = BeautifulSoup(content, self._get_html_parser())
+        self._remove_unwanted_elements(bs)
+        self._update_asset_links(bs)
+        self._inject_ui_components(bs)
+        return str(bs)
+
+
+    def _rewrite_asset_attributes(self, tag: str, attrs: dict) -> dict:
+        """
+        Point the asset attributes of a pdf2htmlEX tag to the new directory structure.
+        Used when HTML is rewritten token by token.
+
+        Args:
+            tag (str): Tag name
+            attrs (dict): Attribute values of the tag
+
+        Returns:
+            dict: The updated attributes, or None if the tag is unchanged
+        """
+        if tag == "img" and attrs.get("src"):
+            attrs["src"] = f"./assets/images/{attrs['src']}"
+        elif tag == "link" and attrs.get("href") and attrs["href"][-4:] == ".css":
+            attrs["href"] = f"./assets/styles/{attrs['href']}"
+        elif tag == "div" and attrs.get("data-page-url"):
+            attrs["data-page-url"] = f"./assets/pages/{attrs['data-page-url']}"
+        else:
+            return None
+        return attrs
+
+
+    def _get_html_parser(self) -> str:
+        """
+        Get the BeautifulSoup parser backend used for the pdf2htmlEX HTML.
+        "lxml" is much faster than the default "html.parser" on large documents
+        but needs the lxml package.
         
+        Returns:
+            str: Name of the parser backend
+        """
+        return self._configs.get("html_parser", "html.parser")
+
+
+    def _remove_unwanted_elements(self, bs: BeautifulSoup):
+        """
+        Remove unwanted elements from HTML content.
+        Removes sidebar, loading indicators, and scripts while adding compatibility script.
+        
+        Args:
+            bs (BeautifulSoup): Parsed HTML document, modified in place
+        """
         # Remove unwanted UI elements
         for x in bs.find_all("div", {"id": "sidebar"}):
             x.decompose()
@@ -306,8 +1237,6 @@ class RAG_Document_Viewer:
         if title_tag:
             title_tag.string = Path(self._file_name_in).stem
 
-        return str(bs)
-
 
     def _organize_assets_structure(self):
         """
@@ -325,12 +1254,15 @@ class RAG_Document_Viewer:
         styles_dir = assets_dir / "styles"
         scripts_dir = assets_dir / "scripts"
         fonts_dir = assets_dir / "fonts"
+        pages_dir = assets_dir / "pages"
 
         assets_dir.mkdir()
         images_dir.mkdir()
         styles_dir.mkdir()
         scripts_dir.mkdir()
         fonts_dir.mkdir()
+        if self._use_lazy_pages():
+            pages_dir.mkdir()
 
         # Move files to appropriate directories based on file extension
         for file_path in sorted(self._path.iterdir()):
@@ -342,16 +1274,18 @@ class RAG_Document_Viewer:
             if ext in [".css", ".outline"]:
                 # Fix font paths in CSS files
                 if file_path.name == f"{Path(self._file_name_in).stem}.css":
-                    content = self._read_file_content(file_path)
-                    content = content.replace("src:url(f", "src:url(../fonts/f")
-                    self._write_file_content(file_path, content)
+                    self._rewrite_css_file(file_path, [(r"src:url\(f", "src:url(../fonts/f")])
                 shutil.move(str(file_path), str(styles_dir))
             elif ext == ".js":
                 shutil.move(str(file_path), str(scripts_dir))
-            elif ext == ".png":
+            elif ext in [".png", ".jpg"]:
                 shutil.move(str(file_path), str(images_dir))
             elif ext == ".woff":
                 shutil.move(str(file_path), str(fonts_dir))
+            elif ext == ".page" and self._use_lazy_pages():
+                # Fix image paths of the page, it's inserted into index.html when loaded
+                rewrite_html_file(file_path, self._get_stream_block_size(), rewrite_attributes=self._rewrite_asset_attributes)
+                shutil.move(str(file_path), str(pages_dir))
             elif ext == ".html":
                 # Rename main HTML file to index.html
                 dist = self._path / "index.html"
@@ -360,9 +1294,6 @@ class RAG_Document_Viewer:
                 # Remove unneeded files
                 file_path.unlink()
 
-        # Fix asset links in the main HTML file
-        self._update_asset_links(self._path / "index.html")
-
 
     def _get_output_file_paths(self) -> tuple[Path, Path]:
         """
@@ -377,19 +1308,16 @@ class RAG_Document_Viewer:
         return css_file, html_file
 
 
-    def _update_asset_links(self, path):
+    def _update_asset_links(self, bs: BeautifulSoup):
         """
         Update asset links in HTML to use the new directory structure.
         
         Args:
-            path: Path to the HTML file to fix (str or Path)
+            bs (BeautifulSoup): Parsed HTML document, modified in place
         """
-        file_path = Path(path)
-        bs = BeautifulSoup(self._read_file_content(file_path), "html.parser")
-        
-        # Fix script source paths (except jQuery CDN)
+        # Fix script source paths
         for x in bs.find_all("script"):
-            if x.get("src") and not "jquery" in x['src']:
+            if x.get("src"):
                 x['src'] = f"./assets/scripts/{x['src']}"
         
         # Fix image source paths
@@ -400,32 +1328,44 @@ class RAG_Document_Viewer:
         for x in bs.find_all("link"):
             if x.get("href") and x['href'][-4:] == ".css":
                 x['href'] = f"./assets/styles/{x['href']}"
-        
-        self._write_file_content(file_path, str(bs))
+
+        # Fix the page file paths of lazy loaded pages
+        for x in bs.find_all("div", attrs={"data-page-url": True}):
+            x['data-page-url'] = f"./assets/pages/{x['data-page-url']}"
 
 
-    def _inject_ui_components(self,  content: str) -> str:
+    def _inject_ui_components(self, bs: BeautifulSoup):
         """
         Add custom UI elements and functionality to the HTML document.
         Includes scrollbar, navigation controls, page numbers, and zoom controls.
         
         Args:
-            content (str): Original HTML content
-            
+            bs (BeautifulSoup): Parsed HTML document, modified in place
+        """
+        # Insert new elements at the beginning of body
+        new_elements = BeautifulSoup(self._build_ui_components(), "html.parser")
+        bs.find("body").insert(0, new_elements)
+
+        # Add the custom CSS and JavaScript (links already point to the assets directory)
+        head_tags, body_tags = self._build_viewer_asset_tags()
+        bs.find("head").append(BeautifulSoup(head_tags, "html.parser"))
+        bs.find("body").append(BeautifulSoup(body_tags, "html.parser"))
+
+
+    def _build_ui_components(self) -> str:
+        """
+        Build the markup of the viewer controls for a normal document.
+        Includes scrollbar, navigation controls, page numbers, and zoom controls.
+
         Returns:
-            str: Enhanced HTML content with added UI elements
+            str: HTML markup of the UI elements
         """
-        bs = BeautifulSoup(content, "html.parser")        
-        
         # Add custom scrollbar
         elements = """<div id="scrollbar"><div id="scroller"></div></div>"""
         
         # Add chunk navigation controls if enabled
         if self._configs.get("chunks_navigator", True) and len(self._chunks) > 0:
-            chunk_navigator_text = self._configs.get("chunk_navigator_text", "Chunks %d of %d")
-            chunk_navigator_text = [x.strip() for x in chunk_navigator_text.split("%d") if len(x.strip()) > 0]
-            if len(chunk_navigator_text) < 2:
-                chunk_navigator_text = ["Chunks", "of"]
+            chunk_navigator_text = self._get_chunk_navigator_text()
             elements += f"""<div id="navigator"><span id="prevS" class="btn btn-link" onclick="prev_chunk()"> < </span><span class="btn like-link"><span id="s-text">{chunk_navigator_text[0]} <span id="currentS"></span> {chunk_navigator_text[1]} <span id="totalS"></span></span></span><span id="nextS" class="btn btn-link" onclick="next_chunk()"> > </span></div>"""
         
         # Add page number display if enabled
@@ -435,18 +1375,21 @@ class RAG_Document_Viewer:
         # Add zoom controls (initially hidden)
         elements += """<div id="zoom-out" class="zoom" style="display: none;">-</div><div id="zoom-in" class="zoom" style="display: none;">+</div>"""
 
-        # Insert new elements at the beginning of body
-        new_elements = BeautifulSoup(elements, "html.parser")
-        bs.find("body").insert(0, new_elements)
-        
-        # Add custom JavaScript
-        bs.find("body").append(bs.new_tag("script", src="preprocess-custom-scripts.js", type="text/javascript"))
+        return elements
 
-        # Add jQuery and custom CSS to head
-        bs.find("head").append(bs.new_tag("script", src="https://code.jquery.com/jquery-3.7.1.min.js", type="text/javascript"))
-        bs.find("head").append(bs.new_tag("link", href="preprocess-custom-styles.css", rel="stylesheet"))
 
-        return str(bs)
+    def _get_chunk_navigator_text(self) -> list[str]:
+        """
+        Parse the chunk navigator text template, splitting on %d placeholders.
+
+        Returns:
+            list[str]: Text parts shown around the current and total chunk numbers
+        """
+        chunk_navigator_text = self._configs.get("chunk_navigator_text", "Chunks %d of %d")
+        chunk_navigator_text = [x.strip() for x in chunk_navigator_text.split("%d") if len(x.strip()) > 0]
+        if len(chunk_navigator_text) < 2:
+            chunk_navigator_text = ["Chunks", "of"]  # Fallback text
+        return chunk_navigator_text
 
 
     def _generate_css_styles(self) -> str:
@@ -457,13 +1400,16 @@ class RAG_Document_Viewer:
         Returns:
             str: Generated CSS content with configured colors and styles
         """
-        # Load appropriate CSS template
-        current_dir = Path(__file__).parent
-        if self._ext in SHEET_FORMATS:
-            styles = self._read_file_content(current_dir / "preprocess-custom-styles_sheet.css")
-        else:
-            styles = self._read_file_content(current_dir / "preprocess-custom-styles_normal.css")
-        
+        return fill_template(self._read_viewer_template(".css"), self._get_style_values())
+
+
+    def _get_style_values(self) -> dict:
+        """
+        Get the value of each placeholder of the CSS template.
+
+        Returns:
+            dict: CSS value of each placeholder name
+        """
         # Get color configuration with defaults
         main_color = self._configs.get("main_color", "#ff8000")
         gray_color = self._configs.get("background_color", "#dddddd")
@@ -477,63 +1423,261 @@ class RAG_Document_Viewer:
         if (page_shadow[0] == "#" and len(page_shadow) <= 9): 
             page_shadow = f"{page_shadow} 0 0 0.8rem 0.2rem"
 
-        # Configure control colors with proper contrast
-        cbgc = self._configs.get("controls_bg_color", f"{shade_gray[3]}cc")
-        if cbgc[0] == "#":
-            cbgc = self._convert_hex_to_rgb(cbgc)
-        ctxc = "#000" if self._calculate_contrast_ratio(cbgc, (0, 0, 0)) >= 4.5 else "#fff"
+        # Configure control colors with proper contrast
+        cbgc = self._configs.get("controls_bg_color", f"{shade_gray[3]}cc")
+        if cbgc[0] == "#":
+            cbgc = self._convert_hex_to_rgb(cbgc)
+        ctxc = "#000" if self._calculate_contrast_ratio(cbgc, (0, 0, 0)) >= 4.5 else "#fff"
+
+        # Create gradient styles for highlighting
+        highlight_chunk_color = f"linear-gradient(100deg, {main_color}30, {main_color}40, {main_color}30)"
+        highlight_page_color = f"linear-gradient(100deg, {tint_main[-2]}aa, {tint_main[-1]}aa, {tint_main[-2]}aa, {tint_main[-1]}aa, {tint_main[-2]}aa)"
+
+        # Values of the placeholders in the CSS template
+        return {
+            "text_selection_color": self._configs.get("text_selection_color", tint_main[2]) + "aa",
+            "controls_bg_color": self._configs.get("controls_bg_color", shade_gray[3]),
+            "controls_text_color": self._configs.get("controls_text_color",  ctxc),
+            "page_shadow": page_shadow,
+            "background": self._configs.get("background_color", gray_color),
+            "bookmark": self._configs.get("bookmark_color", main_color),
+            "scrollbar": self._configs.get("scrollbar_color", shade_gray[1]),
+            "scroller": self._configs.get("scroller_color", shade_gray[2]),
+            "highlight_page_outline": self._configs.get("highlight_page_outline", tint_main[1]),
+            "highlight_page_color": self._configs.get("highlight_page_color", highlight_page_color),
+            "highlight_chunk_color": self._configs.get("highlight_chunk_color", highlight_chunk_color),
+        }
+
+
+    def _generate_javascript_code(self) -> str:
+        """
+        Generate custom JavaScript with configuration and box data.
+        
+        Returns:
+            str: JavaScript content with configuration values and box data embedded
+        """
+        return fill_template(self._read_viewer_template(".js"), self._get_script_values())
+
+
+    def _get_script_values(self) -> dict:
+        """
+        Get the value of each placeholder of the JavaScript template.
+
+        Returns:
+            dict: JavaScript literal of each placeholder name
+        """
+        # Get feature configuration
+        show_single_chunk = self._configs.get("show_chunks_if_single", False) and len(self._chunks) > 0
+        chunks_navigator = self._configs.get("chunks_navigator", True) and len(self._chunks) > 0
+        page_number = self._configs.get("page_number", True)
+        scrollbar_bookmarks = self._configs.get("scrollbar_navigator", True) and len(self._chunks) > 0
+
+        values = {
+            "show_single_chunk": str(show_single_chunk).lower(),
+            "chunks_navigator": str(chunks_navigator).lower(),
+            "show_page_number": str(page_number).lower(),
+            "scrollbar_bookmarks": str(scrollbar_bookmarks).lower(),
+        }
+
+        # Embed box data as JSON for chunk highlighting functionality
+        if self._ext in SHEET_FORMATS:
+            values["boxes_data"] = self._chunks.to_json()
+            return values
+
+        # Map the document pages to the rendered pages when only part of the document was rendered
+        values["rendered_pages"] = json.dumps(self._rendered_pages)
+        values["page_count"] = json.dumps(self._page_count)
+        values["lazy_pages"] = str(self._use_lazy_pages()).lower()
+        values["viewport_boxes"] = str(self._configs.get("box_rendering", "all") == "viewport").lower()
+
+        # Embed the chunk geometry, unless it's loaded from the per page data files
+        if self._use_chunk_data_files():
+            values["chunk_data_url"] = json.dumps("./assets/chunks/")
+            values["chunk_geometry"] = "[]"
+        else:
+            values["chunk_data_url"] = "null"
+            geometry = (json.dumps(x, separators=(",", ":")) for x in self._get_chunk_geometry())
+            values["chunk_geometry"] = f"[{','.join(geometry)}]"
+        return values
+
+
+    def _read_viewer_template(self, suffix: str) -> str:
+        """
+        Load the styles or scripts template of the viewer.
+
+        Args:
+            suffix (str): ".css" for the styles, ".js" for the scripts
+
+        Returns:
+            str: Template content
+        """
+        current_dir = Path(__file__).parent
+        kind = "sheet" if self._ext in SHEET_FORMATS else "normal"
+        name = "preprocess-custom-styles" if suffix == ".css" else "preprocess-custom-scripts"
+        return self._read_file_content(current_dir / f"{name}_{kind}{suffix}")
+
+
+    def _use_shared_runtime(self) -> bool:
+        """
+        Check if the viewer styles and scripts are shared across documents.
+        A shared runtime is written once under versioned, content-hashed names
+        that browsers can cache across documents, and each document only gets
+        a small config script, a theme stylesheet and its chunk data.
+
+        Returns:
+            bool: True if the runtime is shared
+        """
+        return self._configs.get("runtime", "inline") == "shared"
+
+
+    def _get_runtime_dir(self) -> Path:
+        """
+        Get the directory of the shared runtime files.
+        Defaults to the "assets/runtime" directory of the viewer, so the viewer
+        stays self-contained. Documents only share a runtime directory when
+        `runtime_dir` is set.
+
+        Returns:
+            Path: Directory of the shared runtime
+        """
+        runtime_dir = self._configs.get("runtime_dir")
+        if runtime_dir is None:
+            return self._path / "assets" / "runtime"
+        return Path(runtime_dir)
+
+
+    def _get_runtime_url(self) -> str:
+        """
+        Get the URL of the shared runtime directory used in index.html.
+        Defaults to the relative path from the output directory.
+
+        Returns:
+            str: URL of the directory, without trailing slash
+        """
+        runtime_url = self._configs.get("runtime_url")
+        if runtime_url is None:
+            if self._configs.get("runtime_dir") is None:
+                return "./assets/runtime"
+            runtime_url = Path(os.path.relpath(self._get_runtime_dir().resolve(), self._path.resolve())).as_posix()
+        return runtime_url.rstrip("/")
+
+
+    def _get_runtime_files(self) -> tuple[str, str]:
+        """
+        Write the shared runtime files if they don't exist yet.
+
+        Returns:
+            tuple[str, str]: Names of the runtime stylesheet and script
+        """
+        kind = "sheet" if self._ext in SHEET_FORMATS else "normal"
+        runtime_dir = self._get_runtime_dir()
+        styles = write_runtime_file(runtime_dir, f"{RUNTIME_STEM}-{kind}", ".css", build_shared_styles(self._read_viewer_template(".css")))
+        scripts = write_runtime_file(runtime_dir, f"{RUNTIME_STEM}-{kind}", ".js", build_shared_script(self._read_viewer_template(".js")))
+        return styles, scripts
+
+
+    def _get_viewer_asset_urls(self) -> tuple[list[str], list[str]]:
+        """
+        Get the URLs of the viewer styles and scripts, in loading order.
+
+        Returns:
+            tuple[list[str], list[str]]: Stylesheet URLs and script URLs
+        """
+        if not self._use_shared_runtime():
+            return [f"./assets/styles/{CUSTOM_STYLES}"], [f"./assets/scripts/{CUSTOM_SCRIPTS}"]
+
+        # The document config is defined before the runtime script reads it
+        styles, scripts = self._get_runtime_files()
+        runtime_url = self._get_runtime_url()
+        return (
+            [f"{runtime_url}/{styles}", f"./assets/styles/{THEME_STYLES}"],
+            [f"./assets/scripts/{CONFIG_SCRIPT}", f"{runtime_url}/{scripts}"],
+        )
 
-        # Replace placeholders in CSS template with configured values
-        styles = styles.replace("{#_text_selection_color_#}", self._configs.get("text_selection_color", tint_main[2]))
-        styles = styles.replace("{#_controls_bg_color_#}", self._configs.get("controls_bg_color", shade_gray[3]))
-        styles = styles.replace("{#_controls_text_color_#}", self._configs.get("controls_text_color",  ctxc))
-        styles = styles.replace("{#_page_shadow_#}", page_shadow)
-        styles = styles.replace("{#_background_#}", self._configs.get("background_color", gray_color))
-        styles = styles.replace("{#_bookmark_#}", self._configs.get("bookmark_color", main_color))
-        styles = styles.replace("{#_scrollbar_#}", self._configs.get("scrollbar_color", shade_gray[1]))
-        styles = styles.replace("{#_scroller_#}", self._configs.get("scroller_color", shade_gray[2]))
-        styles = styles.replace("{#_highlight_page_outline_#}", self._configs.get("highlight_page_outline", tint_main[1]))
-        
-        # Create gradient styles for highlighting
-        highlight_chunk_color = f"linear-gradient(100deg, {main_color}30, {main_color}40, {main_color}30)"
-        highlight_page_color = f"linear-gradient(100deg, {tint_main[-2]}aa, {tint_main[-1]}aa, {tint_main[-2]}aa, {tint_main[-1]}aa, {tint_main[-2]}aa)"
 
-        styles = styles.replace("{#_highlight_page_color_#}", self._configs.get("highlight_page_color", highlight_page_color))
-        styles = styles.replace("{#_highlight_chunk_color_#}", self._configs.get("highlight_chunk_color", highlight_chunk_color))
+    def _build_viewer_asset_tags(self) -> tuple[str, str]:
+        """
+        Build the markup loading the viewer styles and scripts.
 
-        return styles
+        Returns:
+            tuple[str, str]: Link tags added to the head, and script tags added at the end of the body
+        """
+        styles, scripts = self._get_viewer_asset_urls()
+        head_tags = "".join(f'<link href="{x}" rel="stylesheet"/>' for x in styles)
+        body_tags = "".join(f'<script src="{x}" type="text/javascript"></script>' for x in scripts)
+        return head_tags, body_tags
 
 
-    def _generate_javascript_code(self) -> str:
+    def _is_viewer_asset(self, tag: str, attrs: dict) -> bool:
         """
-        Generate custom JavaScript with configuration and box data.
-        
+        Check if a tag loads one of the viewer styles or scripts, in either runtime mode.
+        The jQuery script loaded by viewers generated before the scripts were
+        dependency free is matched too, so updating a viewer removes it.
+
+        Args:
+            tag (str): Tag name
+            attrs (dict): Attribute values of the tag
+
         Returns:
-            str: JavaScript content with configuration values and box data embedded
+            bool: True if the tag loads a viewer asset
         """
-        # Load appropriate JavaScript template
-        current_dir = Path(__file__).parent
-        if self._ext in SHEET_FORMATS:
-            scripts = self._read_file_content(current_dir / "preprocess-custom-scripts_sheet.js")
+        if tag == "script":
+            url = attrs.get("src")
+        elif tag == "link":
+            url = attrs.get("href")
         else:
-            scripts = self._read_file_content(current_dir / "preprocess-custom-scripts_normal.js")
-        
-        # Get feature configuration
-        show_single_chunk = self._configs.get("show_chunks_if_single", False) and len(self._chunks) > 0
-        chunks_navigator = self._configs.get("chunks_navigator", True) and len(self._chunks) > 0
-        page_number = self._configs.get("page_number", True)
-        scrollbar_bookmarks = self._configs.get("scrollbar_navigator", True) and len(self._chunks) > 0
+            return False
+        if not url:
+            return False
+        name = url.rsplit("/", 1)[-1]
+        if tag == "script" and name.startswith("jquery"):
+            return True
+        return name in [CUSTOM_STYLES, CUSTOM_SCRIPTS, CONFIG_SCRIPT, THEME_STYLES] or name.startswith(f"{RUNTIME_STEM}-")
 
-        # Replace placeholders in JavaScript template with configuration values
-        scripts = scripts.replace("{#_show_single_chunk_#}", str(show_single_chunk).lower())
-        scripts = scripts.replace("{#_chunks_navigator_#}", str(chunks_navigator).lower())
-        scripts = scripts.replace("{#_show_page_number_#}", str(page_number).lower())
-        scripts = scripts.replace("{#_scrollbar_bookmarks_#}", str(scrollbar_bookmarks).lower())
-        
-        # Embed box data as JSON for chunk highlighting functionality
-        scripts = scripts.replace("{#_boxes_data_#}", json.dumps(self._chunks))
 
-        return scripts
+    def _replace_viewer_asset_tags(self, bs: BeautifulSoup, head_tags: str, body_tags: str):
+        """
+        Replace the tags loading the viewer styles and scripts.
+
+        Args:
+            bs (BeautifulSoup): Parsed HTML document, modified in place
+            head_tags (str): Link tags added to the head
+            body_tags (str): Script tags added at the end of the body
+        """
+        for x in bs.find_all(["script", "link"]):
+            if self._is_viewer_asset(x.name, x.attrs):
+                x.decompose()
+        bs.find("head").append(BeautifulSoup(head_tags, "html.parser"))
+        bs.find("body").append(BeautifulSoup(body_tags, "html.parser"))
+
+
+    def _write_viewer_files(self):
+        """
+        Write the viewer styles and scripts of the document.
+        With a shared runtime only the config script and the theme stylesheet
+        are written to the document assets, otherwise the full styles and scripts.
+        Files of the other runtime mode, and older runtime files of the viewer's
+        own runtime directory, are removed.
+        """
+        styles_dir = self._path / "assets" / "styles"
+        scripts_dir = self._path / "assets" / "scripts"
+        runtime_files = []
+        if self._use_shared_runtime():
+            runtime_files = self._get_runtime_files()
+            self._write_file_content(styles_dir / THEME_STYLES, build_theme_styles(self._get_style_values()))
+            self._write_file_content(scripts_dir / CONFIG_SCRIPT, build_config_script(self._get_script_values()))
+            stale = [styles_dir / CUSTOM_STYLES, scripts_dir / CUSTOM_SCRIPTS]
+        else:
+            self._write_file_content(styles_dir / CUSTOM_STYLES, self._generate_css_styles())
+            self._write_file_content(scripts_dir / CUSTOM_SCRIPTS, self._generate_javascript_code())
+            stale = [styles_dir / THEME_STYLES, scripts_dir / CONFIG_SCRIPT]
+
+        # Only this viewer uses its own runtime directory, so previous versions (and their precompressed variants) can go
+        runtime_dir = self._path / "assets" / "runtime"
+        if self._configs.get("runtime_dir") is None and runtime_dir.exists():
+            stale += [x for x in runtime_dir.glob(f"{RUNTIME_STEM}-*") if not x.name.startswith(tuple(runtime_files))]
+        for path in stale:
+            path.unlink(missing_ok=True)
 
 
     def _calculate_color_luminance(self, rgb: tuple[int, int, int]) -> float:
@@ -635,6 +1779,305 @@ class RAG_Document_Viewer:
         return colors_tint, colors_shade
 
 
+    def _build_sheet_navigator(self) -> str:
+        """
+        Build the chunk navigator markup of the spreadsheet viewer.
+
+        Returns:
+            str: HTML markup of the navigator, or an empty string if it's disabled
+        """
+        if not (self._configs.get("chunks_navigator", True) and len(self._chunks) > 0):
+            return ""
+
+        chunk_navigator_text = self._get_chunk_navigator_text()
+        
+        # Build the navigation HTML with dynamic text
+        return f"""<div id="navigator">
+                        <span class="btn btn-link" id="prevS" onclick="prev_chunk()"> &lt; </span>
+                        <span class="btn like-link">
+                            <span id="s-text">{chunk_navigator_text[0]} <span id="currentS"></span> {chunk_navigator_text[1]} <span id="totalS"></span></span>
+                        </span>
+                        <span class="btn btn-link" id="nextS" onclick="next_chunk()"> &gt;</span>
+                    </div>"""
+
+
+    def _generate_tabstrip_styles(self) -> str:
+        """
+        Generate the style element of the spreadsheet tabstrip based on configuration.
+
+        Returns:
+            str: HTML style element with configured colors
+        """
+        # Get color configuration for styling, with defaults
+        main_color = self._configs.get("main_color", "#ff8000")        # Orange default
+        gray_color = self._configs.get("background_color", "#dddddd")   # Light gray default
+        tint_main, shade_main = self._create_color_palette(main_color, 12)
+
+        styles = """<style>
+                        *::selection {
+                            background: unset;
+                            background-color: {#_text_selection_color_#};
+                        }
+
+                        a {
+                            text-decoration: none;
+                            color: #000000;
+                            font-size: 10pt;
+                            margin: auto 10px;
+                            font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, "Helvetica Neue", Arial, "Noto Sans", sans-serif, "Apple Color Emoji", "Segoe UI Emoji", "Segoe UI Symbol", "Noto Color Emoji";
+                        }
+                        body {
+                            margin: 0;
+                            padding: 0;
+                            background-color: {#_bg_color_#};
+                        }
+
+                        td {
+                            background-color: {#_td_bg_color_#};
+                            color: {#_td_bg_color_#};
+                        }
+                        .bold {
+                            font-weight: bold;
+                        }
+
+                        .highlight {
+                            background-color: {#_bookmark_#} !important;
+                        }
+                    </style>"""
+
+        # Replace color placeholders with actual configured colors
+        styles = styles.replace("{#_text_selection_color_#}", self._configs.get("text_selection_color", tint_main[2]))
+        styles = styles.replace("{#_bookmark_#}", self._configs.get("bookmark_color", main_color))
+        styles = styles.replace("{#_bg_color_#}", self._configs.get("background_color", gray_color))
+        styles = styles.replace("{#_td_bg_color_#}", self._configs.get("td_background_color", "#fff"))
+        styles = styles.replace("{#_td_color_#}", self._configs.get("td_color", "#000"))
+
+        return styles
+
+
+    def _use_font_optimization(self) -> bool:
+        """
+        Check if the fonts are recompressed to WOFF2.
+        Needs the optional fonttools and brotli packages.
+
+        Returns:
+            bool: True if the font optimization stage is enabled
+        """
+        return self._configs.get("optimize_fonts", False) and self._ext not in SHEET_FORMATS
+
+
+    def _optimize_font_files(self):
+        """
+        Recompress the fonts of the viewer to WOFF2 on a worker pool, strip the
+        tables browsers don't use, and point the font faces of the stylesheets
+        to the new files. pdf2htmlEX already subsets the fonts to the glyphs
+        used by the document.
+        """
+        fonts = sorted((self._path / "assets" / "fonts").glob("*.woff"))
+        report = optimize_fonts(fonts, self._configs.get("font_workers", None))
+        if report["converted"] > 0:
+            substitution = get_font_substitution(report["fonts"])
+            for file_path in sorted((self._path / "assets" / "styles").glob("*.css")):
+                self._rewrite_css_file(file_path, [substitution])
+
+        saved = report["bytes_before"] - report["bytes_after"]
+        print(f"  |_ Fonts converted to WOFF2: {report['converted']} of {len(fonts)}, {saved} bytes saved "
+              f"({report['bytes_before']} -> {report['bytes_after']}).")
+
+
+    def _use_image_optimization(self) -> bool:
+        """
+        Check if the page backgrounds and sheet images are recompressed.
+        Needs the optional Pillow package.
+
+        Returns:
+            bool: True if the image optimization stage is enabled
+        """
+        return self._configs.get("optimize_images", False)
+
+
+    def _optimize_image_files(self):
+        """
+        Recompress the images of the viewer on a worker pool: downscale the
+        images above image_max_dpi, then optimize them losslessly or transcode
+        them to WebP/AVIF. The references to transcoded images are rewritten
+        in index.html, the page files, the sheet files and the stylesheets.
+
+        The maximum size is computed for the largest page, so images covering
+        less than a page keep a higher resolution than image_max_dpi.
+        """
+        assets_dir = self._path / "assets"
+        images = sorted(x for x in (assets_dir / "images").iterdir() if x.suffix.lower() in IMAGE_SUFFIXES)
+        max_size = get_max_image_size(self._configs.get("image_max_dpi", None), self._page_sizes or [])
+        report = optimize_images(images, self._configs.get("image_format", "png"), self._configs.get("image_quality", 80),
+                                 max_size, self._configs.get("image_workers", None))
+
+        renamed = report["renamed"]
+        if len(renamed) > 0:
+            block_size = self._get_stream_block_size()
+            for file_path in sorted((assets_dir / "styles").glob("*.css")):
+                rewrite_css_urls(file_path, renamed, block_size)
+            # Page files are inserted into index.html, sheet files are loaded in an iframe
+            for file_path in sorted(assets_dir.glob("pages/*")):
+                rewrite_html_urls(file_path, self._path, renamed, block_size)
+            for file_path in sorted(assets_dir.glob("sheets/*.html")):
+                rewrite_html_urls(file_path, file_path.parent, renamed, block_size)
+            rewrite_html_urls(self._path / "index.html", self._path, renamed, block_size)
+
+        saved = report["bytes_before"] - report["bytes_after"]
+        print(f"  |_ Images optimized: {report['optimized']} of {len(images)}, {saved} bytes saved "
+              f"({report['bytes_before']} -> {report['bytes_after']}).")
+
+
+    def _use_hashed_assets(self) -> bool:
+        """
+        Check if the document assets are renamed after the hash of their content.
+        Hashed names never collide across documents and never change for the
+        same content, so the assets can be cached as immutable and identical
+        fonts and backgrounds are stored once by a CDN.
+
+        Returns:
+            bool: True if the assets get content-hashed names
+        """
+        return self._configs.get("hashed_assets", False) and self._ext not in SHEET_FORMATS
+
+
+    def _hash_asset_files(self):
+        """
+        Rename the fonts, images, stylesheets, scripts and page files of the
+        document after the hash of their content, and rewrite the references
+        to them in the stylesheets, the page files and index.html.
+
+        Files are renamed before the files referencing them, and every file
+        is rewritten in a single streaming pass. The viewer styles, scripts
+        and chunk data keep their names, they are regenerated when the chunks
+        are updated. assets/asset-manifest.json maps the original paths to
+        the new ones.
+        """
+        assets_dir = self._path / "assets"
+        block_size = self._get_stream_block_size()
+        renamed = {}
+
+        def rename(file_path):
+            renamed[file_path.resolve()] = hash_file_name(file_path)
+
+        # Fonts and images don't reference other files
+        for directory in ["fonts", "images"]:
+            for file_path in sorted((assets_dir / directory).iterdir()):
+                rename(file_path)
+
+        # Stylesheets reference the fonts, relative to the stylesheet
+        for file_path in sorted((assets_dir / "styles").glob("*.css")):
+            rewrite_css_urls(file_path, renamed, block_size)
+            rename(file_path)
+
+        # Page files reference the images, relative to index.html where they are inserted
+        if (assets_dir / "pages").exists():
+            for file_path in sorted((assets_dir / "pages").iterdir()):
+                rewrite_html_urls(file_path, self._path, renamed, block_size)
+                rename(file_path)
+
+        for file_path in sorted((assets_dir / "scripts").glob("*.js")):
+            rename(file_path)
+
+        rewrite_html_urls(self._path / "index.html", self._path, renamed, block_size)
+
+        root = self._path.resolve()
+        manifest = {
+            original.relative_to(root).as_posix(): new_path.resolve().relative_to(root).as_posix()
+            for original, new_path in renamed.items()
+        }
+        self._write_file_content(assets_dir / ASSET_MANIFEST, json.dumps(manifest, indent=2))
+
+
+    def _get_precompress_encodings(self) -> list[str]:
+        """
+        Get the encodings of the precompressed variants written for the text files.
+        True selects gzip, and brotli when the brotli package is installed.
+
+        Returns:
+            list[str]: "gzip" and/or "br", empty when precompression is disabled
+        """
+        precompress = self._configs.get("precompress", False)
+        if precompress is True:
+            return get_available_encodings()
+        if not precompress:
+            return []
+
+        encodings = [precompress] if isinstance(precompress, str) else list(precompress)
+        for encoding in encodings:
+            if encoding not in ENCODING_SUFFIXES:
+                raise ValueError(f"Unknown precompress encoding [{encoding}], use {list(ENCODING_SUFFIXES)}.")
+            if encoding not in get_available_encodings():
+                raise ImportError("Brotli compression needs the brotli package (pip install brotli).")
+        return encodings
+
+
+    def _precompress_output(self):
+        """
+        Write compressed variants (.gz, .br) next to every text file of the viewer,
+        in parallel, so a static server can send them without compressing on
+        each request. Only files changed since their variants were written are
+        compressed again. assets/compression-manifest.json lists the raw and
+        compressed size, and the hash, of each file.
+        """
+        encodings = self._get_precompress_encodings()
+        if len(encodings) == 0:
+            return
+
+        remove_orphan_variants(self._path)
+        assets_dir = self._path / "assets"
+        paths = [self._path / "index.html"]
+        for file_path in sorted(assets_dir.rglob("*")):
+            if not file_path.is_file():
+                continue
+            # The chunk data files are fetched by the viewer, the other JSON files are not served
+            if file_path.suffix in TEXT_SUFFIXES or (file_path.suffix == ".json" and file_path.parent.name == "chunks"):
+                paths.append(file_path)
+
+        # Variants are reused when their file has the size and hash listed by the previous run
+        manifest_path = assets_dir / COMPRESSION_MANIFEST
+        previous = {}
+        if manifest_path.exists():
+            previous = {self._path / name: entry for name, entry in json.loads(manifest_path.read_text()).items()}
+
+        sizes = compress_files(paths, encodings, self._configs.get("precompress_workers", None), previous=previous)
+        manifest = {x.relative_to(self._path).as_posix(): size for x, size in sizes.items()}
+        self._write_file_content(manifest_path, json.dumps(manifest, indent=2))
+
+
+    def _get_asset_store(self) -> AssetStore:
+        """
+        Build the shared asset store from the configuration.
+
+        Returns:
+            AssetStore: The configured store, or None if assets aren't shared
+        """
+        asset_store = self._configs.get("asset_store", None)
+        if asset_store is None or isinstance(asset_store, AssetStore):
+            return asset_store
+        return AssetStore(asset_store)
+
+
+    def _link_shared_assets(self):
+        """
+        Replace the fonts and images of the viewer with hard links to the
+        shared asset store, so identical assets of different documents are
+        stored once.
+        """
+        store = self._get_asset_store()
+        if store is None:
+            return
+
+        for directory in ["fonts", "images"]:
+            assets_dir = self._path / "assets" / directory
+            if not assets_dir.exists():
+                continue
+            for file_path in sorted(assets_dir.iterdir()):
+                if file_path.is_file():
+                    store.add(file_path)
+
+
     def _process_spreadsheet_layout(self):
         """
         Cleans and reorganizes HTML files generated from spreadsheet formats (xlsx, xls, ods).
@@ -692,45 +2135,8 @@ class RAG_Document_Viewer:
 
         # Build the tabstrip HTML - this creates the navigation tabs at the bottom
         # Contains styling for the tab appearance and behavior
-        tabs = """<html><head><meta http-equiv="content-type" content="text/html; charset=utf-8"/>
-                    <style>
-                        *::selection {
-                            background: unset;
-                            background-color: {#_text_selection_color_#};
-                        }
-
-                        a {
-                            text-decoration: none;
-                            color: #000000;
-                            font-size: 10pt;
-                            margin: auto 10px;
-                            font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, "Helvetica Neue", Arial, "Noto Sans", sans-serif, "Apple Color Emoji", "Segoe UI Emoji", "Segoe UI Symbol", "Noto Color Emoji";
-                        }
-                        body {
-                            margin: 0;
-                            padding: 0;
-                            background-color: {#_bg_color_#};
-                        }
-
-                        td {
-                            background-color: {#_td_bg_color_#};
-                            color: {#_td_bg_color_#};
-                        }
-                        .bold {
-                            font-weight: bold;
-                        }
-
-                        .highlight {
-                            background-color: {#_bookmark_#} !important;
-                        }
-                    </style></head><body><table border="0" cellspacing="1"><tr>"""
-        
-        # Replace color placeholders with actual configured colors
-        tabs = tabs.replace("{#_text_selection_color_#}", self._configs.get("text_selection_color", tint_main[2]))
-        tabs = tabs.replace("{#_bookmark_#}", self._configs.get("bookmark_color", main_color))
-        tabs = tabs.replace("{#_bg_color_#}", self._configs.get("background_color", gray_color))
-        tabs = tabs.replace("{#_td_bg_color_#}", self._configs.get("td_background_color", "#fff"))
-        tabs = tabs.replace("{#_td_color_#}", self._configs.get("td_color", "#000"))
+        tabs = f"""<html><head><meta http-equiv="content-type" content="text/html; charset=utf-8"/>
+                    {self._generate_tabstrip_styles()}</head><body><table border="0" cellspacing="1"><tr>"""
         
         # Track the first sheet name to set as default view
         _1st_sheet = ""
@@ -777,35 +2183,21 @@ class RAG_Document_Viewer:
 
         # Create the main index.html file that combines everything using iframes
         # This creates a two-pane layout: main sheet viewer on top, tabs on bottom
+        head_tags, body_tags = self._build_viewer_asset_tags()
         content = f"""<html>
                         <head>
                             <meta content="text/html; charset=utf-8" http-equiv="content-type" />
                             <title>
                             {self._file_name_in.replace(self._ext, "")}
                             </title>
-                            <script src="https://code.jquery.com/jquery-3.7.1.min.js" type="text/javascript"></script>
-                            <link href="./assets/styles/preprocess-custom-styles.css" rel="stylesheet" />
+                            {head_tags}
                         </head>
 
                         <body style="padding: 0; margin: 0;">"""
         
         # Add chunk navigation controls if enabled in configuration
         # This provides previous/next buttons for navigating between chunks
-        if self._configs.get("chunks_navigator", True) and len(self._chunks) > 0:
-            # Parse the chunk navigator text template, splitting on %d placeholders
-            chunk_navigator_text = self._configs.get("chunk_navigator_text", "Chunks %d of %d")
-            chunk_navigator_text = [x.strip() for x in chunk_navigator_text.split("%d") if len(x.strip()) > 0]
-            if len(chunk_navigator_text) < 2:
-                chunk_navigator_text = ["Chunks", "of"]  # Fallback text
-            
-            # Build the navigation HTML with dynamic text
-            content += f"""<div id="navigator">
-                            <span class="btn btn-link" id="prevS" onclick="prev_chunk()"> &lt; </span>
-                            <span class="btn like-link">
-                                <span id="s-text">{chunk_navigator_text[0]} <span id="currentS"></span> {chunk_navigator_text[1]} <span id="totalS"></span></span>
-                            </span>
-                            <span class="btn btn-link" id="nextS" onclick="next_chunk()"> &gt;</span>
-                        </div>"""
+        content += self._build_sheet_navigator()
         
         # Create the main layout with two iframes:
         # 1. sheet_preview: displays the selected sheet content (flex: 1 = takes remaining space)
@@ -818,7 +2210,7 @@ class RAG_Document_Viewer:
                             <div onclick="zoom_out()" id="zoom-out" class="zoom"> - </div>
                             <div onclick="zoom_in()" id="zoom-in" class="zoom"> + </div>
                         </body>
-                        <script src="./assets/scripts/preprocess-custom-scripts.js" type="text/javascript"></script>
+                        {body_tags}
                     </html>"""
         
         # Parse and prettify the final HTML, then save as index.html
@@ -868,10 +2260,15 @@ def RAG_DV(file_path:str=None, store_path:str=None, chunks:list=[], **kwargs):
                                 This is essential for the RAG functionality, as these
                                 boxes define the boundaries of document "chunks" that
                                 can be highlighted in the preview. Defaults to an empty list.
+                                Large chunk sets can also be passed as an iterator, a JSONL
+                                file path, a dict of columns or a ChunkStore.
         **kwargs: Additional keyword arguments that are passed as configuration
                   options to the RAG_Document_Viewer for customization (e.g.,
                   styling, feature toggles).
 
+    Returns:
+        dict: Seconds spent in each stage of the conversion.
+
     Raises:
         FileNotFoundError: If the specified `file_path` does not exist.
         FileExistsError: If the `store_path` directory already exists, preventing
@@ -881,6 +2278,62 @@ def RAG_DV(file_path:str=None, store_path:str=None, chunks:list=[], **kwargs):
         UserWarning: If the `chunks` list is empty, indicating that no chunks
                      will be highlighted in the generated preview.
     """
+    # Validate the arguments and create an instance of the RAG_Document_Viewer class.
+    ragdv = _create_viewer(file_path, store_path, chunks, kwargs)
+    # Start the document conversion process.
+    return ragdv.convert_document()
+
+
+async def RAG_DV_async(file_path:str=None, store_path:str=None, chunks:list=[], semaphore:asyncio.Semaphore=None, **kwargs):
+    """
+    RAG_DV_async function - Asyncio variant of RAG_DV.
+
+    LibreOffice and pdf2htmlEX are driven through asyncio subprocesses and the
+    HTML post-processing runs in the default executor. Cancelling the task
+    kills the converter process tree.
+
+    Developed by the Preprocess Team (https://preprocess.co)
+
+    Args:
+        file_path (str, optional): The path to the input document file. Defaults to None.
+        store_path (str, optional): The directory where the converted output files
+                                    will be stored. Same behavior as in RAG_DV.
+        chunks (list, optional): A list of bounding box information (dictionaries), or
+                                 any chunks format accepted by RAG_DV. Defaults to an empty list.
+        semaphore (asyncio.Semaphore, optional): Semaphore shared between calls to
+                                                 limit the number of concurrent conversions.
+        **kwargs: Additional configuration options, same as in RAG_DV.
+
+    Returns:
+        dict: Seconds spent in each stage of the conversion.
+
+    Raises:
+        FileNotFoundError: If the specified `file_path` does not exist.
+        FileExistsError: If the `store_path` directory already exists.
+    """
+    # Validate the arguments and create an instance of the RAG_Document_Viewer class.
+    ragdv = _create_viewer(file_path, store_path, chunks, kwargs)
+
+    # Start the document conversion process, waiting for a free slot if limited.
+    if semaphore is None:
+        return await ragdv.convert_document_async()
+    async with semaphore:
+        return await ragdv.convert_document_async()
+
+
+def _create_viewer(file_path, store_path, chunks: list, kwargs: dict) -> RAG_Document_Viewer:
+    """
+    Validate the RAG_DV arguments, create the output directory and build the viewer.
+
+    Args:
+        file_path: The path to the input document file
+        store_path: The output directory, None to use the input file's stem
+        chunks (list): A list of bounding box information
+        kwargs (dict): Configuration options
+
+    Returns:
+        RAG_Document_Viewer: The viewer ready to convert the document
+    """
     # Check if a file path is provided; raise an error if not.
     if file_path is None:
         raise FileNotFoundError(f"[{file_path}] not exist, please check.")
@@ -891,6 +2344,9 @@ def RAG_DV(file_path:str=None, store_path:str=None, chunks:list=[], **kwargs):
     if not file_path.exists():
         raise FileNotFoundError(f"[{file_path}] not exist, please check.")
 
+    # Load the chunks into compact arrays, validating them before anything is written.
+    chunks = ChunkStore.load(chunks)
+
     # Determine the store_path (output directory).
     if store_path is None:
         # If no store_path is provided, create one named after the input file's stem
@@ -920,6 +2376,89 @@ def RAG_DV(file_path:str=None, store_path:str=None, chunks:list=[], **kwargs):
         configs[key] = value
 
     # Create an instance of the RAG_Document_Viewer class with the gathered parameters.
-    ragdv = RAG_Document_Viewer(file_path, store_path, chunks, configs)
-    # Start the document conversion process.
-    ragdv.convert_document()
\ No newline at end of file
+    return RAG_Document_Viewer(file_path, store_path, chunks, configs)
+
+
+def RAG_DV_rechunk(store_path:str=None, chunks:list=None, **kwargs):
+    """
+    RAG_DV_rechunk function - Update the chunks of an already generated viewer.
+
+    Only the chunk overlay is regenerated (custom scripts, custom styles and the
+    viewer controls), so it runs in milliseconds instead of converting the whole
+    document again.
+
+    Args:
+        store_path (str): The directory of the viewer generated by RAG_DV.
+        chunks (list, optional): The new list of bounding box information, in any format
+                                 accepted by RAG_DV. Defaults to None, in which case the
+                                 chunks of the viewer are kept.
+        **kwargs: Configuration options overriding the ones used to generate the viewer
+                  (e.g., styling, feature toggles).
+
+    Raises:
+        FileNotFoundError: If `store_path` doesn't contain a generated viewer.
+
+    Warns:
+        UserWarning: If the `chunks` list is empty, indicating that no chunks
+                     will be highlighted in the updated preview.
+    """
+    # Check if a store path is provided; raise an error if not.
+    if store_path is None:
+        raise FileNotFoundError(f"[{store_path}] not exist, please check.")
+
+    # Check if the chunks list is empty. If so, issue a warning as chunk highlighting
+    # will not occur without this information.
+    if chunks is not None:
+        chunks = ChunkStore.load(chunks)
+    if chunks is not None and len(chunks) == 0:
+        warnings.warn("The chunks length is empty, so there is no chunks will be highlited.")
+
+    # Load the generated viewer and regenerate its overlay.
+    ragdv = RAG_Document_Viewer.from_output(store_path, chunks, dict(kwargs))
+    ragdv.update_overlay()
+
+
+async def _run_command_async(command_tool: list[str], timeout: int = 600):
+    """
+    Run a converter command as an asyncio subprocess.
+    The command runs in its own process group, which is killed on timeout
+    or cancellation so no LibreOffice or pdf2htmlEX child is left behind.
+
+    Args:
+        command_tool (list[str]): The command line to execute
+        timeout (int): Seconds before the command is killed
+
+    Raises:
+        TimeoutExpired: If the command takes longer than the timeout
+    """
+    process = await asyncio.create_subprocess_exec(
+        *command_tool, stdout=DEVNULL, stderr=DEVNULL, start_new_session=True
+    )
+    try:
+        await asyncio.wait_for(process.wait(), timeout)
+    except asyncio.TimeoutError:
+        _kill_process_tree(process)
+        await process.wait()
+        raise TimeoutExpired(command_tool, timeout)
+    except asyncio.CancelledError:
+        _kill_process_tree(process)
+        await asyncio.shield(process.wait())
+        raise
+
+
+def _kill_process_tree(process):
+    """
+    Kill a subprocess together with the children it spawned.
+
+    Args:
+        process: The asyncio subprocess started in its own session
+    """
+    if process.returncode is not None:
+        return
+    try:
+        if hasattr(os, "killpg"):
+            os.killpg(process.pid, signal.SIGKILL)
+        else:
+            process.kill()
+    except ProcessLookupError:
+        pass
\ No newline at end of file
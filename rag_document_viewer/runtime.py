@@ -0,0 +1,123 @@
+import hashlib, json, os, re
+from pathlib import Path
+
+# Version of the contract between the shared runtime and the per document config and theme files
+RUNTIME_VERSION = 1
+
+# Placeholders of the viewer templates, like "{#_show_page_number_#}"
+PLACEHOLDER = re.compile(r"\{#_([a-z0-9_]+)_#\}")
+
+# Names of the per document files used with a shared runtime
+CONFIG_SCRIPT = "viewer-config.js"
+THEME_STYLES = "viewer-theme.css"
+
+def fill_template(template: str, values: dict) -> str:
+    """
+    Replace the placeholders of a viewer template with their values.
+
+    Args:
+        template (str): Template text
+        values (dict): Value of each placeholder name, placeholders without a value are kept
+
+    Returns:
+        str: The filled template
+    """
+    return PLACEHOLDER.sub(lambda m: str(values.get(m.group(1), m.group(0))), template)
+
+
+def build_shared_script(template: str) -> str:
+    """
+    Turn a script template into a runtime shared by every document, reading
+    its values from the viewer_config object of the document config script.
+
+    Args:
+        template (str): Script template
+
+    Returns:
+        str: Runtime script
+    """
+    return PLACEHOLDER.sub(lambda m: f"viewer_config.{m.group(1)}", template)
+
+
+def build_shared_styles(template: str) -> str:
+    """
+    Turn a stylesheet template into a runtime shared by every document, reading
+    its values from the custom properties of the document theme stylesheet.
+
+    Args:
+        template (str): Stylesheet template
+
+    Returns:
+        str: Runtime stylesheet
+    """
+    return PLACEHOLDER.sub(lambda m: f"var({_property_name(m.group(1))})", template)
+
+
+def build_config_script(values: dict) -> str:
+    """
+    Build the config script of a document.
+
+    Args:
+        values (dict): JavaScript literal of each placeholder name
+
+    Returns:
+        str: Script defining viewer_config
+    """
+    fields = ",\n".join(f"    {json.dumps(name)}: {value}" for name, value in values.items())
+    return f"var viewer_config = {{\n{fields}\n}};\n"
+
+
+def build_theme_styles(values: dict) -> str:
+    """
+    Build the theme stylesheet of a document.
+
+    Args:
+        values (dict): CSS value of each placeholder name
+
+    Returns:
+        str: Stylesheet defining the custom properties
+    """
+    fields = "\n".join(f"    {_property_name(name)}: {value};" for name, value in values.items())
+    return f":root {{\n{fields}\n}}\n"
+
+
+def write_runtime_file(directory, stem: str, suffix: str, content: str) -> str:
+    """
+    Write a shared runtime file under a versioned, content-hashed name.
+    The name changes with the content, so the file can be cached forever
+    and is never rewritten once it exists.
+
+    Args:
+        directory: Directory of the shared runtime (str or Path)
+        stem (str): Base name of the file
+        suffix (str): File extension, like ".js"
+        content (str): File content
+
+    Returns:
+        str: Name of the file
+    """
+    directory = Path(directory)
+    digest = hashlib.sha256(content.encode("utf-8")).hexdigest()[:12]
+    name = f"{stem}.v{RUNTIME_VERSION}.{digest}{suffix}"
+    path = directory / name
+    if not path.exists():
+        directory.mkdir(parents=True, exist_ok=True)
+
+        # Documents converted in parallel may write the same file, the rename keeps it complete
+        tmp_path = directory / f".{name}.{os.getpid()}.tmp"
+        tmp_path.write_text(content)
+        os.replace(tmp_path, path)
+    return name
+
+
+def _property_name(name: str) -> str:
+    """
+    Get the CSS custom property holding a placeholder value.
+
+    Args:
+        name (str): Placeholder name
+
+    Returns:
+        str: Custom property name
+    """
+    return f"--rdv-{name.replace('_', '-')}"
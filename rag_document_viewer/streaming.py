@@ -0,0 +1,262 @@
+import html, os, re
+from html.parser import HTMLParser
+from pathlib import Path
+
+# Default size of the blocks read from disk in streaming mode (1 MiB)
+DEFAULT_BLOCK_SIZE = 1024 ** 2
+
+# Elements without an end tag, they never open a removed subtree
+VOID_ELEMENTS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+
+def rewrite_css_file(path, substitutions: list[tuple[str, str]], block_size: int = DEFAULT_BLOCK_SIZE):
+    """
+    Apply regex substitutions to a CSS file, block by block from disk to disk.
+
+    Every block is cut after its last closing brace and the rest is carried
+    over to the next block, so a substitution never sees half a rule. Memory
+    stays bounded by the block size plus the longest CSS rule.
+
+    Args:
+        path: Path to the CSS file, rewritten in place (str or Path)
+        substitutions (list[tuple[str, str]]): Regex patterns and their replacements (strings or
+                                               functions, as accepted by re.sub), each one
+                                               must match inside a single rule
+        block_size (int): Number of characters read at once
+    """
+    path = Path(path)
+    patterns = [(re.compile(pattern, re.MULTILINE), subst) for pattern, subst in substitutions]
+
+    def apply(text):
+        for pattern, subst in patterns:
+            text = pattern.sub(subst, text)
+        return text
+
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    with path.open("r") as src, tmp_path.open("w") as dst:
+        carry = ""
+        for block in iter(lambda: src.read(block_size), ""):
+            text = carry + block
+            cut = text.rfind("}") + 1
+            dst.write(apply(text[:cut]))
+            carry = text[cut:]
+        dst.write(apply(carry))
+    os.replace(tmp_path, path)
+
+
+def rewrite_html_file(path, block_size: int = DEFAULT_BLOCK_SIZE, **options):
+    """
+    Rewrite an HTML file with a StreamingHTMLRewriter, block by block from disk to disk.
+
+    Args:
+        path: Path to the HTML file, rewritten in place (str or Path)
+        block_size (int): Number of characters read at once
+        **options: StreamingHTMLRewriter options
+    """
+    path = Path(path)
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    with path.open("r") as src, tmp_path.open("w", buffering=block_size) as dst:
+        rewriter = StreamingHTMLRewriter(dst, **options)
+        for block in iter(lambda: src.read(block_size), ""):
+            rewriter.feed(block)
+        rewriter.close()
+    os.replace(tmp_path, path)
+
+
+class StreamingHTMLRewriter(HTMLParser):
+    """
+    Tokenizer based HTML rewriter that never builds the document tree.
+
+    Tokens are written to the output as soon as they are parsed, unchanged
+    tags keep their original markup. Only the removed subtree currently being
+    skipped and the unparsed tail of the last block are kept in memory.
+    """
+    def __init__(self, output, remove_element=None, remove_comments: bool = False, rewrite_attributes=None,
+                 title: str = None, head_end: str = "", body_start: str = "", body_end: str = "",
+                 container=None, container_end=None, container_only: bool = False):
+        """
+        Initialize the rewriter.
+
+        Args:
+            output: Text stream the rewritten HTML is written to
+            remove_element (callable, optional): Called with the tag name and the attributes dict,
+                                                 returns True to drop the element and its content
+            remove_comments (bool): Drop every HTML comment
+            rewrite_attributes (callable, optional): Called with the tag name and the attributes dict,
+                                                     returns the new attributes dict or None to keep them
+            title (str, optional): Replacement text of the <title> element
+            head_end (str): Markup inserted before </head>
+            body_start (str): Markup inserted after <body>
+            body_end (str): Markup inserted before </body>
+            container (callable, optional): Called with the tag name and the attributes dict,
+                                            returns True for the element the container options apply to
+            container_end (callable, optional): Called with the output stream before the end tag
+                                                of the container, to write more content into it
+            container_only (bool): Only write the content of the container, without its tags
+        """
+        super().__init__(convert_charrefs=False)
+        self._output = output
+        self._out = _DISCARD if container_only else output
+        self._remove_element = remove_element
+        self._remove_comments = remove_comments
+        self._rewrite_attributes = rewrite_attributes
+        self._title = title
+        self._head_end = head_end
+        self._body_start = body_start
+        self._body_end = body_end
+
+        # Tag name and nesting depth of the subtree being removed
+        self._skip_tag = None
+        self._skip_depth = 0
+        self._in_title = False
+
+        # Tag name and nesting depth of the container, once it's found
+        self._container = container
+        self._container_end = container_end
+        self._container_only = container_only
+        self._container_tag = None
+        self._container_depth = 0
+
+
+    def handle_starttag(self, tag, attrs):
+        self._start_tag(tag, attrs, self.get_starttag_text(), False)
+
+
+    def handle_startendtag(self, tag, attrs):
+        self._start_tag(tag, attrs, self.get_starttag_text(), True)
+
+
+    def handle_endtag(self, tag):
+        if self._skip_tag is not None:
+            if tag == self._skip_tag:
+                self._skip_depth -= 1
+                if self._skip_depth == 0:
+                    self._skip_tag = None
+            return
+
+        if tag == self._container_tag:
+            self._container_depth -= 1
+            if self._container_depth == 0:
+                self._container_tag = None
+                if self._container_end is not None:
+                    self._container_end(self._output)
+                if self._container_only:
+                    # Nothing after the container content is written
+                    self._out = _DISCARD
+                    return
+
+        if tag == "title" and self._in_title:
+            self._in_title = False
+            self._out.write(html.escape(self._title, quote=False))
+        elif tag == "head":
+            self._out.write(self._head_end)
+        elif tag == "body":
+            self._out.write(self._body_end)
+        self._out.write(f"</{tag}>")
+
+
+    def handle_data(self, data):
+        if self._skip_tag is None and not self._in_title:
+            self._out.write(data)
+
+
+    def handle_entityref(self, name):
+        self.handle_data(f"&{name};")
+
+
+    def handle_charref(self, name):
+        self.handle_data(f"&#{name};")
+
+
+    def handle_comment(self, data):
+        if self._skip_tag is None and not self._remove_comments:
+            self._out.write(f"<!--{data}-->")
+
+
+    def handle_decl(self, decl):
+        if self._skip_tag is None:
+            self._out.write(f"<!{decl}>")
+
+
+    def handle_pi(self, data):
+        if self._skip_tag is None:
+            self._out.write(f"<?{data}>")
+
+
+    def unknown_decl(self, data):
+        if self._skip_tag is None:
+            self._out.write(f"<![{data}]>")
+
+
+    def _start_tag(self, tag: str, attrs: list, text: str, self_closing: bool):
+        """
+        Write, rewrite or drop a start tag.
+
+        Args:
+            tag (str): Tag name
+            attrs (list): Attribute names and values
+            text (str): Original markup of the tag
+            self_closing (bool): True for tags written as <tag/>
+        """
+        if self._skip_tag is not None:
+            if tag == self._skip_tag:
+                self._skip_depth += 1
+            return
+
+        attributes = dict(attrs)
+        if self._remove_element is not None and self._remove_element(tag, attributes):
+            if not self_closing and tag not in VOID_ELEMENTS:
+                self._skip_tag = tag
+                self._skip_depth = 1
+            return
+
+        if self._rewrite_attributes is not None:
+            rewritten = self._rewrite_attributes(tag, attributes)
+            if rewritten is not None:
+                text = build_start_tag(tag, rewritten, self_closing)
+
+        self._out.write(text)
+        if not self_closing and tag not in VOID_ELEMENTS:
+            if tag == self._container_tag:
+                self._container_depth += 1
+            elif self._container is not None and self._container(tag, attributes):
+                # Only the first matching element is the container
+                self._container = None
+                self._container_tag = tag
+                self._container_depth = 1
+                if self._container_only:
+                    self._out = self._output
+                    return
+
+        if tag == "body":
+            self._out.write(self._body_start)
+        elif tag == "title" and self._title is not None and not self_closing:
+            self._in_title = True
+
+
+class _Discard:
+    """
+    Output stream dropping everything written to it.
+    """
+    def write(self, text: str) -> int:
+        return len(text)
+
+
+_DISCARD = _Discard()
+
+
+def build_start_tag(tag: str, attributes: dict, self_closing: bool = False) -> str:
+    """
+    Serialize a start tag.
+
+    Args:
+        tag (str): Tag name
+        attributes (dict): Attribute values, None for attributes without a value
+        self_closing (bool): Write the tag as <tag/>
+
+    Returns:
+        str: Markup of the tag
+    """
+    parts = [tag]
+    for name, value in attributes.items():
+        parts.append(name if value is None else f'{name}="{html.escape(value, quote=True)}"')
+    return f"<{' '.join(parts)}{'/' if self_closing else ''}>"
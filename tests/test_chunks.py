@@ -0,0 +1,114 @@
+import json
+from array import array
+
+import pytest
+
+from rag_document_viewer import chunks
+from rag_document_viewer.chunks import ChunkStore
+
+BOXES = [
+    [{"page": 1, "top": 0.1, "left": 0.2, "width": 0.3, "height": 0.05}, {"page": 2, "top": 0.5, "left": 0.0, "width": 1.0, "height": 0.1}],
+    [],
+    [{"page": 3, "top": 0, "left": 0, "width": 1, "height": 1}],
+]
+
+
+@pytest.fixture(params=["numpy", "python"])
+def validation(request, monkeypatch):
+    # Run the validation both vectorized and in pure Python
+    if request.param == "python":
+        monkeypatch.setattr(chunks, "numpy", None)
+    elif chunks.numpy is None:
+        pytest.skip("numpy is not installed")
+    return request.param
+
+
+def test_load_list(validation):
+    store = ChunkStore.load(BOXES)
+    assert len(store) == 3
+    assert store.box_count() == 3
+    assert store.pages() == {1, 2, 3}
+    assert list(store) == [[{k: float(v) if k != "page" else v for k, v in box.items()} for box in chunk] for chunk in BOXES]
+
+
+def test_load_iterator_jsonl_and_columns_match(tmp_path, validation):
+    path = tmp_path / "chunks.jsonl"
+    path.write_text("\n".join(json.dumps(x) for x in BOXES) + "\n\n")
+    expected = ChunkStore.load(BOXES).to_columns()
+
+    assert ChunkStore.load(iter(BOXES)).to_columns() == expected
+    assert ChunkStore.load(path).to_columns() == expected
+    assert ChunkStore.load(str(path)).to_columns() == expected
+    assert ChunkStore.load(expected).to_columns() == expected
+
+
+def test_load_returns_a_store_as_is():
+    store = ChunkStore.load(BOXES)
+    assert ChunkStore.load(store) is store
+
+
+def test_load_missing_jsonl():
+    with pytest.raises(FileNotFoundError):
+        ChunkStore.load("/nonexistent/chunks.jsonl")
+
+
+def test_to_json_matches_the_boxes():
+    store = ChunkStore.load(BOXES)
+    assert json.loads(store.to_json()) == list(store)
+
+
+def test_rows_skip_empty_chunks():
+    rows = list(ChunkStore.load(BOXES).rows())
+    assert [x[:2] for x in rows] == [(0, 1), (0, 2), (2, 3)]
+
+
+def test_page_only_boxes_cover_the_page(validation):
+    store = ChunkStore.load([[{"page": 2}], [{"page": 4, "top": 0.5}]])
+    assert store[0] == [{"page": 2, "top": 0.0, "left": 0.0, "width": 1.0, "height": 1.0}]
+    assert store[1] == [{"page": 4, "top": 0.5, "left": 0.0, "width": 1.0, "height": 1.0}]
+
+
+def test_coordinates_are_kept_as_given(validation):
+    box = {"page": 1, "top": -0.1, "left": 0.9, "width": 0.5, "height": 1.5}
+    assert ChunkStore.load([[box]])[0] == [box]
+
+
+@pytest.mark.parametrize("box", [
+    {"top": 0.1, "left": 0.1, "width": 0.1, "height": 0.1},
+    {"page": "one"},
+    {"page": 1, "top": None},
+    "page 1",
+])
+def test_invalid_boxes(box):
+    with pytest.raises(ValueError, match="chunk 1"):
+        ChunkStore.load([[{"page": 1}], [box]])
+
+
+@pytest.mark.parametrize("box, message", [
+    ({"page": -1}, "pages"),
+    ({"page": 1, "width": -0.1}, "sizes"),
+    ({"page": 1, "height": -0.1}, "sizes"),
+    ({"page": 1, "top": float("nan")}, "finite"),
+    ({"page": 1, "left": float("inf")}, "finite"),
+])
+def test_rejected_values(box, message, validation):
+    with pytest.raises(ValueError, match=message):
+        ChunkStore.load([[box]])
+
+
+def test_columns_validation():
+    columns = {"page": [1, 2], "top": [0.1, 0.2], "left": [0.1, 0.2], "width": [0.1, 0.2], "height": [0.1, 0.2]}
+    assert len(ChunkStore.load({**columns, "offsets": array("q", [0, 1, 2])})) == 2
+    with pytest.raises(ValueError, match="same length"):
+        ChunkStore.load({**columns, "top": [0.1], "offsets": [0, 2]})
+    with pytest.raises(ValueError, match="start at 0"):
+        ChunkStore.load({**columns, "offsets": [0, 1]})
+    with pytest.raises(ValueError, match="sorted"):
+        ChunkStore.load({**columns, "offsets": [0, 2, 1, 2]})
+
+
+def test_empty_store():
+    store = ChunkStore.load([])
+    assert len(store) == 0
+    assert store.to_json() == "[]"
+    assert list(store.rows()) == []
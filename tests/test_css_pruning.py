@@ -0,0 +1,60 @@
+import re
+
+import pytest
+
+from rag_document_viewer.css_pruning import collect_classes, get_pruning_substitution
+from rag_document_viewer.streaming import rewrite_css_file
+
+STYLESHEET = (
+    "/* generated */.ff1{font-family:ff1;}.ff2{font-family:ff2;}.fc0_s1{color:red;}"
+    ".x1,.x2{left:1px;}.pf .y3{bottom:0;}.pf{margin:0;}"
+    "@media print{.h0{height:11in;}.h1{height:12in;}}"
+)
+
+
+@pytest.mark.parametrize("block_size", [3, 1024])
+def test_collect_classes(tmp_path, block_size):
+    first = tmp_path / "index.html"
+    second = tmp_path / "page1.page"
+    first.write_text('<div class="pf w0 h0"><div class=\'t ff1\n fc0_s1\'>text</div></div>')
+    second.write_text('<div class="pc h1"></div><img class="bi" src="x.png">')
+    assert collect_classes([first, second], block_size) == {"pf", "w0", "h0", "t", "ff1", "fc0_s1", "pc", "h1", "bi"}
+
+
+def test_collect_classes_empty_file(tmp_path):
+    path = tmp_path / "index.html"
+    path.write_text("")
+    assert collect_classes([path]) == set()
+
+
+def prune(css, used):
+    report = {}
+    pattern, replace = get_pruning_substitution(used, report)
+    return re.sub(pattern, replace, css, flags=re.MULTILINE), report
+
+
+def test_pruning_removes_only_unused_generated_rules():
+    css, report = prune(STYLESHEET, {"ff1", "h0", "pf"})
+    assert css == (
+        "/* generated */.ff1{font-family:ff1;}"
+        ".x1,.x2{left:1px;}.pf .y3{bottom:0;}.pf{margin:0;}"
+        "@media print{.h0{height:11in;}}"
+    )
+    assert report == {"rules": 3, "bytes": len(".ff2{font-family:ff2;}.fc0_s1{color:red;}.h1{height:12in;}")}
+
+
+def test_pruning_keeps_everything_used():
+    css, report = prune(STYLESHEET, {"ff1", "ff2", "fc0_s1", "h0", "h1"})
+    assert css == STYLESHEET
+    assert report == {}
+
+
+def test_pruning_empty_stylesheet():
+    assert prune("", set()) == ("", {})
+
+
+def test_pruning_in_streaming_blocks(tmp_path):
+    path = tmp_path / "doc.css"
+    path.write_text(STYLESHEET)
+    rewrite_css_file(path, [get_pruning_substitution({"ff1", "h0"})], block_size=5)
+    assert path.read_text() == prune(STYLESHEET, {"ff1", "h0"})[0]
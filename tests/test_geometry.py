@@ -0,0 +1,101 @@
+import pytest
+
+from rag_document_viewer.chunks import ChunkStore
+from rag_document_viewer.geometry import MERGE_LIMIT, iter_chunk_geometry, merge_boxes, read_page_sizes
+
+
+def approx_boxes(boxes):
+    return [pytest.approx(x) for x in boxes]
+
+
+def test_merge_boxes_empty():
+    assert merge_boxes([]) == []
+
+
+def test_merge_boxes_single_box_is_kept():
+    box = [0.1, 0.2, 0.3, 0.4]
+    assert merge_boxes([box]) == [box]
+
+
+def test_merge_boxes_overlapping_lines_of_a_column():
+    boxes = [[0.1, 0.1, 0.5, 0.05], [0.1, 0.13, 0.5, 0.05]]
+    assert merge_boxes(boxes) == approx_boxes([[0.1, 0.1, 0.5, 0.08]])
+
+
+def test_merge_boxes_adjacent_lines_of_a_column():
+    boxes = [[0.1, 0.1, 0.5, 0.05], [0.1, 0.15, 0.5, 0.05], [0.1, 0.2, 0.5, 0.05]]
+    assert merge_boxes(boxes) == approx_boxes([[0.1, 0.1, 0.5, 0.15]])
+
+
+def test_merge_boxes_adjacent_words_of_a_row():
+    boxes = [[0.3, 0.1, 0.2, 0.05], [0.1, 0.1, 0.2, 0.05]]
+    assert merge_boxes(boxes) == approx_boxes([[0.1, 0.1, 0.4, 0.05]])
+
+
+def test_merge_boxes_contained_box():
+    boxes = [[0.2, 0.2, 0.1, 0.1], [0.1, 0.1, 0.5, 0.5]]
+    assert merge_boxes(boxes) == approx_boxes([[0.1, 0.1, 0.5, 0.5]])
+
+
+def test_merge_boxes_keeps_boxes_whose_union_is_not_a_rectangle():
+    # Overlapping, but neither aligned in a column nor in a row
+    boxes = [[0.1, 0.1, 0.3, 0.1], [0.2, 0.15, 0.3, 0.1]]
+    assert merge_boxes(boxes) == boxes
+
+
+def test_merge_boxes_gap_and_tolerance():
+    boxes = [[0.1, 0.1, 0.5, 0.05], [0.1, 0.16, 0.5, 0.05]]
+    assert merge_boxes(boxes) == boxes
+    assert merge_boxes(boxes, (0.0, 0.02)) == approx_boxes([[0.1, 0.1, 0.5, 0.11]])
+
+
+def test_merge_boxes_keeps_the_order_of_the_first_boxes():
+    boxes = [[0.6, 0.5, 0.2, 0.1], [0.1, 0.1, 0.2, 0.1], [0.1, 0.2, 0.2, 0.1]]
+    assert merge_boxes(boxes) == approx_boxes([[0.6, 0.5, 0.2, 0.1], [0.1, 0.1, 0.2, 0.2]])
+
+
+def test_merge_boxes_limit():
+    # Touching lines of a single column (binary fractions, so edges meet exactly), merged into one box up to the limit
+    boxes = [[0.1, i / 2048, 0.5, 1 / 2048] for i in range(MERGE_LIMIT)]
+    assert len(merge_boxes(boxes)) == 1
+
+    boxes.append([0.1, 0.5, 0.5, 0.1])
+    merged = merge_boxes(boxes)
+    assert merged == boxes
+    assert merged[0] is not boxes[0]
+
+
+def test_iter_chunk_geometry_without_page_sizes():
+    chunks = ChunkStore.load([
+        [{"page": 1, "top": 0.1, "left": 0.1, "width": 0.5, "height": 0.05}, {"page": 1, "top": 0.15, "left": 0.1, "width": 0.5, "height": 0.05}],
+        [],
+        [{"page": 2, "top": 0, "left": 0, "width": 1, "height": 1}],
+    ])
+    geometry = list(iter_chunk_geometry(chunks))
+    assert geometry == [
+        [0, None, [[1, 10.0, 10.0, 50.0, 10.0]]],
+        [0, None, []],
+        [1, None, [[2, 0.0, 0.0, 100.0, 100.0]]],
+    ]
+
+
+def test_iter_chunk_geometry_bookmarks_and_rendered_pages():
+    chunks = ChunkStore.load([
+        [{"page": 3, "top": 0.5, "left": 0.1, "width": 0.2, "height": 0.1}],
+        [{"page": 2, "top": 0.5, "left": 0.1, "width": 0.2, "height": 0.1}, {"page": 5, "top": 0.25, "left": 0.1, "width": 0.2, "height": 0.1}],
+    ])
+    # Only pages 3 and 5 are rendered, page 5 is three times taller
+    geometry = list(iter_chunk_geometry(chunks, [(100.0, 100.0), (100.0, 300.0)], [3, 5]))
+    assert geometry[0] == [0, 0.125, [[3, 10.0, 50.0, 20.0, 10.0]]]
+    # The box of the page that was not rendered is left out
+    assert geometry[1] == [0, 0.4375, [[5, 10.0, 25.0, 20.0, 10.0]]]
+
+
+def test_read_page_sizes(tmp_path):
+    css = tmp_path / "doc.css"
+    html = tmp_path / "doc.html"
+    css.write_text(".w0{width:612.000000px;}.h0{height:792.000000px;}.w1_s1{width:300.5px;}.h1_s1{height:400px;}"
+                   "@media print{.w0{width:8.5in;}.h0{height:11in;}}")
+    html.write_text('<div id="pf1" class="pf w0 h0"></div><div class="pc w1_s1"></div>'
+                    '<div id="pf2" class="pf w1_s1 h1_s1"></div><div id="pf3" class="pf w9 h9"></div>')
+    assert read_page_sizes(css, html, block_size=8) == [(612.0, 792.0), (300.5, 400.0), None]
@@ -0,0 +1,71 @@
+from rag_document_viewer.pdf_sharding import merge_html_shards, merge_page_ranges, split_page_ranges
+
+
+def test_split_page_ranges_covers_every_page():
+    assert split_page_ranges(10, 3) == [(1, 4), (5, 7), (8, 10)]
+    assert split_page_ranges(2, 5) == [(1, 1), (2, 2)]
+    assert split_page_ranges(7, 0) == [(1, 7)]
+
+
+def test_merge_page_ranges_empty():
+    assert merge_page_ranges([], 3, 5) == []
+
+
+def test_merge_page_ranges_keeps_distant_ranges():
+    ranges = [(1, 1), (10, 12), (30, 30)]
+    assert merge_page_ranges(ranges, 5, 0) == ranges
+
+
+def test_merge_page_ranges_closes_small_gaps():
+    assert merge_page_ranges([(1, 1), (3, 3), (10, 12), (14, 14)], 10, 5) == [(1, 3), (10, 14)]
+
+
+def test_merge_page_ranges_caps_the_range_count():
+    ranges = [(1, 1), (3, 3), (15, 15), (28, 28)]
+    assert merge_page_ranges(ranges, 2, 0) == [(1, 15), (28, 28)]
+    assert merge_page_ranges(ranges, 1, 0) == [(1, 28)]
+    assert merge_page_ranges(ranges, 0, 0) == [(1, 28)]
+
+
+def write_shard(directory, pages, font="f1.woff"):
+    directory.mkdir()
+    page_divs = "".join(
+        f'<div id="pf{x}" class="pf w0 h0"><div class="t ff1 fs0 y{x}">Page {x}</div><img class="bi" src="bg{x}.png"/></div>'
+        for x in pages
+    )
+    (directory / "doc.html").write_text(
+        '<!DOCTYPE html><html><head><link rel="stylesheet" href="doc.css"/></head><body>'
+        f'<div id="sidebar"><div class="ff1">outline</div></div><div id="page-container">{page_divs}</div>'
+        '<div class="loading-indicator"></div></body></html>'
+    )
+    (directory / "doc.css").write_text(
+        f'@font-face{{font-family:ff1;src:url({font})format("woff");}}.ff1{{font-family:ff1;}}.fs0{{font-size:4px;}}.pf{{margin:0;}}'
+    )
+    (directory / font).write_bytes(b"font")
+    (directory / "base.min.css").write_text(".pf{position:relative}")
+    for x in pages:
+        (directory / f"bg{x}.png").write_bytes(b"png")
+
+
+def test_merge_html_shards(tmp_path):
+    output = tmp_path / "out"
+    output.mkdir()
+    shards = [tmp_path / "s0", tmp_path / "s1"]
+    write_shard(shards[0], [1, 2])
+    write_shard(shards[1], [3])
+
+    merge_html_shards(output, "doc", shards, block_size=16)
+
+    html = (output / "doc.html").read_text()
+    assert html.count('id="page-container"') == 1
+    container = html.split('<div id="page-container">')[1].split('<div class="loading-indicator">')[0]
+    assert container.index('id="pf2"') < container.index('id="pf3"')
+    assert '<div id="pf3" class="pf w0_s1 h0_s1"><div class="t ff1_s1 fs0_s1 y3_s1">' in container
+    # Only the pages of the following shards are appended
+    assert html.count('id="sidebar"') == 1
+
+    css = (output / "doc.css").read_text()
+    assert ".ff1{font-family:ff1;}" in css
+    assert "url(f1_s1.woff)" in css and ".ff1_s1{font-family:ff1_s1;}" in css and ".fs0_s1{" in css
+    assert sorted(x.name for x in output.iterdir()) == ["base.min.css", "bg1.png", "bg2.png", "bg3.png", "doc.css", "doc.html", "f1.woff", "f1_s1.woff"]
+    assert not any(x.exists() for x in shards)
@@ -0,0 +1,89 @@
+import io
+
+import pytest
+
+from rag_document_viewer.streaming import StreamingHTMLRewriter, build_start_tag, rewrite_css_file, rewrite_html_file
+
+DOCUMENT = (
+    '<!DOCTYPE html><html><head><meta name="generator" content="pdf2htmlEX"/><title>doc</title>'
+    '<link rel="stylesheet" href="doc.css"/><script>var a = "<div>";</script></head>'
+    '<body><!-- generated --><div id="sidebar"><div><img src="x.png"/></div></div>'
+    '<div id="page-container"><div class="pf"><img src="bg1.png"/>A &amp; B&#33;<br></div><div class="pf">C</div></div>'
+    '<div class="loading-indicator"></div></body></html>'
+)
+
+
+def rewrite(document, block_size=7, **options):
+    # Feed the document in small blocks, so tokens get split between them
+    output = io.StringIO()
+    rewriter = StreamingHTMLRewriter(output, **options)
+    for i in range(0, len(document), block_size):
+        rewriter.feed(document[i:i + block_size])
+    rewriter.close()
+    return output.getvalue()
+
+
+def test_unchanged_document_is_copied():
+    assert rewrite(DOCUMENT) == DOCUMENT
+
+
+def test_remove_elements_and_comments():
+    output = rewrite(
+        DOCUMENT,
+        remove_element=lambda tag, attrs: tag in ["script", "meta"] or attrs.get("id") == "sidebar",
+        remove_comments=True,
+    )
+    assert "<script" not in output and "<meta" not in output and "sidebar" not in output and "<!--" not in output
+    assert '<body><div id="page-container">' in output
+
+
+def test_rewrite_attributes():
+    def rewrite_attributes(tag, attrs):
+        if tag == "img":
+            attrs["src"] = f"./assets/images/{attrs['src']}"
+            return attrs
+        return None
+
+    output = rewrite(DOCUMENT, rewrite_attributes=rewrite_attributes)
+    assert '<img src="./assets/images/bg1.png"/>' in output
+    assert '<link rel="stylesheet" href="doc.css"/>' in output
+
+
+def test_insertions_and_title():
+    output = rewrite(DOCUMENT, title="A <b>", head_end="[head]", body_start="[start]", body_end="[end]")
+    assert "<title>A &lt;b&gt;</title>" in output
+    assert "[head]</head><body>[start]" in output
+    assert "[end]</body>" in output
+
+
+def test_container_end():
+    output = rewrite(DOCUMENT, container=lambda tag, attrs: attrs.get("id") == "page-container",
+                     container_end=lambda out: out.write("[pages]"))
+    assert '<div class="pf">C</div>[pages]</div><div class="loading-indicator">' in output
+
+
+def test_container_only():
+    output = rewrite(DOCUMENT, container=lambda tag, attrs: attrs.get("id") == "page-container", container_only=True)
+    assert output == '<div class="pf"><img src="bg1.png"/>A &amp; B&#33;<br></div><div class="pf">C</div>'
+
+
+def test_build_start_tag():
+    assert build_start_tag("div", {"class": 'a "b"', "hidden": None}) == '<div class="a &quot;b&quot;" hidden>'
+    assert build_start_tag("img", {"src": "x.png"}, True) == '<img src="x.png"/>'
+
+
+@pytest.mark.parametrize("block_size", [1, 5, 1024])
+def test_rewrite_html_file(tmp_path, block_size):
+    path = tmp_path / "doc.html"
+    path.write_text(DOCUMENT)
+    rewrite_html_file(path, block_size, remove_element=lambda tag, attrs: tag == "script")
+    assert path.read_text() == DOCUMENT.replace('<script>var a = "<div>";</script>', "")
+    assert [x.name for x in tmp_path.iterdir()] == ["doc.html"]
+
+
+@pytest.mark.parametrize("block_size", [1, 5, 1024])
+def test_rewrite_css_file(tmp_path, block_size):
+    path = tmp_path / "doc.css"
+    path.write_text(".ff1{font-family:ff1;}\n.fc1{color:red;}\n.ff12{font-family:ff12;}")
+    rewrite_css_file(path, [(r"\.(ff[0-9]+)\{", r".\1_s1{"), (r"^\.fc1\{[^}]*\}", lambda m: "")], block_size)
+    assert path.read_text() == ".ff1_s1{font-family:ff1;}\n\n.ff12_s1{font-family:ff12;}"